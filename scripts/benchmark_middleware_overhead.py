@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import time
+from typing import Any
+
+from fastapi import FastAPI
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+from starlette.responses import Response
+
+from app.main import app
+
+
+def _scope(path: str) -> dict[str, Any]:
+    return {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", b"testserver"), (b"x-correlation-id", b"corr_bench")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("testserver", 80),
+    }
+
+
+async def _drive(application: Any, path: str, requests: int) -> tuple[float, set[int]]:
+    statuses: set[int] = set()
+
+    async def receive() -> dict[str, Any]:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: dict[str, Any]) -> None:
+        if message["type"] == "http.response.start":
+            statuses.add(message["status"])
+
+    started = time.perf_counter()
+    for _ in range(requests):
+        await application(_scope(path), receive, send)
+    return (time.perf_counter() - started) / requests * 1_000_000, statuses
+
+
+def bare_app() -> FastAPI:
+    bare = FastAPI()
+
+    @bare.get("/health")
+    async def health() -> dict[str, str]:
+        return {"status": "ok"}
+
+    return bare
+
+
+class _PassThroughMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next: Any) -> Response:
+        return await call_next(request)
+
+
+def base_http_middleware_app(layers: int) -> FastAPI:
+    # The previous stack's shape: the same number of layers, each a BaseHTTPMiddleware that only
+    # calls the next one, so the figure is the floor that pattern costs before any gateway logic.
+    baseline = bare_app()
+    for _ in range(layers):
+        baseline.add_middleware(_PassThroughMiddleware)
+    return baseline
+
+
+async def _best_us(application: Any, path: str, requests: int, repeat: int) -> float:
+    await _drive(application, path, min(requests, 200))
+    best = float("inf")
+    for _ in range(repeat):
+        elapsed_us, statuses = await _drive(application, path, requests)
+        if statuses != {200}:
+            raise SystemExit(f"{path} answered {sorted(statuses)}, expected 200")
+        best = min(best, elapsed_us)
+    return best
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Measure per-request overhead of the gateway middleware stack."
+    )
+    parser.add_argument("--requests", type=int, default=2_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--baseline-layers",
+        type=int,
+        default=7,
+        help="BaseHTTPMiddleware layers in the baseline; the gateway replaced seven.",
+    )
+    args = parser.parse_args()
+
+    # Access and audit logging are measured separately; keep sink I/O out of the comparison.
+    logging.disable(logging.CRITICAL)
+    bare_us = asyncio.run(_best_us(bare_app(), "/health", args.requests, args.repeat))
+    baseline_us = asyncio.run(
+        _best_us(
+            base_http_middleware_app(args.baseline_layers), "/health", args.requests, args.repeat
+        )
+    )
+    gateway_us = asyncio.run(_best_us(app, "/health", args.requests, args.repeat))
+    print(f"requests={args.requests} repeat={args.repeat} baseline_layers={args.baseline_layers}")
+    print(f"bare_app_us_per_request                 {bare_us:8.1f}")
+    print(f"base_http_middleware_us_per_request     {baseline_us:8.1f}")
+    print(f"gateway_stack_us_per_request            {gateway_us:8.1f}")
+    print(f"base_http_middleware_overhead_us        {baseline_us - bare_us:8.1f}")
+    print(f"gateway_middleware_overhead_us          {gateway_us - bare_us:8.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from typing import Any, Callable
+
+from app.contracts.workbench import WorkbenchPositionView
+from app.precision_policy import quantize_money, quantize_performance, quantize_quantity
+from app.services.position_parsing import (
+    FLAT_VALUATION_KEYS,
+    NESTED_VALUATION_KEYS,
+    extract_current_positions,
+)
+
+ASSET_CLASSES = ("Equity", "Fixed Income", "Cash", "Alternatives", "Commodities")
+VALUATION_SHAPES = ("nested_base", "nested_market_value", "flat_value_base")
+
+
+def build_snapshot(position_count: int, shape: str, seed: int) -> dict[str, Any]:
+    rng = random.Random(seed)
+    by_asset_class: dict[str, list[dict[str, Any]]] = {name: [] for name in ASSET_CLASSES}
+    total = 0.0
+    for index in range(position_count):
+        market_value = round(rng.uniform(1_000, 2_500_000), 2)
+        total += market_value
+        item: dict[str, Any] = {
+            "instrument_id": f"SEC_{rng.randrange(10**9):09d}_{index}",
+            "instrument_name": f"Instrument {index}",
+            "quantity": round(rng.uniform(1, 50_000), 4),
+        }
+        if shape == "nested_base":
+            item["valuation"] = {"market_value_base": market_value, "market_value": market_value}
+        elif shape == "nested_market_value":
+            item["valuation"] = {"market_value": market_value}
+        else:
+            item["value_base"] = market_value
+        by_asset_class[ASSET_CLASSES[index % len(ASSET_CLASSES)]].append(item)
+    return {
+        "overview": {"total_market_value": round(total, 2)},
+        "holdings": {"holdingsByAssetClass": by_asset_class},
+    }
+
+
+def legacy_parse_position_market_value(item: dict[str, Any]) -> float | None:
+    valuation_payload = item.get("valuation")
+    if isinstance(valuation_payload, dict):
+        for key in NESTED_VALUATION_KEYS:
+            value = valuation_payload.get(key)
+            if value is None:
+                continue
+            try:
+                return float(quantize_money(value))
+            except (TypeError, ValueError):
+                continue
+    for key in FLAT_VALUATION_KEYS:
+        value = item.get(key)
+        if value is None:
+            continue
+        try:
+            return float(quantize_money(value))
+        except (TypeError, ValueError):
+            continue
+    return None
+
+
+def legacy_extract_current_positions(
+    snapshot_payload: dict[str, Any],
+) -> list[WorkbenchPositionView]:
+    overview_payload = snapshot_payload.get("overview", {})
+    total_market_value = 0.0
+    if isinstance(overview_payload, dict):
+        total_market_value = float(quantize_money(overview_payload.get("total_market_value", 0.0)))
+
+    holdings_payload = snapshot_payload.get("holdings", {})
+    if not isinstance(holdings_payload, dict):
+        return []
+    by_asset_class = holdings_payload.get("holdingsByAssetClass", {})
+    if not isinstance(by_asset_class, dict):
+        return []
+
+    rows: list[WorkbenchPositionView] = []
+    for asset_class, items in by_asset_class.items():
+        if not isinstance(items, list):
+            continue
+        for item in items:
+            if not isinstance(item, dict):
+                continue
+            market_value_base = legacy_parse_position_market_value(item)
+            weight_pct_raw = item.get("weight_pct")
+            weight_pct = (
+                float(quantize_performance(weight_pct_raw)) if weight_pct_raw is not None else None
+            )
+            if weight_pct is None and market_value_base is not None and total_market_value > 0:
+                weight_pct = float(
+                    quantize_performance((market_value_base / total_market_value) * 100.0)
+                )
+            rows.append(
+                WorkbenchPositionView(
+                    security_id=str(item.get("instrument_id", item.get("security_id", "UNKNOWN"))),
+                    instrument_name=str(
+                        item.get("instrument_name", item.get("instrument_id", "UNKNOWN"))
+                    ),
+                    asset_class=str(asset_class) if asset_class is not None else None,
+                    quantity=float(quantize_quantity(item.get("quantity", 0.0))),
+                    market_value_base=market_value_base,
+                    weight_pct=weight_pct,
+                )
+            )
+    rows.sort(key=lambda row: row.security_id)
+    return rows
+
+
+def _time_call(
+    fn: Callable[[dict[str, Any]], list[WorkbenchPositionView]],
+    payload: dict[str, Any],
+    repeat: int,
+) -> list[float]:
+    samples: list[float] = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(payload)
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Compare columnar vs per-row core snapshot position parsing."
+    )
+    parser.add_argument("--positions", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--seed", type=int, default=20260226)
+    args = parser.parse_args()
+
+    print(f"positions={args.positions} repeat={args.repeat}")
+    for shape in VALUATION_SHAPES:
+        payload = build_snapshot(args.positions, shape, args.seed)
+        legacy_rows = legacy_extract_current_positions(payload)
+        columnar_rows = extract_current_positions(payload)
+        if legacy_rows != columnar_rows:
+            print(f"{shape}: MISMATCH between legacy and columnar output")
+            return 1
+
+        legacy_ms = min(_time_call(legacy_extract_current_positions, payload, args.repeat))
+        columnar_ms = min(_time_call(extract_current_positions, payload, args.repeat))
+        print(
+            f"{shape:<22} legacy_ms={legacy_ms:8.2f} columnar_ms={columnar_ms:8.2f} "
+            f"speedup={legacy_ms / columnar_ms:5.2f}x"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from datetime import UTC, datetime
+from typing import Any, Callable
+
+from pydantic import BaseModel, TypeAdapter
+
+from app.contracts.reporting import ReportingSnapshotResponse
+from app.contracts.workbench import (
+    WorkbenchOverviewSummary,
+    WorkbenchPortfolio360Response,
+    WorkbenchPortfolioSummary,
+    WorkbenchPositionView,
+    WorkbenchProjectedPositionView,
+)
+from app.precision_policy import quantize_quantity
+from app.responses import model_json_response
+from app.services.position_parsing import POSITION_VIEWS_ADAPTER, extract_projected_positions
+
+ASSET_CLASSES = ("Equity", "Fixed Income", "Cash", "Alternatives", "Commodities")
+GENERATED_AT = datetime(2026, 2, 24, 7, 0, tzinfo=UTC)
+
+
+def build_position_rows(count: int, seed: int) -> list[dict[str, Any]]:
+    rng = random.Random(seed)
+    return [
+        {
+            "security_id": f"SEC_{index:07d}",
+            "instrument_name": f"Instrument {index}",
+            "asset_class": ASSET_CLASSES[index % len(ASSET_CLASSES)],
+            "quantity": round(rng.uniform(1, 50_000), 6),
+            "market_value_base": round(rng.uniform(1_000, 2_500_000), 2),
+            "weight_pct": round(rng.uniform(0, 2), 6),
+        }
+        for index in range(count)
+    ]
+
+
+def build_projected_payload(count: int, seed: int) -> list[dict[str, Any]]:
+    rng = random.Random(seed)
+    rows: list[dict[str, Any]] = []
+    for index in range(count):
+        baseline = round(rng.uniform(0, 50_000), 4)
+        proposed = round(baseline + rng.uniform(-100, 100), 4)
+        rows.append(
+            {
+                "security_id": f"SEC_{index:07d}",
+                "instrument_name": f"Instrument {index}",
+                "asset_class": ASSET_CLASSES[index % len(ASSET_CLASSES)],
+                "baseline_quantity": baseline,
+                "proposed_quantity": proposed,
+                "delta_quantity": round(proposed - baseline, 4),
+            }
+        )
+    return rows
+
+
+def build_report_rows(count: int, seed: int) -> list[dict[str, Any]]:
+    rng = random.Random(seed)
+    return [
+        {
+            "bucket": ASSET_CLASSES[index % len(ASSET_CLASSES)],
+            "metric": f"metric_{index}",
+            "value": round(rng.uniform(-1_000, 1_000_000), 2),
+            "labels": {"source": "lotus-report", "rank": index},
+        }
+        for index in range(count)
+    ]
+
+
+def fastapi_response_model_bytes(model: BaseModel) -> bytes:
+    # Mirrors FastAPI's response_model path: validate(from_attributes=True), then dump_json.
+    adapter = TypeAdapter(type(model))
+    return adapter.dump_json(adapter.validate_python(model, from_attributes=True), by_alias=True)
+
+
+def portfolio_360(rows: list[WorkbenchPositionView]) -> WorkbenchPortfolio360Response:
+    return WorkbenchPortfolio360Response(
+        correlation_id="bench",
+        contract_version="v1",
+        as_of_date="2026-02-24",
+        portfolio=WorkbenchPortfolioSummary(portfolio_id="BENCH", base_currency="USD"),
+        overview=WorkbenchOverviewSummary(
+            market_value_base=0.0, cash_weight_pct=0.0, position_count=len(rows)
+        ),
+        current_positions=rows,
+    )
+
+
+def legacy_portfolio_360_bytes(row_payloads: list[dict[str, Any]]) -> bytes:
+    rows = [WorkbenchPositionView(**row) for row in row_payloads]
+    return fastapi_response_model_bytes(portfolio_360(rows))
+
+
+def trusted_portfolio_360_bytes(row_payloads: list[dict[str, Any]]) -> bytes:
+    rows = POSITION_VIEWS_ADAPTER.validate_python(row_payloads)
+    return bytes(model_json_response(portfolio_360(rows)).body)
+
+
+def legacy_projected_positions(
+    rows_payload: list[dict[str, Any]],
+) -> list[WorkbenchProjectedPositionView]:
+    return [
+        WorkbenchProjectedPositionView(
+            security_id=str(row.get("security_id", "")),
+            instrument_name=str(row.get("instrument_name", row.get("security_id", "UNKNOWN"))),
+            asset_class=str(row["asset_class"]) if row.get("asset_class") is not None else None,
+            baseline_quantity=float(quantize_quantity(row.get("baseline_quantity", 0.0))),
+            proposed_quantity=float(quantize_quantity(row.get("proposed_quantity", 0.0))),
+            delta_quantity=float(quantize_quantity(row.get("delta_quantity", 0.0))),
+        )
+        for row in rows_payload
+        if isinstance(row, dict)
+    ]
+
+
+def legacy_reporting_snapshot_bytes(rows: list[dict[str, Any]]) -> bytes:
+    snapshot = ReportingSnapshotResponse(
+        correlationId="bench",
+        contractVersion="v1",
+        sourceService="lotus-report",
+        portfolioId="BENCH",
+        asOfDate="2026-02-24",
+        generatedAt=GENERATED_AT,
+        rows=rows,
+    )
+    return fastapi_response_model_bytes(snapshot)
+
+
+def trusted_reporting_snapshot_bytes(rows: list[dict[str, Any]]) -> bytes:
+    snapshot = ReportingSnapshotResponse.model_construct(
+        correlation_id="bench",
+        contract_version="v1",
+        source_service="lotus-report",
+        portfolio_id="BENCH",
+        as_of_date="2026-02-24",
+        generated_at=GENERATED_AT,
+        rows=rows,
+    )
+    return bytes(model_json_response(snapshot).body)
+
+
+def _best_ms(fn: Callable[[Any], Any], payload: Any, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(payload)
+        best = min(best, (time.perf_counter() - started) * 1000)
+    return best
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Compare validated vs trusted response construction and serialization."
+    )
+    parser.add_argument("--positions", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--seed", type=int, default=20260226)
+    args = parser.parse_args()
+
+    scenarios: list[tuple[str, Callable[[Any], Any], Callable[[Any], Any], Any]] = [
+        (
+            "portfolio_360",
+            legacy_portfolio_360_bytes,
+            trusted_portfolio_360_bytes,
+            build_position_rows(args.positions, args.seed),
+        ),
+        (
+            "projected_positions",
+            legacy_projected_positions,
+            extract_projected_positions,
+            build_projected_payload(args.positions, args.seed),
+        ),
+        (
+            "reporting_snapshot",
+            legacy_reporting_snapshot_bytes,
+            trusted_reporting_snapshot_bytes,
+            build_report_rows(args.positions, args.seed),
+        ),
+    ]
+
+    print(f"positions={args.positions} repeat={args.repeat}")
+    for name, legacy, trusted, payload in scenarios:
+        if legacy(payload) != trusted(payload):
+            print(f"{name}: MISMATCH between legacy and trusted output")
+            return 1
+        legacy_ms = _best_ms(legacy, payload, args.repeat)
+        trusted_ms = _best_ms(trusted, payload, args.repeat)
+        print(
+            f"{name:<22} legacy_ms={legacy_ms:8.2f} trusted_ms={trusted_ms:8.2f} "
+            f"speedup={legacy_ms / trusted_ms:5.2f}x"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,233 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+from datetime import UTC, datetime
+from typing import IO, Any, Literal
+
+from app import json_codec
+from app.config import settings
+from app.metrics import AUDIT_EVENTS, AUDIT_QUEUE_DEPTH, AUDIT_SPOOL_WRITE_DURATION
+
+logger = logging.getLogger("audit_sink")
+# Records that carry audit events; the log pipeline never drops these.
+audit_logger = logging.getLogger("audit")
+
+FsyncPolicy = Literal["batch", "rotate", "never"]
+
+
+class AuditSpool:
+    # Append-only NDJSON files, one event per line. Writes run on worker threads, so the lock
+    # keeps a shutdown close from racing a batch that is still being written, and a close is
+    # final until reopen: a write that lands after it fails instead of opening a file nobody
+    # will sync or close.
+
+    def __init__(
+        self,
+        directory: str,
+        max_bytes: int,
+        max_age_seconds: float,
+        fsync_policy: FsyncPolicy = "batch",
+    ):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self.fsync_policy = fsync_policy
+        self.path: str | None = None
+        self._file: IO[bytes] | None = None
+        self._bytes = 0
+        self._opened = 0.0
+        self._closed = False
+        self._lock = threading.Lock()
+
+    def write_batch(self, events: list[dict[str, Any]]) -> None:
+        data = b"".join(json_codec.dumps(event) + b"\n" for event in events)
+        with self._lock:
+            if self._closed:
+                raise OSError(f"audit spool {self.directory} is closed")
+            handle = self._file
+            if handle is None or self._due_for_rotation():
+                handle = self._rotate()
+            handle.write(data)
+            handle.flush()
+            self._bytes += len(data)
+            if self.fsync_policy == "batch":
+                os.fsync(handle.fileno())
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+            self._close()
+
+    def reopen(self) -> None:
+        with self._lock:
+            self._closed = False
+
+    def _close(self) -> None:
+        handle, self._file = self._file, None
+        if handle is None:
+            return
+        if self.fsync_policy != "never":
+            handle.flush()
+            os.fsync(handle.fileno())
+        handle.close()
+
+    def _due_for_rotation(self) -> bool:
+        return (self.max_bytes > 0 and self._bytes >= self.max_bytes) or (
+            self.max_age_seconds > 0 and time.monotonic() - self._opened >= self.max_age_seconds
+        )
+
+    def _rotate(self) -> IO[bytes]:
+        self._close()
+        os.makedirs(self.directory, exist_ok=True)
+        stamp = datetime.now(UTC).strftime("%Y%m%dT%H%M%S%fZ")
+        self.path = os.path.join(self.directory, f"audit-{stamp}.ndjson")
+        self._file = open(self.path, "ab")
+        self._bytes = 0
+        self._opened = time.monotonic()
+        return self._file
+
+
+class AuditSink:
+    def __init__(
+        self,
+        spool: AuditSpool,
+        max_queue: int,
+        batch_size: int,
+        flush_interval_seconds: float,
+    ):
+        self.spool = spool
+        self.max_queue = max(1, max_queue)
+        self.batch_size = max(1, batch_size)
+        self.flush_interval_seconds = flush_interval_seconds
+        self._queue: asyncio.Queue[dict[str, Any]] | None = None
+        self._task: asyncio.Task[None] | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        if not self.running:
+            self.spool.reopen()
+            self._queue = asyncio.Queue(maxsize=self.max_queue)
+            self._task = asyncio.create_task(self._run(self._queue))
+
+    def submit(self, event: dict[str, Any]) -> bool:
+        # False means the caller must record the event itself: the sink is not running, or the
+        # queue is full and dropping an audit event is not an option.
+        if self._queue is None or not self.running:
+            return False
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            AUDIT_EVENTS.labels(outcome="overflow").inc()
+            return False
+        AUDIT_QUEUE_DEPTH.set(self._queue.qsize())
+        return True
+
+    async def _run(self, queue: "asyncio.Queue[dict[str, Any]]") -> None:
+        loop = asyncio.get_running_loop()
+        batch: list[dict[str, Any]] = []
+        write: asyncio.Task[None] | None = None
+        try:
+            while True:
+                batch.append(await queue.get())
+                deadline = loop.time() + self.flush_interval_seconds
+                while len(batch) < self.batch_size:
+                    if not queue.empty():
+                        batch.append(queue.get_nowait())
+                        continue
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    # asyncio.timeout rather than wait_for: wait_for swallows a shutdown cancel
+                    # that lands as the get completes, leaving the task waiting out the interval.
+                    try:
+                        async with asyncio.timeout(remaining):
+                            batch.append(await queue.get())
+                    except TimeoutError:
+                        break
+                pending, batch = batch, []
+                # Shielded so a shutdown cancel cannot abandon a batch halfway to disk.
+                write = asyncio.create_task(self._write(pending))
+                await asyncio.shield(write)
+                AUDIT_QUEUE_DEPTH.set(queue.qsize())
+        except asyncio.CancelledError:
+            # Shutdown: whatever is held or still queued is written now rather than waiting
+            # for the batch to fill or the flush interval to pass. A batch already on its way to
+            # disk finishes first, so stop's timeout covers it too.
+            if write is not None and not write.done():
+                await asyncio.shield(write)
+            while not queue.empty():
+                batch.append(queue.get_nowait())
+            if batch:
+                await self._write(batch)
+            raise
+
+    async def _write(self, batch: list[dict[str, Any]]) -> None:
+        started = time.perf_counter()
+        try:
+            await asyncio.to_thread(self.spool.write_batch, batch)
+        except OSError as exc:
+            AUDIT_EVENTS.labels(outcome="write_failed").inc(len(batch))
+            audit_logger.error(
+                "audit_sink.write_failed",
+                extra={"extra_fields": {"error": str(exc), "events": batch}},
+            )
+            return
+        AUDIT_SPOOL_WRITE_DURATION.observe(time.perf_counter() - started)
+        AUDIT_EVENTS.labels(outcome="spooled").inc(len(batch))
+
+    async def stop(self, timeout_seconds: float) -> bool:
+        # Called after in-flight requests have drained, so every audit event they produced is
+        # already queued.
+        queue, task = self._queue, self._task
+        self._queue, self._task = None, None
+        flushed = True
+        if task is not None:
+            task.cancel()
+            done, _ = await asyncio.wait({task}, timeout=timeout_seconds)
+            flushed = task in done
+        leftovers: list[dict[str, Any]] = []
+        while queue is not None and not queue.empty():
+            leftovers.append(queue.get_nowait())
+        if flushed and leftovers:
+            # A task cancelled before it first ran never reached its own flush.
+            await self._write(leftovers)
+        elif not flushed:
+            logger.warning(
+                "audit_sink.flush_timed_out",
+                extra={"extra_fields": {"pending_events": len(leftovers)}},
+            )
+            for event in leftovers:
+                audit_logger.warning(
+                    "audit_sink.unflushed_event", extra={"extra_fields": {"audit": event}}
+                )
+        await asyncio.to_thread(self.spool.close)
+        AUDIT_QUEUE_DEPTH.set(0)
+        return flushed
+
+
+def log_audit_event(event: dict[str, Any]) -> None:
+    AUDIT_EVENTS.labels(outcome="logged").inc()
+    audit_logger.info("enterprise_audit_event", extra={"extra_fields": {"audit": event}})
+
+
+def build_audit_sink() -> AuditSink:
+    spool = AuditSpool(
+        settings.audit_spool_dir,
+        max_bytes=settings.audit_spool_max_bytes,
+        max_age_seconds=settings.audit_spool_max_age_seconds,
+        fsync_policy=settings.audit_fsync_policy,
+    )
+    return AuditSink(
+        spool,
+        max_queue=settings.audit_queue_size,
+        batch_size=settings.audit_batch_size,
+        flush_interval_seconds=settings.audit_flush_interval_seconds,
+    )
+
+
+AUDIT_SINK = build_audit_sink()
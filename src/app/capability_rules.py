@@ -0,0 +1,75 @@
+from typing import Any
+
+from app.config import settings
+from app.json_document_store import JsonDocumentStore
+from app.metrics import CAPABILITY_RULE_RELOADS
+
+
+class _TrieNode:
+    __slots__ = ("children", "capability")
+
+    def __init__(self) -> None:
+        self.children: dict[str, _TrieNode] = {}
+        self.capability: str | None = None
+
+
+class CapabilityRuleTrie:
+    # Rules are "METHOD /path-prefix" -> capability. Each method gets a character trie over the
+    # prefixes, so a lookup walks the request path once no matter how many rules exist, and the
+    # deepest (longest) matching prefix wins.
+
+    __slots__ = ("_roots", "rule_count")
+
+    def __init__(self, rules: dict[str, Any]):
+        self._roots: dict[str, _TrieNode] = {}
+        self.rule_count = 0
+        for key, capability in rules.items():
+            if not isinstance(key, str):
+                continue
+            method, separator, prefix = key.partition(" ")
+            if not separator:
+                continue
+            node = self._roots.setdefault(method.upper(), _TrieNode())
+            for char in prefix:
+                node = node.children.setdefault(char, _TrieNode())
+            node.capability = str(capability)
+            self.rule_count += 1
+
+    def required_capability(self, method: str, path: str) -> str | None:
+        node = self._roots.get(method.upper())
+        if node is None:
+            return None
+        capability = node.capability
+        for char in path:
+            child = node.children.get(char)
+            if child is None:
+                break
+            node = child
+            if node.capability is not None:
+                capability = node.capability
+        return capability
+
+
+class CapabilityRuleStore(JsonDocumentStore[CapabilityRuleTrie]):
+    name = "capability_rules"
+    env_var = "ENTERPRISE_CAPABILITY_RULES_JSON"
+
+    def compile(self, document: dict[str, Any]) -> CapabilityRuleTrie:
+        return CapabilityRuleTrie(document)
+
+    def record_reload(self, outcome: str) -> None:
+        CAPABILITY_RULE_RELOADS.labels(outcome=outcome).inc()
+
+    def required_capability(self, method: str, path: str) -> str | None:
+        return self.compiled.required_capability(method, path)
+
+
+def build_capability_rule_store() -> CapabilityRuleStore:
+    store = CapabilityRuleStore(
+        settings.capability_rules_path, settings.capability_rules_reload_interval_seconds
+    )
+    store.reload()
+    return store
+
+
+CAPABILITY_RULES = build_capability_rule_store()
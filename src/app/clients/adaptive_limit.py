@@ -0,0 +1,83 @@
+import time
+
+
+class RttEstimate:
+    # Baseline follows the fastest recent RTT and drifts up slowly so a sustained new latency
+    # regime is eventually accepted instead of throttling forever.
+
+    __slots__ = ("baseline", "ewma")
+
+    def __init__(self, rtt_seconds: float):
+        self.baseline = rtt_seconds
+        self.ewma = rtt_seconds
+
+    def observe(self, rtt_seconds: float, smoothing: float, baseline_drift: float) -> None:
+        self.ewma += (rtt_seconds - self.ewma) * smoothing
+        if rtt_seconds < self.baseline:
+            self.baseline = rtt_seconds
+        else:
+            self.baseline += (rtt_seconds - self.baseline) * baseline_drift
+
+
+class AimdConcurrencyLimit:
+    # Additive-increase / multiplicative-decrease limit driven by upstream round-trip times.
+    # Operations on one upstream differ by orders of magnitude in latency, so each keeps its own
+    # RTT estimate; inflated latency only counts as congestion while the limit is nearly used
+    # up, since a slow call on an idle upstream is just a slow call.
+
+    def __init__(
+        self,
+        initial_limit: int,
+        min_limit: int,
+        max_limit: int,
+        latency_tolerance: float = 2.0,
+        backoff_ratio: float = 0.9,
+        smoothing: float = 0.2,
+        baseline_drift: float = 0.01,
+        saturation_ratio: float = 0.8,
+    ):
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.latency_tolerance = latency_tolerance
+        self.backoff_ratio = backoff_ratio
+        self.smoothing = smoothing
+        self.baseline_drift = baseline_drift
+        self.saturation_ratio = saturation_ratio
+        self.rtt: dict[str, RttEstimate] = {}
+        self._limit = float(min(self.max_limit, max(self.min_limit, initial_limit)))
+        self._last_decrease = float("-inf")
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    def update(
+        self,
+        rtt_seconds: float,
+        overloaded: bool,
+        in_flight: int,
+        now: float | None = None,
+        operation: str = "unspecified",
+    ) -> int:
+        now = time.monotonic() if now is None else now
+        estimate = self.rtt.get(operation)
+        if not overloaded:
+            if estimate is None:
+                estimate = self.rtt[operation] = RttEstimate(rtt_seconds)
+            else:
+                estimate.observe(rtt_seconds, self.smoothing, self.baseline_drift)
+
+        congested = overloaded or (
+            estimate is not None
+            and estimate.ewma > estimate.baseline * self.latency_tolerance
+            and in_flight >= self._limit * self.saturation_ratio
+        )
+        if congested:
+            # Back off at most once per smoothed RTT so one slow burst cannot collapse the limit.
+            if now - self._last_decrease >= (estimate.ewma if estimate is not None else 0.0):
+                self._limit = max(self.min_limit, self._limit * self.backoff_ratio)
+                self._last_decrease = now
+        elif in_flight * 2 >= self._limit:
+            # Only grow while the current limit is actually being used.
+            self._limit = min(self.max_limit, self._limit + 1.0 / self._limit)
+        return self.limit
@@ -0,0 +1,154 @@
+import asyncio
+import time
+from collections import deque
+from urllib.parse import urlsplit
+
+from app.clients.adaptive_limit import AimdConcurrencyLimit
+from app.config import settings
+from app.metrics import (
+    UPSTREAM_CONCURRENCY_LIMIT,
+    UPSTREAM_IN_FLIGHT,
+    UPSTREAM_QUEUE_WAIT,
+    UPSTREAM_QUEUED,
+    UPSTREAM_REJECTED,
+    UPSTREAM_RTT_BASELINE,
+    UPSTREAM_RTT_SMOOTHED,
+)
+
+
+class Bulkhead:
+    def __init__(
+        self,
+        name: str,
+        max_concurrency: int,
+        max_queue: int,
+        queue_timeout_seconds: float,
+        adaptive_limit: AimdConcurrencyLimit | None = None,
+    ):
+        self.name = name
+        self.adaptive_limit = adaptive_limit
+        self.limit = adaptive_limit.limit if adaptive_limit is not None else max(1, max_concurrency)
+        self.max_queue = max(0, max_queue)
+        self.queue_timeout_seconds = queue_timeout_seconds
+        self.in_flight = 0
+        self._waiters: deque[asyncio.Future[None]] = deque()
+        self._in_flight_gauge = UPSTREAM_IN_FLIGHT.labels(upstream=name)
+        self._queued_gauge = UPSTREAM_QUEUED.labels(upstream=name)
+        self._queue_wait = UPSTREAM_QUEUE_WAIT.labels(upstream=name)
+        self._limit_gauge = UPSTREAM_CONCURRENCY_LIMIT.labels(upstream=name)
+        self._limit_gauge.set(self.limit)
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self) -> bool:
+        if self.in_flight < self.limit and not self._waiters:
+            self._admit()
+            self._queue_wait.observe(0.0)
+            return True
+        if len(self._waiters) >= self.max_queue:
+            UPSTREAM_REJECTED.labels(upstream=self.name, reason="queue_full").inc()
+            return False
+
+        waiter: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self._queued_gauge.set(len(self._waiters))
+        started = time.perf_counter()
+        try:
+            async with asyncio.timeout(self.queue_timeout_seconds):
+                await waiter
+        except TimeoutError:
+            if self._abandon(waiter):
+                self._queue_wait.observe(time.perf_counter() - started)
+                return True
+            UPSTREAM_REJECTED.labels(upstream=self.name, reason="queue_timeout").inc()
+            return False
+        except asyncio.CancelledError:
+            if self._abandon(waiter):
+                self.release()
+            raise
+        self._queue_wait.observe(time.perf_counter() - started)
+        return True
+
+    def release(self) -> None:
+        self.in_flight -= 1
+        self._in_flight_gauge.set(self.in_flight)
+        self._wake_waiters()
+
+    def record_sample(
+        self, rtt_seconds: float, overloaded: bool, operation: str = "unspecified"
+    ) -> None:
+        adaptive_limit = self.adaptive_limit
+        if adaptive_limit is None:
+            return
+        self.limit = adaptive_limit.update(
+            rtt_seconds, overloaded, self.in_flight, operation=operation
+        )
+        self._limit_gauge.set(self.limit)
+        estimate = adaptive_limit.rtt.get(operation)
+        if estimate is not None:
+            UPSTREAM_RTT_BASELINE.labels(upstream=self.name, operation=operation).set(
+                estimate.baseline
+            )
+            UPSTREAM_RTT_SMOOTHED.labels(upstream=self.name, operation=operation).set(estimate.ewma)
+        self._wake_waiters()
+
+    def _admit(self) -> None:
+        self.in_flight += 1
+        self._in_flight_gauge.set(self.in_flight)
+
+    def _abandon(self, waiter: asyncio.Future[None]) -> bool:
+        # Returns True when the slot was handed over before the waiter gave up.
+        if waiter.done() and not waiter.cancelled():
+            return True
+        if waiter in self._waiters:
+            self._waiters.remove(waiter)
+        self._queued_gauge.set(len(self._waiters))
+        waiter.cancel()
+        return False
+
+    def _wake_waiters(self) -> None:
+        while self._waiters and self.in_flight < self.limit:
+            waiter = self._waiters.popleft()
+            if waiter.done():
+                continue
+            self._admit()
+            waiter.set_result(None)
+        self._queued_gauge.set(len(self._waiters))
+
+
+_BULKHEADS: dict[str, Bulkhead] = {}
+
+
+def upstream_origin(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+def upstream_bulkhead(url: str) -> Bulkhead:
+    origin = upstream_origin(url)
+    bulkhead = _BULKHEADS.get(origin)
+    if bulkhead is None:
+        max_concurrency = settings.upstream_bulkhead_max_concurrency_overrides.get(
+            origin, settings.upstream_bulkhead_max_concurrency
+        )
+        bulkhead = Bulkhead(
+            name=origin,
+            max_concurrency=max_concurrency,
+            max_queue=settings.upstream_bulkhead_max_queue,
+            queue_timeout_seconds=settings.upstream_bulkhead_queue_timeout_seconds,
+            adaptive_limit=(
+                AimdConcurrencyLimit(
+                    initial_limit=settings.upstream_adaptive_initial_concurrency,
+                    min_limit=settings.upstream_adaptive_min_concurrency,
+                    max_limit=max_concurrency,
+                    latency_tolerance=settings.upstream_adaptive_latency_tolerance,
+                    backoff_ratio=settings.upstream_adaptive_backoff_ratio,
+                )
+                if settings.upstream_adaptive_concurrency_enabled
+                else None
+            ),
+        )
+        _BULKHEADS[origin] = bulkhead
+    return bulkhead
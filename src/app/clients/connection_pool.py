@@ -0,0 +1,228 @@
+import asyncio
+import ipaddress
+import logging
+import socket
+import time
+import urllib.request
+import weakref
+from collections.abc import Iterable
+from urllib.parse import urlsplit
+
+import httpcore
+import httpx
+
+from app.clients.bulkhead import upstream_origin
+from app.clients.load_balancing import split_base_urls
+from app.config import settings
+
+logger = logging.getLogger("upstream_connection_pool")
+
+
+class DnsCache:
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._entries: dict[tuple[str, int], tuple[float, list[str]]] = {}
+
+    async def resolve(self, host: str, port: int, now: float | None = None) -> list[str]:
+        try:
+            ipaddress.ip_address(host)
+        except ValueError:
+            pass
+        else:
+            return [host]
+        now = time.monotonic() if now is None else now
+        cached = self._entries.get((host, port))
+        if cached is not None and cached[0] > now:
+            return cached[1]
+        try:
+            infos = await asyncio.get_running_loop().getaddrinfo(
+                host, port, type=socket.SOCK_STREAM
+            )
+        except OSError as exc:
+            raise httpcore.ConnectError(f"DNS resolution failed for {host}: {exc}") from exc
+        addresses = list(dict.fromkeys(str(info[4][0]) for info in infos))
+        self._entries[(host, port)] = (now + self.ttl_seconds, addresses)
+        return addresses
+
+    def invalidate(self, host: str, port: int) -> None:
+        self._entries.pop((host, port), None)
+
+
+class _DnsCachingBackend(httpcore.AsyncNetworkBackend):
+    def __init__(self, dns_cache: DnsCache, backend: httpcore.AsyncNetworkBackend | None = None):
+        self._dns_cache = dns_cache
+        self._backend = backend or httpcore.AnyIOBackend()
+
+    async def connect_tcp(
+        self,
+        host: str,
+        port: int,
+        timeout: float | None = None,
+        local_address: str | None = None,
+        socket_options: Iterable[httpcore.SOCKET_OPTION] | None = None,
+    ) -> httpcore.AsyncNetworkStream:
+        last_error: Exception | None = None
+        for address in await self._dns_cache.resolve(host, port):
+            try:
+                return await self._backend.connect_tcp(
+                    address,
+                    port,
+                    timeout=timeout,
+                    local_address=local_address,
+                    socket_options=socket_options,
+                )
+            except (httpcore.ConnectError, httpcore.ConnectTimeout) as exc:
+                last_error = exc
+        # Every cached address failed; the record may be stale, so resolve again next time.
+        self._dns_cache.invalidate(host, port)
+        assert last_error is not None
+        raise last_error
+
+    async def connect_unix_socket(
+        self,
+        path: str,
+        timeout: float | None = None,
+        socket_options: Iterable[httpcore.SOCKET_OPTION] | None = None,
+    ) -> httpcore.AsyncNetworkStream:
+        return await self._backend.connect_unix_socket(
+            path, timeout=timeout, socket_options=socket_options
+        )
+
+    async def sleep(self, seconds: float) -> None:
+        await self._backend.sleep(seconds)
+
+
+class UpstreamTransport(httpx.AsyncHTTPTransport):
+    # Shared by the short-lived per-call AsyncClient instances, so closing a client must not
+    # close the keep-alive pool; shutdown() does that once at application exit.
+
+    def __init__(self, limits: httpx.Limits, dns_cache: DnsCache, proxy: str | None = None):
+        super().__init__(limits=limits, proxy=proxy)
+        self.proxy = proxy
+        if proxy is not None:
+            # Names are resolved by the proxy, so the DNS cache has nothing to do.
+            return
+        # httpx does not expose the network backend, so rebuild its pool with the DNS cache.
+        self._pool = httpcore.AsyncConnectionPool(
+            ssl_context=httpx.create_ssl_context(),
+            max_connections=limits.max_connections,
+            max_keepalive_connections=limits.max_keepalive_connections,
+            keepalive_expiry=limits.keepalive_expiry,
+            network_backend=_DnsCachingBackend(dns_cache),
+        )
+
+    async def __aexit__(self, *args: object) -> None:
+        return None
+
+    async def aclose(self) -> None:
+        return None
+
+    async def shutdown(self) -> None:
+        await self._pool.aclose()
+
+
+_DNS_CACHE = DnsCache(ttl_seconds=settings.upstream_dns_cache_ttl_seconds)
+# Connection pools are bound to the event loop that opened them.
+_TRANSPORTS: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[str, UpstreamTransport]] = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def environment_proxy(origin: str) -> str | None:
+    # Passing transport= to AsyncClient turns off its trust_env proxy handling, so
+    # HTTP_PROXY / HTTPS_PROXY / ALL_PROXY and NO_PROXY are applied here, once per origin.
+    parts = urlsplit(origin)
+    proxies = urllib.request.getproxies_environment()
+    proxy = proxies.get(parts.scheme) or proxies.get("all")
+    if not proxy or urllib.request.proxy_bypass(parts.netloc):
+        return None
+    return proxy
+
+
+def upstream_transport(url: str) -> UpstreamTransport:
+    transports = _TRANSPORTS.setdefault(asyncio.get_running_loop(), {})
+    origin = upstream_origin(url)
+    transport = transports.get(origin)
+    if transport is None:
+        transport = UpstreamTransport(
+            limits=httpx.Limits(
+                max_connections=settings.upstream_pool_max_connections,
+                max_keepalive_connections=settings.upstream_pool_max_keepalive_connections,
+                keepalive_expiry=settings.upstream_pool_keepalive_expiry_seconds,
+            ),
+            dns_cache=_DNS_CACHE,
+            proxy=environment_proxy(origin),
+        )
+        transports[origin] = transport
+    return transport
+
+
+async def close_upstream_transports() -> None:
+    transports = _TRANSPORTS.pop(asyncio.get_running_loop(), {})
+    for transport in transports.values():
+        await transport.shutdown()
+
+
+def configured_upstream_origins() -> list[str]:
+    configured = (
+        settings.decisioning_service_base_url,
+        settings.portfolio_data_platform_base_url,
+        settings.portfolio_data_ingestion_base_url,
+        settings.performance_analytics_base_url,
+        settings.risk_analytics_base_url,
+        settings.reporting_aggregation_base_url,
+        settings.management_service_base_url,
+    )
+    origins = (upstream_origin(url) for value in configured for url in split_base_urls(value))
+    return list(dict.fromkeys(origins))
+
+
+async def _warm_origin(origin: str, connections: int) -> bool:
+    try:
+        transport = upstream_transport(origin)
+        if transport.proxy is None:
+            parts = httpx.URL(origin)
+            await _DNS_CACHE.resolve(
+                parts.host, parts.port or (443 if parts.scheme == "https" else 80)
+            )
+        # No per-request timeout: warm_up_upstreams bounds the whole warm-up with one deadline.
+        async with httpx.AsyncClient(transport=transport, timeout=None) as client:
+            # Concurrent requests force distinct connections that then stay in the keep-alive pool.
+            await asyncio.gather(
+                *(
+                    client.get(f"{origin}{settings.upstream_warmup_path}")
+                    for _ in range(connections)
+                )
+            )
+    except Exception as exc:
+        # Warm-up is best effort: a malformed origin must not fail the others or the startup.
+        logger.warning(
+            "upstream_warmup.failed",
+            extra={"extra_fields": {"upstream": origin, "error": exc.__class__.__name__}},
+        )
+        return False
+    return True
+
+
+async def warm_up_upstreams(
+    origins: list[str] | None = None,
+    connections: int | None = None,
+    timeout_seconds: float | None = None,
+) -> dict[str, bool]:
+    origins = configured_upstream_origins() if origins is None else origins
+    connections = settings.upstream_warmup_connections if connections is None else connections
+    timeout_seconds = (
+        settings.upstream_warmup_timeout_seconds if timeout_seconds is None else timeout_seconds
+    )
+    if connections <= 0 or not origins:
+        return {}
+    tasks = {origin: asyncio.create_task(_warm_origin(origin, connections)) for origin in origins}
+    done, pending = await asyncio.wait(tasks.values(), timeout=timeout_seconds)
+    for task in pending:
+        task.cancel()
+    if pending:
+        await asyncio.wait(pending)
+        logger.warning(
+            "upstream_warmup.timed_out", extra={"extra_fields": {"pending": len(pending)}}
+        )
+    return {origin: task in done and task.result() for origin, task in tasks.items()}
@@ -1,6 +1,7 @@
 from typing import Any
 
-from app.clients.http_resilience import request_with_retry
+from app.clients.http_resilience import DEFAULT_RETRY_STATUS_CODES, request_with_retry
+from app.clients.load_balancing import upstream_base_url
 from app.middleware.correlation import propagation_headers
 
 
@@ -11,11 +12,15 @@ class DpmClient:
         timeout_seconds: float,
         max_retries: int = 2,
         retry_backoff_seconds: float = 0.2,
+        retry_status_codes: set[int] | frozenset[int] | None = None,
     ):
-        self._base_url = base_url.rstrip("/")
+        self._base_url = upstream_base_url(base_url)
         self._timeout = timeout_seconds
         self._max_retries = max_retries
         self._retry_backoff_seconds = retry_backoff_seconds
+        self._retry_status_codes = (
+            DEFAULT_RETRY_STATUS_CODES if retry_status_codes is None else retry_status_codes
+        )
 
     async def simulate_proposal(
         self,
@@ -27,6 +32,7 @@ class DpmClient:
             "/api/v1/rebalance/proposals/simulate",
             body=body,
             headers=self._headers(correlation_id, {"Idempotency-Key": idempotency_key}),
+            operation="simulate_proposal",
         )
 
     async def create_proposal(
@@ -39,6 +45,7 @@ class DpmClient:
             "/api/v1/rebalance/proposals",
             body=body,
             headers=self._headers(correlation_id, {"Idempotency-Key": idempotency_key}),
+            operation="create_proposal",
         )
 
     async def list_proposals(
@@ -51,6 +58,7 @@ class DpmClient:
             "/api/v1/rebalance/proposals",
             params=cleaned_params,
             headers=self._headers(correlation_id),
+            operation="list_proposals",
         )
 
     async def list_runs(
@@ -63,6 +71,7 @@ class DpmClient:
             "/api/v1/rebalance/runs",
             params=cleaned_params,
             headers=self._headers(correlation_id),
+            operation="list_runs",
         )
 
     async def get_proposal(
@@ -75,6 +84,7 @@ class DpmClient:
             f"/api/v1/rebalance/proposals/{proposal_id}",
             params={"include_evidence": str(include_evidence).lower()},
             headers=self._headers(correlation_id),
+            operation="get_proposal",
         )
 
     async def get_proposal_version(
@@ -88,6 +98,7 @@ class DpmClient:
             f"/api/v1/rebalance/proposals/{proposal_id}/versions/{version_no}",
             params={"include_evidence": str(include_evidence).lower()},
             headers=self._headers(correlation_id),
+            operation="get_proposal_version",
         )
 
     async def create_proposal_version(
@@ -101,6 +112,7 @@ class DpmClient:
             f"/api/v1/rebalance/proposals/{proposal_id}/versions",
             body=body,
             headers=self._headers(correlation_id, {"Idempotency-Key": idempotency_key}),
+            operation="create_proposal_version",
         )
 
     async def transition_proposal(
@@ -114,6 +126,7 @@ class DpmClient:
             f"/api/v1/rebalance/proposals/{proposal_id}/transitions",
             body=body,
             headers=self._headers(correlation_id, {"Idempotency-Key": idempotency_key}),
+            operation="transition_proposal",
         )
 
     async def record_approval(
@@ -127,6 +140,7 @@ class DpmClient:
             f"/api/v1/rebalance/proposals/{proposal_id}/approvals",
             body=body,
             headers=self._headers(correlation_id, {"Idempotency-Key": idempotency_key}),
+            operation="record_approval",
         )
 
     async def get_workflow_events(
@@ -138,6 +152,7 @@ class DpmClient:
             f"/api/v1/rebalance/proposals/{proposal_id}/workflow-events",
             params={},
             headers=self._headers(correlation_id),
+            operation="get_workflow_events",
         )
 
     async def get_approvals(
@@ -149,6 +164,7 @@ class DpmClient:
             f"/api/v1/rebalance/proposals/{proposal_id}/approvals",
             params={},
             headers=self._headers(correlation_id),
+            operation="get_approvals",
         )
 
     async def get_capabilities(
@@ -161,6 +177,7 @@ class DpmClient:
             "/api/v1/platform/capabilities",
             params={"consumerSystem": consumer_system, "tenantId": tenant_id},
             headers=self._headers(correlation_id),
+            operation="get_capabilities",
         )
 
     def _headers(
@@ -178,6 +195,7 @@ class DpmClient:
         path: str,
         body: dict[str, Any],
         headers: dict[str, str],
+        operation: str,
     ) -> tuple[int, dict[str, Any]]:
         url = f"{self._base_url}{path}"
         return await request_with_retry(
@@ -186,8 +204,11 @@ class DpmClient:
             timeout_seconds=self._timeout,
             max_retries=self._max_retries,
             backoff_seconds=self._retry_backoff_seconds,
+            retry_status_codes=self._retry_status_codes,
+            retry_policy="idempotent",
             json_body=body,
             headers=headers,
+            operation=operation,
         )
 
     async def _get(
@@ -195,6 +216,7 @@ class DpmClient:
         path: str,
         params: dict[str, Any],
         headers: dict[str, str],
+        operation: str,
     ) -> tuple[int, dict[str, Any]]:
         url = f"{self._base_url}{path}"
         return await request_with_retry(
@@ -203,6 +225,9 @@ class DpmClient:
             timeout_seconds=self._timeout,
             max_retries=self._max_retries,
             backoff_seconds=self._retry_backoff_seconds,
+            retry_status_codes=self._retry_status_codes,
+            retry_policy="safe",
             params=params,
             headers=headers,
+            operation=operation,
         )
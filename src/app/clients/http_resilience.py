@@ -1,19 +1,140 @@
 import asyncio
-from typing import Any
+import random
+import time
+from datetime import UTC, datetime
+from email.utils import parsedate_to_datetime
+from typing import Any, Literal
 
 import httpx
 
+from app import json_codec
+from app.clients.bulkhead import upstream_bulkhead
+from app.clients.connection_pool import upstream_transport
+from app.clients.json_stream import IncrementalObjectParser, StreamedArrayField
+from app.clients.load_balancing import route_upstream
+from app.clients.upstream_names import upstream_service_name
+from app.config import settings
+from app.flight_recorder import record_phase
+from app.metrics import (
+    UPSTREAM_REQUEST_DURATION,
+    UPSTREAM_REQUESTS,
+    UPSTREAM_RESPONSE_BYTES,
+    UPSTREAM_RETRIES,
+    UPSTREAM_TIMEOUTS,
+)
+from app.middleware.server_timing import record_upstream_timing
+from app.tracing import TRACER
 
-def _response_payload(response: httpx.Response) -> dict[str, Any]:
+_OVERLOAD_STATUS_CODES = frozenset({429, 503, 504})
+DEFAULT_RETRY_STATUS_CODES = frozenset({429, 502, 503, 504})
+_jitter = random.Random()
+
+RetryPolicy = Literal["safe", "idempotent", "non_idempotent"]
+# Failures raised before any request bytes reach the upstream; the only ones that are safe to
+# retry for calls that would otherwise repeat a side effect.
+_CONNECT_PHASE_FAILURES = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+
+def _resolve_retry_policy(
+    method: str, headers: dict[str, str] | None, retry_policy: RetryPolicy | None
+) -> RetryPolicy:
+    has_idempotency_key = any(key.lower() == "idempotency-key" for key in headers or {})
+    if retry_policy is None:
+        if method.upper() == "GET":
+            return "safe"
+        return "idempotent" if has_idempotency_key else "non_idempotent"
+    if retry_policy == "idempotent" and not has_idempotency_key:
+        return "non_idempotent"
+    return retry_policy
+
+
+def _retry_after_seconds(header: str | None) -> float | None:
+    if not header:
+        return None
+    header = header.strip()
     try:
-        payload = response.json()
+        seconds = float(header)
     except ValueError:
-        payload = {"detail": response.text}
+        try:
+            retry_at = parsedate_to_datetime(header)
+        except (TypeError, ValueError):
+            return None
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=UTC)
+        seconds = (retry_at - datetime.now(UTC)).total_seconds()
+    return max(0.0, seconds)
+
+
+def _next_backoff(base_seconds: float, previous_seconds: float) -> float:
+    # Decorrelated jitter: spreads retries from many workers instead of retrying in lockstep.
+    upper = max(base_seconds, previous_seconds * 3)
+    return min(settings.upstream_retry_max_backoff_seconds, _jitter.uniform(base_seconds, upper))
+
+
+def _status_class(status_code: int) -> str:
+    return f"{status_code // 100}xx"
+
+
+def _body_payload(body: bytes, encoding: str | None) -> dict[str, Any]:
+    try:
+        payload = json_codec.loads(body)
+    except ValueError:
+        payload = {"detail": body.decode(encoding or "utf-8", errors="replace")}
+    return _as_payload_dict(payload)
+
+
+def _as_payload_dict(payload: Any) -> dict[str, Any]:
     if isinstance(payload, dict):
         return payload
     return {"detail": payload}
 
 
+def _oversized_payload(max_response_bytes: int) -> dict[str, Any]:
+    return {
+        "detail": f"upstream response exceeded {max_response_bytes} bytes",
+        "error_code": "UPSTREAM_RESPONSE_TOO_LARGE",
+    }
+
+
+async def _read_payload(
+    response: httpx.Response,
+    max_response_bytes: int,
+    stream_array: StreamedArrayField | None,
+) -> dict[str, Any] | None:
+    try:
+        declared_length = int(response.headers.get("content-length", "-1"))
+    except ValueError:
+        declared_length = -1
+    if declared_length > max_response_bytes:
+        return None
+
+    parser = (
+        IncrementalObjectParser(stream_array)
+        if stream_array is not None and response.status_code < 400
+        else None
+    )
+    body = bytearray()
+    received = 0
+    async for chunk in response.aiter_bytes():
+        received += len(chunk)
+        if received > max_response_bytes:
+            return None
+        if parser is not None:
+            try:
+                parser.feed(chunk)
+            except ValueError:
+                return {"detail": "upstream returned an invalid JSON payload"}
+        else:
+            body.extend(chunk)
+
+    if parser is None:
+        return _body_payload(bytes(body), response.encoding)
+    try:
+        return _as_payload_dict(parser.close())
+    except ValueError:
+        return {"detail": "upstream returned an invalid JSON payload"}
+
+
 async def request_with_retry(
     *,
     method: str,
@@ -21,36 +142,155 @@ async def request_with_retry(
     timeout_seconds: float,
     max_retries: int = 2,
     backoff_seconds: float = 0.2,
-    retry_status_codes: set[int] | None = None,
+    retry_status_codes: set[int] | frozenset[int] | None = None,
     params: dict[str, Any] | None = None,
     headers: dict[str, str] | None = None,
     json_body: dict[str, Any] | None = None,
     data: dict[str, Any] | None = None,
     files: dict[str, Any] | None = None,
+    max_response_bytes: int | None = None,
+    stream_array: StreamedArrayField | None = None,
+    retry_policy: RetryPolicy | None = None,
+    operation: str = "unspecified",
 ) -> tuple[int, dict[str, Any]]:
+    response_limit = (
+        max_response_bytes
+        if max_response_bytes is not None
+        else settings.upstream_max_response_bytes
+    )
+    if _resolve_retry_policy(method, headers, retry_policy) == "non_idempotent":
+        retryable_failures: tuple[type[Exception], ...] = _CONNECT_PHASE_FAILURES
+        retry_status_codes = None
+    else:
+        retryable_failures = (httpx.TimeoutException, httpx.NetworkError)
+    backoff = backoff_seconds
     attempts = max_retries + 1
-    for attempt in range(attempts):
-        try:
-            async with httpx.AsyncClient(timeout=timeout_seconds) as client:
-                if method.upper() == "GET":
-                    response = await client.get(url, params=params, headers=headers)
-                else:
-                    response = await client.post(
-                        url,
-                        headers=headers,
-                        json=json_body,
-                        data=data,
-                        files=files,
-                    )
-
-            should_retry_status = retry_status_codes and response.status_code in retry_status_codes
-            if should_retry_status and attempt < max_retries:
-                await asyncio.sleep(backoff_seconds * (2**attempt))
-                continue
-            return response.status_code, _response_payload(response)
-        except (httpx.TimeoutException, httpx.NetworkError) as exc:
-            if attempt >= max_retries:
-                return 503, {"detail": f"upstream communication failure: {exc.__class__.__name__}"}
-            await asyncio.sleep(backoff_seconds * (2**attempt))
-
-    return 503, {"detail": "upstream communication failure: exhausted retries"}
+    upstream = upstream_service_name(url)
+    attempted = 0
+    started_call = time.perf_counter()
+    try:
+        for attempt in range(attempts):
+            attempted = attempt + 1
+            # Each attempt picks a replica afresh so retries can route around a failing one.
+            target_url, endpoint = route_upstream(url)
+            bulkhead = upstream_bulkhead(target_url)
+            if not await bulkhead.acquire():
+                return 503, {
+                    "detail": f"upstream bulkhead saturated: {bulkhead.name}",
+                    "error_code": "UPSTREAM_BULKHEAD_REJECTED",
+                }
+            if endpoint is not None:
+                endpoint.start()
+            span = TRACER.start_span(
+                f"{method.upper()} {upstream}",
+                kind="client",
+                attributes={
+                    "peer.service": upstream,
+                    "gateway.operation": operation,
+                    "gateway.attempt": attempted,
+                    "http.method": method.upper(),
+                    "http.url": target_url,
+                },
+            )
+            # Downstream spans parent onto this attempt rather than onto the inbound request.
+            attempt_headers = {**(headers or {}), "traceparent": span.traceparent}
+            endpoint_failed = False
+            failure: Exception | None = None
+            should_retry_status = False
+            payload: dict[str, Any] | None = None
+            status_code = 503
+            retry_after: float | None = None
+            status_class = "network_error"
+            started = time.perf_counter()
+            try:
+                async with httpx.AsyncClient(
+                    timeout=timeout_seconds, transport=upstream_transport(target_url)
+                ) as client:
+                    if method.upper() == "GET":
+                        stream = client.stream(
+                            "GET", target_url, params=params, headers=attempt_headers
+                        )
+                    else:
+                        stream = client.stream(
+                            "POST",
+                            target_url,
+                            headers=attempt_headers,
+                            json=json_body,
+                            data=data,
+                            files=files,
+                        )
+                    async with stream as response:
+                        status_code = response.status_code
+                        status_class = _status_class(status_code)
+                        retry_after = _retry_after_seconds(response.headers.get("retry-after"))
+                        should_retry_status = (
+                            bool(retry_status_codes and status_code in retry_status_codes)
+                            and attempt < max_retries
+                            and (
+                                retry_after is None
+                                or retry_after <= settings.upstream_retry_after_max_seconds
+                            )
+                        )
+                        if not should_retry_status:
+                            parse_started = time.perf_counter()
+                            payload = await _read_payload(response, response_limit, stream_array)
+                            record_phase(
+                                "parse",
+                                f"{upstream}.{operation}",
+                                parse_started,
+                                time.perf_counter() - parse_started,
+                            )
+                            UPSTREAM_RESPONSE_BYTES.labels(upstream, operation).observe(
+                                response.num_bytes_downloaded
+                            )
+                        bulkhead.record_sample(
+                            time.perf_counter() - started,
+                            status_code in _OVERLOAD_STATUS_CODES,
+                            operation,
+                        )
+                        endpoint_failed = status_code >= 500
+            except (httpx.TimeoutException, httpx.NetworkError) as exc:
+                failure = exc
+                endpoint_failed = True
+                if isinstance(exc, httpx.TimeoutException):
+                    status_class = "timeout"
+                    UPSTREAM_TIMEOUTS.labels(upstream, operation).inc()
+                    bulkhead.record_sample(time.perf_counter() - started, True, operation)
+            finally:
+                elapsed = time.perf_counter() - started
+                bulkhead.release()
+                if endpoint is not None:
+                    endpoint.finish(elapsed, endpoint_failed)
+                span.attributes["gateway.status_class"] = status_class
+                if failure is None:
+                    span.attributes["http.status_code"] = status_code
+                TRACER.end_span(span, error=endpoint_failed)
+                record_phase(
+                    "upstream",
+                    f"{upstream}.{operation}",
+                    started,
+                    elapsed,
+                    attempt=attempted,
+                    status_class=status_class,
+                )
+                UPSTREAM_REQUESTS.labels(upstream, operation, status_class, attempted).inc()
+                UPSTREAM_REQUEST_DURATION.labels(
+                    upstream, operation, status_class, attempted
+                ).observe(elapsed)
+
+            if failure is not None:
+                if attempt >= max_retries or not isinstance(failure, retryable_failures):
+                    return 503, {
+                        "detail": f"upstream communication failure: {failure.__class__.__name__}"
+                    }
+            elif not should_retry_status:
+                if payload is None:
+                    return 502, _oversized_payload(response_limit)
+                return status_code, payload
+            UPSTREAM_RETRIES.labels(upstream, operation, status_class).inc()
+            backoff = _next_backoff(backoff_seconds, backoff)
+            await asyncio.sleep(max(backoff, retry_after or 0.0))
+
+        return 503, {"detail": "upstream communication failure: exhausted retries"}
+    finally:
+        record_upstream_timing(upstream, operation, attempted, time.perf_counter() - started_call)
@@ -0,0 +1,136 @@
+import codecs
+import json
+from collections.abc import Callable
+from typing import Any
+
+from app import json_codec
+
+_WHITESPACE = " \t\n\r"
+_VALUE_DELIMITERS = frozenset(_WHITESPACE + ",:]}")
+_COMPACT_AFTER_CHARS = 65_536
+_DECODER = json.JSONDecoder()
+
+
+class StreamedArrayField:
+    def __init__(self, key: str, transform: Callable[[Any], Any] | None = None):
+        self.key = key
+        self.transform = transform
+
+
+class IncrementalObjectParser:
+    # Parses a top-level JSON object fed in chunks. Elements of the streamed array field are
+    # decoded (and optionally projected) one at a time, so only the unparsed tail of the body
+    # is held as text; other members are small and decoded whole.
+
+    def __init__(self, field: StreamedArrayField):
+        self._field = field
+        self._text_decoder = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._pos = 0
+        self._state = "start"
+        self._key = ""
+        self._items: list[Any] = []
+        self._result: dict[str, Any] = {}
+        self._passthrough = False
+
+    def feed(self, chunk: bytes) -> None:
+        self._buffer += self._text_decoder.decode(chunk)
+        self._advance(final=False)
+
+    def close(self) -> Any:
+        self._buffer += self._text_decoder.decode(b"", final=True)
+        if self._passthrough:
+            return json_codec.loads(self._buffer)
+        self._advance(final=True)
+        if self._state != "done":
+            raise ValueError("incomplete JSON payload")
+        return self._result
+
+    def _decode_value(self, final: bool) -> tuple[bool, Any]:
+        try:
+            value, end = _DECODER.raw_decode(self._buffer, self._pos)
+        except json.JSONDecodeError:
+            if final:
+                raise
+            return False, None
+        if not final and (end >= len(self._buffer) or self._buffer[end] not in _VALUE_DELIMITERS):
+            # A number cut at a chunk boundary ("1." or "-1.5e") decodes as a shorter number.
+            return False, None
+        self._pos = end
+        return True, value
+
+    def _advance(self, final: bool) -> None:
+        buffer = self._buffer
+        while not self._passthrough:
+            while self._pos < len(buffer) and buffer[self._pos] in _WHITESPACE:
+                self._pos += 1
+            if self._pos >= len(buffer):
+                break
+            char = buffer[self._pos]
+            state = self._state
+            if state == "start":
+                if char != "{":
+                    self._passthrough = True
+                    return
+                self._pos += 1
+                self._state = "key_or_end"
+            elif state == "key_or_end":
+                if char == "}":
+                    self._pos += 1
+                    self._state = "done"
+                else:
+                    self._state = "key"
+            elif state == "key":
+                complete, key = self._decode_value(final)
+                if not complete:
+                    break
+                if not isinstance(key, str):
+                    raise ValueError("invalid JSON object key")
+                self._key = key
+                self._state = "colon"
+            elif state == "colon":
+                if char != ":":
+                    raise ValueError("expected ':' in JSON object")
+                self._pos += 1
+                self._state = "value"
+            elif state == "value":
+                if self._key == self._field.key and char == "[":
+                    self._pos += 1
+                    self._items = []
+                    self._result[self._key] = self._items
+                    self._state = "item_or_end"
+                    continue
+                complete, value = self._decode_value(final)
+                if not complete:
+                    break
+                self._result[self._key] = value
+                self._state = "member_separator"
+            elif state == "item_or_end":
+                if char == "]":
+                    self._pos += 1
+                    self._state = "member_separator"
+                else:
+                    self._state = "item"
+            elif state == "item":
+                complete, item = self._decode_value(final)
+                if not complete:
+                    break
+                transform = self._field.transform
+                self._items.append(transform(item) if transform is not None else item)
+                self._state = "item_separator"
+            elif state == "item_separator":
+                if char not in ",]":
+                    raise ValueError("expected ',' or ']' in JSON array")
+                self._pos += 1
+                self._state = "item" if char == "," else "member_separator"
+            elif state == "member_separator":
+                if char not in ",}":
+                    raise ValueError("expected ',' or '}' in JSON object")
+                self._pos += 1
+                self._state = "key" if char == "," else "done"
+            else:
+                raise ValueError("unexpected data after JSON payload")
+
+        if self._pos > _COMPACT_AFTER_CHARS:
+            self._buffer = self._buffer[self._pos :]
+            self._pos = 0
@@ -0,0 +1,115 @@
+import random
+import time
+
+from app.clients.bulkhead import upstream_origin
+from app.config import settings
+from app.metrics import UPSTREAM_EJECTIONS, UPSTREAM_ENDPOINT_EJECTED
+
+_chooser = random.Random()
+
+
+class UpstreamEndpoint:
+    def __init__(self, upstream: str, base_url: str, smoothing: float = 0.3):
+        self.upstream = upstream
+        self.base_url = base_url
+        self.smoothing = smoothing
+        self.in_flight = 0
+        self.rtt_ewma = 0.0
+        self.consecutive_failures = 0
+        self.ejections = 0
+        self.ejected_until = float("-inf")
+        self._ejected = False
+        self._ejected_gauge = UPSTREAM_ENDPOINT_EJECTED.labels(upstream=upstream, endpoint=base_url)
+        self._ejected_gauge.set(0)
+
+    def available(self, now: float) -> bool:
+        if now < self.ejected_until:
+            return False
+        if self._ejected:
+            # The ejection window has passed; the replica is back in rotation even before it
+            # serves a request.
+            self._ejected = False
+            self._ejected_gauge.set(0)
+        return True
+
+    def score(self) -> float:
+        # Unsampled endpoints score zero so new or re-admitted replicas get probed first.
+        return (self.in_flight + 1) * self.rtt_ewma
+
+    def start(self) -> None:
+        self.in_flight += 1
+
+    def finish(self, rtt_seconds: float, failed: bool, now: float | None = None) -> None:
+        now = time.monotonic() if now is None else now
+        self.in_flight = max(0, self.in_flight - 1)
+        if self.rtt_ewma == 0.0:
+            self.rtt_ewma = rtt_seconds
+        else:
+            self.rtt_ewma += (rtt_seconds - self.rtt_ewma) * self.smoothing
+        if not failed:
+            self.consecutive_failures = 0
+            self.ejections = 0
+            return
+        self.consecutive_failures += 1
+        if (
+            self.consecutive_failures >= settings.upstream_outlier_consecutive_failures
+            and self.available(now)
+        ):
+            # A re-admitted endpoint that fails again is ejected for progressively longer.
+            self.ejections += 1
+            self.ejected_until = now + min(
+                settings.upstream_outlier_max_ejection_seconds,
+                settings.upstream_outlier_base_ejection_seconds * self.ejections,
+            )
+            self._ejected = True
+            self._ejected_gauge.set(1)
+            UPSTREAM_EJECTIONS.labels(upstream=self.upstream, endpoint=self.base_url).inc()
+
+
+class UpstreamPool:
+    def __init__(self, base_urls: list[str]):
+        self.primary = base_urls[0]
+        self.endpoints = [
+            UpstreamEndpoint(upstream_origin(self.primary), base_url) for base_url in base_urls
+        ]
+
+    def select(self, now: float | None = None) -> UpstreamEndpoint:
+        now = time.monotonic() if now is None else now
+        candidates = [endpoint for endpoint in self.endpoints if endpoint.available(now)]
+        if not candidates:
+            # Every replica is ejected: spread load over all of them rather than failing outright.
+            candidates = self.endpoints
+        if len(candidates) == 1:
+            return candidates[0]
+        first, second = _chooser.sample(candidates, 2)
+        return first if first.score() <= second.score() else second
+
+    def route(self, url: str, now: float | None = None) -> tuple[str, UpstreamEndpoint]:
+        endpoint = self.select(now)
+        return endpoint.base_url + url[len(self.primary) :], endpoint
+
+
+_POOLS: dict[str, UpstreamPool] = {}
+
+
+def split_base_urls(configured: str) -> list[str]:
+    return [part.strip().rstrip("/") for part in configured.split(",") if part.strip()]
+
+
+def upstream_base_url(configured: str) -> str:
+    base_urls = split_base_urls(configured)
+    if not base_urls:
+        return configured.rstrip("/")
+    if len(base_urls) > 1:
+        origin = upstream_origin(base_urls[0])
+        pool = _POOLS.get(origin)
+        if pool is None or [endpoint.base_url for endpoint in pool.endpoints] != base_urls:
+            _POOLS[origin] = UpstreamPool(base_urls)
+    return base_urls[0]
+
+
+def route_upstream(url: str, now: float | None = None) -> tuple[str, UpstreamEndpoint | None]:
+    pool = _POOLS.get(upstream_origin(url))
+    if pool is None or not url.startswith(pool.primary):
+        return url, None
+    return pool.route(url, now)
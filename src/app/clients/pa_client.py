@@ -1,6 +1,7 @@
 from typing import Any
 
-from app.clients.http_resilience import request_with_retry
+from app.clients.http_resilience import DEFAULT_RETRY_STATUS_CODES, request_with_retry
+from app.clients.load_balancing import upstream_base_url
 from app.middleware.correlation import propagation_headers
 
 
@@ -11,11 +12,15 @@ class PaClient:
         timeout_seconds: float,
         max_retries: int = 2,
         retry_backoff_seconds: float = 0.2,
+        retry_status_codes: set[int] | frozenset[int] | None = None,
     ):
-        self._base_url = base_url.rstrip("/")
+        self._base_url = upstream_base_url(base_url)
         self._timeout = timeout_seconds
         self._max_retries = max_retries
         self._retry_backoff_seconds = retry_backoff_seconds
+        self._retry_status_codes = (
+            DEFAULT_RETRY_STATUS_CODES if retry_status_codes is None else retry_status_codes
+        )
 
     async def get_capabilities(
         self,
@@ -32,8 +37,11 @@ class PaClient:
             timeout_seconds=self._timeout,
             max_retries=self._max_retries,
             backoff_seconds=self._retry_backoff_seconds,
+            retry_status_codes=self._retry_status_codes,
+            retry_policy="safe",
             params=params,
             headers=headers,
+            operation="get_capabilities",
         )
 
     async def get_pas_input_twr(
@@ -58,8 +66,11 @@ class PaClient:
             timeout_seconds=self._timeout,
             max_retries=self._max_retries,
             backoff_seconds=self._retry_backoff_seconds,
+            retry_status_codes=self._retry_status_codes,
+            retry_policy="safe",
             json_body=payload,
             headers=headers,
+            operation="get_pas_input_twr",
         )
 
     async def get_workbench_analytics(
@@ -75,8 +86,11 @@ class PaClient:
             timeout_seconds=self._timeout,
             max_retries=self._max_retries,
             backoff_seconds=self._retry_backoff_seconds,
+            retry_status_codes=self._retry_status_codes,
+            retry_policy="safe",
             json_body=payload,
             headers=headers,
+            operation="get_workbench_analytics",
         )
 
     async def get_workbench_risk_proxy(
@@ -92,6 +106,9 @@ class PaClient:
             timeout_seconds=self._timeout,
             max_retries=self._max_retries,
             backoff_seconds=self._retry_backoff_seconds,
+            retry_status_codes=self._retry_status_codes,
+            retry_policy="safe",
             json_body=payload,
             headers=headers,
+            operation="get_workbench_risk_proxy",
         )
@@ -1,9 +1,22 @@
 from typing import Any
 
-from app.clients.http_resilience import request_with_retry
+from app.clients.http_resilience import DEFAULT_RETRY_STATUS_CODES, request_with_retry
+from app.clients.json_stream import StreamedArrayField
+from app.clients.load_balancing import upstream_base_url
+from app.config import settings
 from app.middleware.correlation import propagation_headers
 
 
+def _lookup_item(item: Any) -> Any:
+    # Lookup selectors only carry id/label; drop the rest of each upstream record while parsing.
+    if not isinstance(item, dict):
+        return item
+    return {key: item[key] for key in ("id", "label") if key in item}
+
+
+_LOOKUP_ITEMS = StreamedArrayField("items", transform=_lookup_item)
+
+
 class PasClient:
     def __init__(
         self,
@@ -11,11 +24,15 @@ class PasClient:
         timeout_seconds: float,
         max_retries: int = 2,
         retry_backoff_seconds: float = 0.2,
+        retry_status_codes: set[int] | frozenset[int] | None = None,
     ):
-        self._base_url = base_url.rstrip("/")
+        self._base_url = upstream_base_url(base_url)
         self._timeout = timeout_seconds
         self._max_retries = max_retries
         self._retry_backoff_seconds = retry_backoff_seconds
+        self._retry_status_codes = (
+            DEFAULT_RETRY_STATUS_CODES if retry_status_codes is None else retry_status_codes
+        )
 
     async def get_capabilities(
         self,
@@ -32,8 +49,11 @@ class PasClient:
             timeout_seconds=self._timeout,
             max_retries=self._max_retries,
             backoff_seconds=self._retry_backoff_seconds,
+            retry_status_codes=self._retry_status_codes,
+            retry_policy="safe",
             params=params,
             headers=headers,
+            operation="get_capabilities",
         )
 
     async def get_effective_policy(
@@ -51,8 +71,11 @@ class PasClient:
             timeout_seconds=self._timeout,
             max_retries=self._max_retries,
             backoff_seconds=self._retry_backoff_seconds,
+            retry_status_codes=self._retry_status_codes,
+            retry_policy="safe",
             params=params,
             headers=headers,
+            operation="get_effective_policy",
         )
 
     async def list_portfolios(
@@ -67,7 +90,10 @@ class PasClient:
             timeout_seconds=self._timeout,
             max_retries=self._max_retries,
             backoff_seconds=self._retry_backoff_seconds,
+            retry_status_codes=self._retry_status_codes,
+            retry_policy="safe",
             headers=headers,
+            operation="list_portfolios",
         )
 
     async def get_core_snapshot(
@@ -91,8 +117,11 @@ class PasClient:
             timeout_seconds=self._timeout,
             max_retries=self._max_retries,
             backoff_seconds=self._retry_backoff_seconds,
+            retry_status_codes=self._retry_status_codes,
+            retry_policy="safe",
             json_body=payload,
             headers=headers,
+            operation="get_core_snapshot",
         )
 
     async def list_instruments(
@@ -109,8 +138,11 @@ class PasClient:
             timeout_seconds=self._timeout,
             max_retries=self._max_retries,
             backoff_seconds=self._retry_backoff_seconds,
+            retry_status_codes=self._retry_status_codes,
+            retry_policy="safe",
             params=params,
             headers=headers,
+            operation="list_instruments",
         )
 
     async def get_portfolio_lookups(
@@ -118,7 +150,10 @@ class PasClient:
         correlation_id: str,
     ) -> tuple[int, dict[str, Any]]:
         return await self._get_lookup(
-            path="/lookups/portfolios", params={}, correlation_id=correlation_id
+            path="/lookups/portfolios",
+            params={},
+            correlation_id=correlation_id,
+            operation="get_portfolio_lookups",
         )
 
     async def get_instrument_lookups(
@@ -130,6 +165,7 @@ class PasClient:
             path="/lookups/instruments",
             params={"limit": limit},
             correlation_id=correlation_id,
+            operation="get_instrument_lookups",
         )
 
     async def get_currency_lookups(
@@ -137,7 +173,10 @@ class PasClient:
         correlation_id: str,
     ) -> tuple[int, dict[str, Any]]:
         return await self._get_lookup(
-            path="/lookups/currencies", params={}, correlation_id=correlation_id
+            path="/lookups/currencies",
+            params={},
+            correlation_id=correlation_id,
+            operation="get_currency_lookups",
         )
 
     async def _get_lookup(
@@ -145,6 +184,7 @@ class PasClient:
         path: str,
         params: dict[str, Any],
         correlation_id: str,
+        operation: str,
     ) -> tuple[int, dict[str, Any]]:
         url = f"{self._base_url}{path}"
         headers = propagation_headers(correlation_id)
@@ -154,8 +194,13 @@ class PasClient:
             timeout_seconds=self._timeout,
             max_retries=self._max_retries,
             backoff_seconds=self._retry_backoff_seconds,
+            retry_status_codes=self._retry_status_codes,
+            retry_policy="safe",
             params=params,
             headers=headers,
+            max_response_bytes=settings.lookup_max_response_bytes,
+            stream_array=_LOOKUP_ITEMS,
+            operation=operation,
         )
 
     async def create_simulation_session(
@@ -178,8 +223,10 @@ class PasClient:
             timeout_seconds=self._timeout,
             max_retries=self._max_retries,
             backoff_seconds=self._retry_backoff_seconds,
+            retry_policy="non_idempotent",
             json_body=payload,
             headers=headers,
+            operation="create_simulation_session",
         )
 
     async def add_simulation_changes(
@@ -197,8 +244,10 @@ class PasClient:
             timeout_seconds=self._timeout,
             max_retries=self._max_retries,
             backoff_seconds=self._retry_backoff_seconds,
+            retry_policy="non_idempotent",
             json_body=payload,
             headers=headers,
+            operation="add_simulation_changes",
         )
 
     async def get_projected_positions(
@@ -214,7 +263,10 @@ class PasClient:
             timeout_seconds=self._timeout,
             max_retries=self._max_retries,
             backoff_seconds=self._retry_backoff_seconds,
+            retry_status_codes=self._retry_status_codes,
+            retry_policy="safe",
             headers=headers,
+            operation="get_projected_positions",
         )
 
     async def get_projected_summary(
@@ -230,5 +282,8 @@ class PasClient:
             timeout_seconds=self._timeout,
             max_retries=self._max_retries,
             backoff_seconds=self._retry_backoff_seconds,
+            retry_status_codes=self._retry_status_codes,
+            retry_policy="safe",
             headers=headers,
+            operation="get_projected_summary",
         )
@@ -1,6 +1,7 @@
 from typing import Any
 
 from app.clients.http_resilience import request_with_retry
+from app.clients.load_balancing import upstream_base_url
 from app.middleware.correlation import propagation_headers
 
 
@@ -12,7 +13,7 @@ class PasIngestionClient:
         max_retries: int = 2,
         retry_backoff_seconds: float = 0.2,
     ):
-        self._base_url = base_url.rstrip("/")
+        self._base_url = upstream_base_url(base_url)
         self._timeout = timeout_seconds
         self._max_retries = max_retries
         self._retry_backoff_seconds = retry_backoff_seconds
@@ -30,8 +31,10 @@ class PasIngestionClient:
             timeout_seconds=self._timeout,
             max_retries=self._max_retries,
             backoff_seconds=self._retry_backoff_seconds,
+            retry_policy="non_idempotent",
             json_body=body,
             headers=headers,
+            operation="ingest_portfolio_bundle",
         )
 
     async def preview_upload(
@@ -49,6 +52,7 @@ class PasIngestionClient:
             content=content,
             extra_data={"sampleSize": str(sample_size)},
             correlation_id=correlation_id,
+            operation="preview_upload",
         )
 
     async def commit_upload(
@@ -66,6 +70,7 @@ class PasIngestionClient:
             content=content,
             extra_data={"allowPartial": "true" if allow_partial else "false"},
             correlation_id=correlation_id,
+            operation="commit_upload",
         )
 
     async def _upload(
@@ -76,6 +81,7 @@ class PasIngestionClient:
         content: bytes,
         extra_data: dict[str, str],
         correlation_id: str,
+        operation: str,
     ) -> tuple[int, dict[str, Any]]:
         url = f"{self._base_url}{path}"
         headers = propagation_headers(correlation_id)
@@ -87,7 +93,9 @@ class PasIngestionClient:
             timeout_seconds=self._timeout,
             max_retries=self._max_retries,
             backoff_seconds=self._retry_backoff_seconds,
+            retry_policy="non_idempotent",
             data=form_data,
             files=files,
             headers=headers,
+            operation=operation,
         )
@@ -1,8 +1,13 @@
 from typing import Any
 
-from app.clients.http_resilience import request_with_retry
+from app.clients.http_resilience import DEFAULT_RETRY_STATUS_CODES, request_with_retry
+from app.clients.json_stream import StreamedArrayField
+from app.clients.load_balancing import upstream_base_url
+from app.config import settings
 from app.middleware.correlation import propagation_headers
 
+_SNAPSHOT_ROWS = StreamedArrayField("rows")
+
 
 class ReportingClient:
     def __init__(
@@ -11,11 +16,15 @@ class ReportingClient:
         timeout_seconds: float,
         max_retries: int = 2,
         retry_backoff_seconds: float = 0.2,
+        retry_status_codes: set[int] | frozenset[int] | None = None,
     ):
-        self._base_url = base_url.rstrip("/")
+        self._base_url = upstream_base_url(base_url)
         self._timeout = timeout_seconds
         self._max_retries = max_retries
         self._retry_backoff_seconds = retry_backoff_seconds
+        self._retry_status_codes = (
+            DEFAULT_RETRY_STATUS_CODES if retry_status_codes is None else retry_status_codes
+        )
 
     async def get_portfolio_snapshot(
         self,
@@ -32,8 +41,13 @@ class ReportingClient:
             timeout_seconds=self._timeout,
             max_retries=self._max_retries,
             backoff_seconds=self._retry_backoff_seconds,
+            retry_status_codes=self._retry_status_codes,
+            retry_policy="safe",
             params=params,
             headers=headers,
+            max_response_bytes=settings.reporting_max_response_bytes,
+            stream_array=_SNAPSHOT_ROWS,
+            operation="get_portfolio_snapshot",
         )
 
     async def get_capabilities(
@@ -51,8 +65,11 @@ class ReportingClient:
             timeout_seconds=self._timeout,
             max_retries=self._max_retries,
             backoff_seconds=self._retry_backoff_seconds,
+            retry_status_codes=self._retry_status_codes,
+            retry_policy="safe",
             params=params,
             headers=headers,
+            operation="get_capabilities",
         )
 
     async def post_portfolio_summary(
@@ -69,8 +86,12 @@ class ReportingClient:
             timeout_seconds=self._timeout,
             max_retries=self._max_retries,
             backoff_seconds=self._retry_backoff_seconds,
+            retry_status_codes=self._retry_status_codes,
+            retry_policy="safe",
             json_body=payload,
             headers=headers,
+            max_response_bytes=settings.reporting_max_response_bytes,
+            operation="post_portfolio_summary",
         )
 
     async def post_portfolio_review(
@@ -87,6 +108,10 @@ class ReportingClient:
             timeout_seconds=self._timeout,
             max_retries=self._max_retries,
             backoff_seconds=self._retry_backoff_seconds,
+            retry_status_codes=self._retry_status_codes,
+            retry_policy="safe",
             json_body=payload,
             headers=headers,
+            max_response_bytes=settings.reporting_max_response_bytes,
+            operation="post_portfolio_review",
         )
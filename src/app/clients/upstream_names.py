@@ -0,0 +1,29 @@
+from app.clients.bulkhead import upstream_origin
+from app.clients.load_balancing import split_base_urls
+from app.config import settings
+
+_UNKNOWN_UPSTREAM = "upstream"
+
+
+def _configured_services() -> tuple[tuple[str, str], ...]:
+    return (
+        ("lotus-advise", settings.decisioning_service_base_url),
+        ("lotus-core", settings.portfolio_data_platform_base_url),
+        ("lotus-core", settings.portfolio_data_ingestion_base_url),
+        ("lotus-performance", settings.performance_analytics_base_url),
+        ("lotus-risk", settings.risk_analytics_base_url),
+        ("lotus-report", settings.reporting_aggregation_base_url),
+        ("lotus-manage", settings.management_service_base_url),
+    )
+
+
+def upstream_service_name(url: str) -> str:
+    # Labels timings and metrics by service rather than host, so every replica of lotus-core
+    # reports as lotus-core. Unconfigured origins share one fixed name: a raw origin is not a
+    # valid Server-Timing token and would expose internal hosts to clients.
+    origin = upstream_origin(url)
+    for service, configured in _configured_services():
+        for base_url in split_base_urls(configured):
+            if upstream_origin(base_url) == origin:
+                return service
+    return _UNKNOWN_UPSTREAM
@@ -1,4 +1,6 @@
-from pydantic import Field
+from typing import Literal
+
+from pydantic import Field, model_validator
 from pydantic_settings import BaseSettings
 
 
@@ -17,6 +19,103 @@ class Settings(BaseSettings):
     upstream_timeout_seconds: float = Field(default=3.0)
     upstream_max_retries: int = Field(default=2)
     upstream_retry_backoff_seconds: float = Field(default=0.2)
+    upstream_retry_max_backoff_seconds: float = Field(default=2.0)
+    upstream_retry_after_max_seconds: float = Field(default=5.0)
+    upstream_max_response_bytes: int = Field(default=33_554_432)
+    lookup_max_response_bytes: int = Field(default=8_388_608)
+    reporting_max_response_bytes: int = Field(default=67_108_864)
+    upstream_bulkhead_max_concurrency: int = Field(default=32)
+    upstream_bulkhead_max_queue: int = Field(default=64)
+    upstream_bulkhead_queue_timeout_seconds: float = Field(default=2.0)
+    upstream_bulkhead_max_concurrency_overrides: dict[str, int] = Field(default_factory=dict)
+    upstream_adaptive_concurrency_enabled: bool = Field(default=False)
+    upstream_adaptive_initial_concurrency: int = Field(default=8)
+    upstream_adaptive_min_concurrency: int = Field(default=2)
+    upstream_adaptive_latency_tolerance: float = Field(default=2.0)
+    upstream_adaptive_backoff_ratio: float = Field(default=0.9)
+    upstream_outlier_consecutive_failures: int = Field(default=5)
+    upstream_outlier_base_ejection_seconds: float = Field(default=30.0)
+    upstream_outlier_max_ejection_seconds: float = Field(default=300.0)
+    upstream_pool_max_connections: int = Field(default=64)
+    upstream_pool_max_keepalive_connections: int = Field(default=32)
+    upstream_pool_keepalive_expiry_seconds: float = Field(default=30.0)
+    upstream_dns_cache_ttl_seconds: float = Field(default=30.0)
+    upstream_warmup_enabled: bool = Field(default=True)
+    upstream_warmup_connections: int = Field(default=2)
+    upstream_warmup_timeout_seconds: float = Field(default=5.0)
+    upstream_warmup_path: str = Field(default="/health")
+    shutdown_grace_period_seconds: float = Field(default=20.0)
+    shutdown_pre_stop_delay_seconds: float = Field(default=5.0)
+    loop_lag_sample_interval_seconds: float = Field(default=0.1)
+    event_loop_slow_callback_seconds: float = Field(default=0.1)
+    event_loop_unready_lag_seconds: float = Field(default=1.0)
+    admission_control_enabled: bool = Field(default=True)
+    admission_max_in_flight: int = Field(default=256)
+    admission_max_loop_lag_seconds: float = Field(default=0.25)
+    admission_retry_after_seconds: int = Field(default=1)
+    admission_shed_thresholds: dict[str, float] = Field(
+        default_factory=lambda: {"low": 0.5, "normal": 0.8, "high": 1.0}
+    )
+    admission_route_priorities: dict[str, str] = Field(
+        default_factory=lambda: {
+            "/health": "critical",
+            "/metrics": "critical",
+            "/api/v1/workbench": "high",
+            "/api/v1/proposals": "high",
+            "/api/v1/platform": "normal",
+            "/api/v1/reports": "low",
+            "/api/v1/lookups": "low",
+            "/api/v1/intake": "low",
+        }
+    )
+    offload_executor: Literal["thread", "process", "none"] = Field(default="thread")
+    offload_max_workers: int = Field(default=4)
+    offload_default_threshold: int = Field(default=2000)
+    offload_thresholds: dict[str, int] = Field(
+        default_factory=lambda: {"current_positions": 2000, "report_rows": 5000}
+    )
+    tracing_sample_ratio: float = Field(default=0.1)
+    tracing_parent_based_sampling: bool = Field(default=True)
+    tracing_exporter: Literal["jsonl", "none"] = Field(default="jsonl")
+    tracing_export_path: str = Field(default="")
+    tracing_export_batch_size: int = Field(default=64)
+    tracing_export_max_bytes: int = Field(default=64 * 1024 * 1024)
+    admin_token: str = Field(default="")
+    profiling_sample_ratio: float = Field(default=0.0)
+    profiling_interval_seconds: float = Field(default=0.005)
+    profiling_max_duration_seconds: float = Field(default=10.0)
+    profiling_max_concurrent: int = Field(default=2)
+    profiling_top_functions: int = Field(default=20)
+    profiling_ring_size: int = Field(default=50)
+    flight_recorder_enabled: bool = Field(default=True)
+    flight_recorder_slowest_per_route: int = Field(default=5)
+    flight_recorder_window_seconds: float = Field(default=900.0)
+    slow_request_threshold_seconds: float = Field(default=2.0)
+    json_codec: Literal["auto", "orjson", "stdlib"] = Field(default="auto")
+    log_queue_size: int = Field(default=10_000)
+    access_log_sample_ratios: dict[str, float] = Field(
+        default_factory=lambda: {"/health": 0.01, "/metrics": 0.01}
+    )
+    audit_sink_enabled: bool = Field(default=False)
+    audit_spool_dir: str = Field(default="")
+    audit_queue_size: int = Field(default=10_000)
+    audit_batch_size: int = Field(default=200)
+    audit_flush_interval_seconds: float = Field(default=0.5)
+    audit_spool_max_bytes: int = Field(default=64 * 1024 * 1024)
+    audit_spool_max_age_seconds: float = Field(default=3600.0)
+    audit_fsync_policy: Literal["batch", "rotate", "never"] = Field(default="batch")
+    audit_flush_timeout_seconds: float = Field(default=5.0)
+    feature_flags_path: str = Field(default="")
+    feature_flags_reload_interval_seconds: float = Field(default=5.0)
+    capability_rules_path: str = Field(default="")
+    capability_rules_reload_interval_seconds: float = Field(default=5.0)
+
+    @model_validator(mode="after")
+    def _require_audit_spool_dir(self) -> "Settings":
+        # The spool is the durable copy of the audit trail; a temp dir would not survive restarts.
+        if self.audit_sink_enabled and not self.audit_spool_dir:
+            raise ValueError("AUDIT_SPOOL_DIR is required when AUDIT_SINK_ENABLED is true")
+        return self
 
 
 settings = Settings()
@@ -1,13 +1,16 @@
 import json
-import logging
 import os
 from datetime import datetime, timezone
 from typing import Any
 
 from fastapi import Request
-from fastapi.responses import JSONResponse
+from starlette.datastructures import MutableHeaders
+from starlette.exceptions import HTTPException as StarletteHTTPException
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
-logger = logging.getLogger("enterprise_readiness")
+from app import audit_sink, capability_rules, feature_flags
+from app.metrics import PAYLOADS_REJECTED
+from app.responses import GatewayJSONResponse
 
 _SERVICE_NAME = "lotus-gateway"
 _WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
@@ -66,37 +69,8 @@ def validate_enterprise_runtime_config() -> list[str]:
     return issues
 
 
-def load_feature_flags() -> dict[str, dict[str, dict[str, bool]]]:
-    flags = _load_json_map("ENTERPRISE_FEATURE_FLAGS_JSON")
-    return flags if isinstance(flags, dict) else {}
-
-
-def load_capability_rules() -> dict[str, str]:
-    rules = _load_json_map("ENTERPRISE_CAPABILITY_RULES_JSON")
-    return {str(key): str(value) for key, value in rules.items() if isinstance(key, str)}
-
-
 def is_feature_enabled(feature_key: str, tenant_id: str, role: str) -> bool:
-    flags = load_feature_flags()
-    feature = flags.get(feature_key, {})
-    tenant = feature.get(tenant_id, {})
-    role_value = tenant.get(role)
-    if isinstance(role_value, bool):
-        return role_value
-    tenant_default = tenant.get("*")
-    if isinstance(tenant_default, bool):
-        return tenant_default
-    global_default = feature.get("*", {}).get("*")
-    return bool(global_default) if isinstance(global_default, bool) else False
-
-
-def _required_capability(method: str, path: str) -> str | None:
-    method = method.upper()
-    for key, capability in load_capability_rules().items():
-        prefix = f"{method} "
-        if key.upper().startswith(prefix) and path.startswith(key[len(prefix) :]):
-            return capability
-    return None
+    return feature_flags.FEATURE_FLAGS.is_enabled(feature_key, tenant_id, role)
 
 
 def authorize_write_request(
@@ -118,7 +92,7 @@ def authorize_write_request(
     if not has_service_identity:
         return False, "missing_service_identity"
 
-    required_capability = _required_capability(method, path)
+    required_capability = capability_rules.CAPABILITY_RULES.required_capability(method, path)
     if required_capability:
         capabilities = {
             part.strip() for part in normalized.get("x-capabilities", "").split(",") if part.strip()
@@ -154,40 +128,91 @@ def emit_audit_event(
     correlation_id: str | None,
     metadata: dict[str, Any],
 ) -> None:
-    logger.info(
-        "enterprise_audit_event",
-        extra={
-            "audit": {
-                "service": service,
-                "action": action,
-                "actor_id": actor_id,
-                "tenant_id": tenant_id,
-                "role": role,
-                "correlation_id": correlation_id or "",
-                "timestamp_utc": datetime.now(timezone.utc).isoformat(),
-                "policy_version": enterprise_policy_version(),
-                "metadata": redact_sensitive(metadata),
-            }
-        },
-    )
-
-
-def build_enterprise_audit_middleware(service_name: str = _SERVICE_NAME):
-    async def middleware(request: Request, call_next):
-        max_write_payload_bytes = _env_int("ENTERPRISE_MAX_WRITE_PAYLOAD_BYTES", 1_048_576)
+    event = {
+        "service": service,
+        "action": action,
+        "actor_id": actor_id,
+        "tenant_id": tenant_id,
+        "role": role,
+        "correlation_id": correlation_id or "",
+        "timestamp_utc": datetime.now(timezone.utc).isoformat(),
+        "policy_version": enterprise_policy_version(),
+        "metadata": redact_sensitive(metadata),
+    }
+    # Without a running sink (or with its queue full) the event still goes to the log stream.
+    if not audit_sink.AUDIT_SINK.submit(event):
+        audit_sink.log_audit_event(event)
+
+
+def load_route_payload_limits() -> list[tuple[str, int]]:
+    limits: list[tuple[str, int]] = []
+    for prefix, value in _load_json_map("ENTERPRISE_ROUTE_MAX_WRITE_PAYLOAD_BYTES_JSON").items():
+        try:
+            limits.append((str(prefix), int(value)))
+        except (TypeError, ValueError):
+            continue
+    # Longest prefix wins, so an upload route can be given more room than its router.
+    return sorted(limits, key=lambda item: len(item[0]), reverse=True)
+
+
+class PayloadTooLargeError(StarletteHTTPException):
+    def __init__(self) -> None:
+        super().__init__(status_code=413, detail="payload_too_large")
+
+
+def limit_request_body(receive: Receive, max_bytes: int) -> Receive:
+    # Counts body bytes as the app pulls them, so a chunked upload without Content-Length is
+    # cut off at the limit instead of being buffered in full first. Raised as an HTTPException
+    # so FastAPI's body parsing passes it through to the 413 handler untouched.
+    received = 0
+
+    async def limited_receive() -> Message:
+        nonlocal received
+        message = await receive()
+        if message["type"] == "http.request":
+            received += len(message.get("body", b""))
+            if received > max_bytes:
+                PAYLOADS_REJECTED.labels(check="streamed").inc()
+                raise PayloadTooLargeError()
+        return message
+
+    return limited_receive
+
+
+class EnterpriseAuditMiddleware:
+    def __init__(self, app: ASGIApp, service_name: str = _SERVICE_NAME) -> None:
+        self.app = app
+        self.service_name = service_name
+        self.route_payload_limits = load_route_payload_limits()
+
+    def max_write_payload_bytes(self, path: str) -> int:
+        for prefix, limit in self.route_payload_limits:
+            if path.startswith(prefix):
+                return limit
+        return _env_int("ENTERPRISE_MAX_WRITE_PAYLOAD_BYTES", 1_048_576)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        request = Request(scope)
+        max_write_payload_bytes = self.max_write_payload_bytes(request.url.path)
         try:
             content_length = int(request.headers.get("content-length", "0"))
         except ValueError:
             content_length = 0
         if request.method in _WRITE_METHODS and content_length > max_write_payload_bytes:
-            return JSONResponse(status_code=413, content={"detail": "payload_too_large"})
+            PAYLOADS_REJECTED.labels(check="content_length").inc()
+            response = GatewayJSONResponse(status_code=413, content={"detail": "payload_too_large"})
+            await response(scope, receive, send)
+            return
 
         authorized, reason = authorize_write_request(
             request.method, request.url.path, dict(request.headers)
         )
         if not authorized:
             emit_audit_event(
-                service=service_name,
+                service=self.service_name,
                 action=f"DENY {request.method} {request.url.path}",
                 actor_id=request.headers.get("X-Actor-Id", "unknown"),
                 tenant_id=request.headers.get("X-Tenant-Id", "default"),
@@ -195,22 +220,42 @@ def build_enterprise_audit_middleware(service_name: str = _SERVICE_NAME):
                 correlation_id=request.headers.get("X-Correlation-Id"),
                 metadata={"reason": reason},
             )
-            return JSONResponse(
+            response = GatewayJSONResponse(
                 status_code=403, content={"detail": "authorization_policy_denied", "reason": reason}
             )
+            await response(scope, receive, send)
+            return
+
+        status_code = 500
+        response_started = False
+
+        async def send_with_policy_version(message: Message) -> None:
+            nonlocal status_code, response_started
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                response_started = True
+                MutableHeaders(scope=message)["X-Enterprise-Policy-Version"] = (
+                    enterprise_policy_version()
+                )
+            await send(message)
 
-        response = await call_next(request)
-        response.headers["X-Enterprise-Policy-Version"] = enterprise_policy_version()
+        if request.method in _WRITE_METHODS:
+            receive = limit_request_body(receive, max_write_payload_bytes)
+        try:
+            await self.app(scope, receive, send_with_policy_version)
+        except PayloadTooLargeError:
+            # Apps without an HTTPException handler let it escape; answer here if we still can.
+            if response_started:
+                raise
+            response = GatewayJSONResponse(status_code=413, content={"detail": "payload_too_large"})
+            await response(scope, receive, send_with_policy_version)
         if request.method in _WRITE_METHODS:
             emit_audit_event(
-                service=service_name,
+                service=self.service_name,
                 action=f"{request.method} {request.url.path}",
                 actor_id=request.headers.get("X-Actor-Id", "unknown"),
                 tenant_id=request.headers.get("X-Tenant-Id", "default"),
                 role=request.headers.get("X-Role", "unknown"),
                 correlation_id=request.headers.get("X-Correlation-Id"),
-                metadata={"status_code": response.status_code},
+                metadata={"status_code": status_code},
             )
-        return response
-
-    return middleware
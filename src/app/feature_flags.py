@@ -0,0 +1,71 @@
+from typing import Any
+
+from app.config import settings
+from app.json_document_store import JsonDocumentStore
+from app.metrics import FEATURE_FLAG_RELOADS
+
+_WILDCARD = "*"
+
+
+class CompiledFeatureFlags:
+    # Flattens the nested feature -> tenant -> role document into lookup tables, with the
+    # tenant and global fallbacks already resolved, so evaluation never walks the document.
+
+    __slots__ = ("_roles", "_tenants", "_features")
+
+    def __init__(self, flags: dict[str, Any]):
+        self._roles: dict[tuple[str, str, str], bool] = {}
+        self._tenants: dict[tuple[str, str], bool] = {}
+        self._features: dict[str, bool] = {}
+        for feature_key, feature in flags.items():
+            if not isinstance(feature, dict):
+                continue
+            wildcard_tenant = feature.get(_WILDCARD)
+            global_default = (
+                wildcard_tenant.get(_WILDCARD) if isinstance(wildcard_tenant, dict) else None
+            )
+            feature_default = global_default if isinstance(global_default, bool) else False
+            self._features[feature_key] = feature_default
+            for tenant_id, tenant in feature.items():
+                if not isinstance(tenant, dict):
+                    continue
+                tenant_default = tenant.get(_WILDCARD)
+                self._tenants[(feature_key, tenant_id)] = (
+                    tenant_default if isinstance(tenant_default, bool) else feature_default
+                )
+                for role, value in tenant.items():
+                    if isinstance(value, bool):
+                        self._roles[(feature_key, tenant_id, role)] = value
+
+    def is_enabled(self, feature_key: str, tenant_id: str, role: str) -> bool:
+        value = self._roles.get((feature_key, tenant_id, role))
+        if value is None:
+            value = self._tenants.get((feature_key, tenant_id))
+            if value is None:
+                return self._features.get(feature_key, False)
+        return value
+
+
+class FeatureFlagStore(JsonDocumentStore[CompiledFeatureFlags]):
+    name = "feature_flags"
+    env_var = "ENTERPRISE_FEATURE_FLAGS_JSON"
+
+    def compile(self, document: dict[str, Any]) -> CompiledFeatureFlags:
+        return CompiledFeatureFlags(document)
+
+    def record_reload(self, outcome: str) -> None:
+        FEATURE_FLAG_RELOADS.labels(outcome=outcome).inc()
+
+    def is_enabled(self, feature_key: str, tenant_id: str, role: str) -> bool:
+        return self.compiled.is_enabled(feature_key, tenant_id, role)
+
+
+def build_feature_flag_store() -> FeatureFlagStore:
+    store = FeatureFlagStore(
+        settings.feature_flags_path, settings.feature_flags_reload_interval_seconds
+    )
+    store.reload()
+    return store
+
+
+FEATURE_FLAGS = build_feature_flag_store()
@@ -0,0 +1,121 @@
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import UTC, datetime
+from typing import Any
+
+from app.config import settings
+
+
+class RequestTimeline:
+    __slots__ = ("started", "phases")
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.phases: list[dict[str, Any]] = []
+
+    def add(
+        self, category: str, name: str, started: float, duration_seconds: float, **attributes: Any
+    ) -> None:
+        self.phases.append(
+            {
+                "category": category,
+                "name": name,
+                "offset_ms": round((started - self.started) * 1000, 2),
+                "duration_ms": round(duration_seconds * 1000, 2),
+                **attributes,
+            }
+        )
+
+    def breakdown(self, total_seconds: float) -> dict[str, float]:
+        totals: dict[str, float] = {}
+        for phase in self.phases:
+            key = f"{phase['category']}_ms"
+            totals[key] = round(totals.get(key, 0.0) + phase["duration_ms"], 2)
+        # Whatever the handler did not account for was spent in the middleware stack.
+        totals["middleware_ms"] = round(total_seconds * 1000 - totals.get("handler_ms", 0.0), 2)
+        return totals
+
+
+timeline_var: ContextVar[RequestTimeline | None] = ContextVar("request_timeline", default=None)
+
+
+def record_phase(
+    category: str, name: str, started: float, duration_seconds: float, **attributes: Any
+) -> None:
+    timeline = timeline_var.get()
+    if timeline is not None:
+        timeline.add(category, name, started, duration_seconds, **attributes)
+
+
+@contextmanager
+def timed_phase(category: str, name: str, **attributes: Any) -> Iterator[None]:
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_phase(category, name, started, time.perf_counter() - started, **attributes)
+
+
+class FlightRecorder:
+    # Keeps the slowest N requests per route template seen within a sliding window; anything
+    # older than the window, or faster than everything already kept, is dropped.
+
+    def __init__(self, slowest_per_route: int, window_seconds: float):
+        self.slowest_per_route = slowest_per_route
+        self.window_seconds = window_seconds
+        self._routes: dict[str, list[tuple[float, float, dict[str, Any]]]] = {}
+
+    def qualifies(self, route: str, duration_seconds: float, now: float | None = None) -> bool:
+        now = time.monotonic() if now is None else now
+        kept = self._prune(route, now)
+        return len(kept) < self.slowest_per_route or (bool(kept) and duration_seconds > kept[-1][0])
+
+    def record(
+        self, route: str, duration_seconds: float, entry: dict[str, Any], now: float | None = None
+    ) -> bool:
+        now = time.monotonic() if now is None else now
+        if not self.qualifies(route, duration_seconds, now):
+            return False
+        kept = self._prune(route, now)
+        if len(kept) >= self.slowest_per_route:
+            kept.pop()
+        kept.append((duration_seconds, now, entry))
+        kept.sort(key=lambda item: item[0], reverse=True)
+        self._routes[route] = kept
+        return True
+
+    def _prune(self, route: str, now: float) -> list[tuple[float, float, dict[str, Any]]]:
+        cutoff = now - self.window_seconds
+        return [item for item in self._routes.get(route, []) if item[1] >= cutoff]
+
+    def snapshot(self, route: str | None = None, now: float | None = None) -> dict[str, Any]:
+        now = time.monotonic() if now is None else now
+        routes = [route] if route is not None else list(self._routes)
+        result: dict[str, list[dict[str, Any]]] = {}
+        for name in routes:
+            kept = self._prune(name, now)
+            if kept:
+                self._routes[name] = kept
+                result[name] = [entry for _, _, entry in kept]
+            else:
+                self._routes.pop(name, None)
+        return result
+
+
+def build_flight_record(
+    request_summary: dict[str, Any], timeline: RequestTimeline, duration_seconds: float
+) -> dict[str, Any]:
+    return {
+        **request_summary,
+        "duration_ms": round(duration_seconds * 1000, 2),
+        "recorded_at": datetime.now(UTC).isoformat(),
+        "breakdown": timeline.breakdown(duration_seconds),
+        "phases": list(timeline.phases),
+    }
+
+
+FLIGHT_RECORDER = FlightRecorder(
+    settings.flight_recorder_slowest_per_route, settings.flight_recorder_window_seconds
+)
@@ -0,0 +1,90 @@
+import json
+import logging
+from collections.abc import Callable
+from typing import Any
+
+from app.config import settings
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the optional speedups extra
+    orjson = None  # type: ignore[assignment]
+
+logger = logging.getLogger("json_codec")
+
+
+class JsonCodec:
+    def __init__(
+        self,
+        name: str,
+        loads: Callable[[bytes | str], Any],
+        dumps: Callable[[Any], bytes],
+    ):
+        self.name = name
+        self.loads = loads
+        self.dumps = dumps
+
+
+def _stdlib_loads(data: bytes | str) -> Any:
+    return json.loads(data)
+
+
+def _stdlib_dumps(value: Any) -> bytes:
+    # Same rendering as starlette's JSONResponse.
+    return json.dumps(
+        value,
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def _orjson_loads(data: bytes | str) -> Any:
+    try:
+        return orjson.loads(data)
+    except orjson.JSONDecodeError:
+        # orjson rejects NaN/Infinity literals that stdlib json accepts.
+        return json.loads(data)
+
+
+def _orjson_dumps(value: Any) -> bytes:
+    try:
+        return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
+    except orjson.JSONEncodeError:
+        return _stdlib_dumps(value)
+
+
+STDLIB_CODEC = JsonCodec("stdlib", _stdlib_loads, _stdlib_dumps)
+ORJSON_CODEC = JsonCodec("orjson", _orjson_loads, _orjson_dumps)
+
+
+def resolve_json_codec(preference: str) -> JsonCodec:
+    if preference == "stdlib":
+        return STDLIB_CODEC
+    if orjson is None:
+        if preference == "orjson":
+            logger.warning("json_codec.orjson_unavailable")
+        return STDLIB_CODEC
+    return ORJSON_CODEC
+
+
+_active_codec = resolve_json_codec(settings.json_codec)
+
+
+def configure_json_codec(preference: str) -> JsonCodec:
+    global _active_codec
+    _active_codec = resolve_json_codec(preference)
+    return _active_codec
+
+
+def get_json_codec() -> JsonCodec:
+    return _active_codec
+
+
+def loads(data: bytes | str) -> Any:
+    return _active_codec.loads(data)
+
+
+def dumps(value: Any) -> bytes:
+    return _active_codec.dumps(value)
@@ -0,0 +1,87 @@
+import asyncio
+import json
+import logging
+import os
+from abc import ABC, abstractmethod
+from typing import Any, Generic, TypeVar
+
+logger = logging.getLogger("json_document_store")
+
+CompiledT = TypeVar("CompiledT")
+
+
+class JsonDocumentStore(ABC, Generic[CompiledT]):
+    # A JSON policy document compiled into a lookup structure. Sourced from `path` when set
+    # (polled for changes), otherwise from the `env_var` environment variable read once. A reload
+    # swaps in a fully compiled structure in one assignment; an invalid document keeps the
+    # current one.
+
+    name = "document"
+    env_var = ""
+
+    def __init__(self, path: str = "", reload_interval_seconds: float = 5.0):
+        self.path = path
+        self.reload_interval_seconds = reload_interval_seconds
+        self.compiled = self.compile({})
+        self._signature: tuple[int, int] | None = None
+        self._task: asyncio.Task[None] | None = None
+
+    @abstractmethod
+    def compile(self, document: dict[str, Any]) -> CompiledT: ...
+
+    @abstractmethod
+    def record_reload(self, outcome: str) -> None: ...
+
+    def _read_source(self) -> str:
+        if not self.path:
+            return os.getenv(self.env_var, "{}")
+        self._signature = self._stat_signature()
+        with open(self.path, encoding="utf-8") as handle:
+            return handle.read()
+
+    def _stat_signature(self) -> tuple[int, int]:
+        stat = os.stat(self.path)
+        return stat.st_mtime_ns, stat.st_size
+
+    def reload(self) -> bool:
+        try:
+            document = json.loads(self._read_source())
+        except OSError as exc:
+            logger.warning(
+                f"{self.name}.read_failed",
+                extra={"extra_fields": {"path": self.path, "error": str(exc)}},
+            )
+            document = None
+        except json.JSONDecodeError:
+            document = None
+        if not isinstance(document, dict):
+            self.record_reload("invalid")
+            return False
+        self.compiled = self.compile(document)
+        self.record_reload("loaded")
+        return True
+
+    def reload_if_changed(self) -> bool:
+        try:
+            if self._stat_signature() == self._signature:
+                return False
+        except OSError:
+            return False
+        return self.reload()
+
+    async def _watch(self) -> None:
+        while True:
+            await asyncio.sleep(self.reload_interval_seconds)
+            if await asyncio.to_thread(self.reload_if_changed):
+                logger.info(f"{self.name}.reloaded", extra={"extra_fields": {"path": self.path}})
+
+    def start(self) -> None:
+        if self.path and self.reload_interval_seconds > 0:
+            if self._task is None or self._task.done():
+                self._task = asyncio.create_task(self._watch())
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
@@ -0,0 +1,130 @@
+import asyncio
+import logging
+import sys
+import sysconfig
+import threading
+import time
+from pathlib import Path
+from types import FrameType
+from typing import Any
+
+from app.config import settings
+from app.metrics import EVENT_LOOP_LAG, EVENT_LOOP_SLOW_CALLBACKS
+
+logger = logging.getLogger("loop_monitor")
+
+_APP_ROOT = str(Path(__file__).resolve().parent)
+_LIBRARY_ROOTS = tuple(
+    {sysconfig.get_paths()[key] for key in ("stdlib", "platstdlib", "purelib", "platlib")}
+)
+
+
+def describe_loop_stack(frame: FrameType | None) -> dict[str, str]:
+    # The running coroutine chain sits on the loop thread's stack, so the innermost frame of our
+    # own code (the app package, or anything outside stdlib/site-packages) is the blocking code and
+    # an ASGI frame further out carries the request scope.
+    location = "unknown"
+    scope: dict[str, Any] | None = None
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if location == "unknown" and (
+            filename.startswith(_APP_ROOT) or not filename.startswith(_LIBRARY_ROOTS)
+        ):
+            location = f"{Path(filename).name}:{frame.f_lineno} {frame.f_code.co_name}"
+        candidate = frame.f_locals.get("scope")
+        if isinstance(candidate, dict) and candidate.get("type") == "http":
+            scope = candidate
+            if location != "unknown":
+                break
+        frame = frame.f_back
+    if scope is None:
+        return {"route": "none", "correlation_id": "", "location": location}
+    route = scope.get("route")
+    state = scope.get("state")
+    return {
+        "route": str(getattr(route, "path", "unmatched")),
+        "correlation_id": str(state.get("correlation_id", "") if isinstance(state, dict) else ""),
+        "location": location,
+    }
+
+
+class LoopLagMonitor:
+    # Measures how late a periodic sleep wakes up; anything beyond the interval is time the
+    # event loop spent running other callbacks instead of serving this one. A watchdog thread
+    # notices a stalled heartbeat while the loop is still blocked and reports what is running.
+
+    def __init__(self, interval_seconds: float, slow_callback_seconds: float = 0.0):
+        self.interval_seconds = interval_seconds
+        self.slow_callback_seconds = slow_callback_seconds
+        self.lag_seconds = 0.0
+        self.heartbeat = time.monotonic()
+        self._task: asyncio.Task[None] | None = None
+        self._loop_thread_id: int | None = None
+        self._watchdog: threading.Thread | None = None
+        self._watchdog_stop = threading.Event()
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            self.heartbeat = time.monotonic()
+            await asyncio.sleep(self.interval_seconds)
+            self.lag_seconds = max(0.0, loop.time() - started - self.interval_seconds)
+            EVENT_LOOP_LAG.observe(self.lag_seconds)
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self.heartbeat = time.monotonic()
+            self._loop_thread_id = threading.get_ident()
+            self._task = asyncio.create_task(self._run())
+        if self.slow_callback_seconds > 0 and self._watchdog is None:
+            self._watchdog_stop.clear()
+            self._watchdog = threading.Thread(
+                target=self._watch, name="loop-lag-watchdog", daemon=True
+            )
+            self._watchdog.start()
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+        watchdog, self._watchdog = self._watchdog, None
+        if watchdog is not None:
+            self._watchdog_stop.set()
+            watchdog.join()
+        self.lag_seconds = 0.0
+
+    def _watch(self) -> None:
+        reported_heartbeat: float | None = None
+        while not self._watchdog_stop.wait(self.slow_callback_seconds / 2):
+            heartbeat = self.heartbeat
+            blocked = time.monotonic() - heartbeat - self.interval_seconds
+            if blocked >= self.slow_callback_seconds and heartbeat != reported_heartbeat:
+                reported_heartbeat = heartbeat
+                self.report_stall(blocked)
+
+    def report_stall(self, blocked_seconds: float) -> dict[str, str]:
+        frame = (
+            sys._current_frames().get(self._loop_thread_id)
+            if self._loop_thread_id is not None
+            else None
+        )
+        details = describe_loop_stack(frame)
+        EVENT_LOOP_SLOW_CALLBACKS.labels(route=details["route"]).inc()
+        logger.warning(
+            "event_loop.slow_callback",
+            extra={
+                "extra_fields": {
+                    **details,
+                    "blocked_ms": round(blocked_seconds * 1000, 2),
+                }
+            },
+        )
+        return details
+
+
+LOOP_MONITOR = LoopLagMonitor(
+    settings.loop_lag_sample_interval_seconds,
+    slow_callback_seconds=settings.event_loop_slow_callback_seconds,
+)
@@ -1,40 +1,97 @@
+import asyncio
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, Request, Response, status
-from fastapi.responses import JSONResponse
+from fastapi.utils import is_body_allowed_for_status_code
 from prometheus_fastapi_instrumentator import Instrumentator
+from starlette.exceptions import HTTPException as StarletteHTTPException
 
+from app import audit_sink, capability_rules, feature_flags
+from app.clients.connection_pool import close_upstream_transports, warm_up_upstreams
+from app.config import settings
 from app.contracts.errors import ProblemDetails
 from app.enterprise_readiness import (
-    build_enterprise_audit_middleware,
+    EnterpriseAuditMiddleware,
     validate_enterprise_runtime_config,
 )
-from app.middleware.correlation import correlation_id_var, correlation_middleware, setup_logging
+from app.loop_monitor import LOOP_MONITOR
+from app.middleware.admission import AdmissionMiddleware
+from app.middleware.correlation import CorrelationMiddleware, correlation_id_var, setup_logging
+from app.middleware.flight_recorder import FlightRecorderMiddleware, HandlerTimingMiddleware
+from app.middleware.in_flight import IN_FLIGHT, InFlightMiddleware
+from app.middleware.profiling import ProfilingMiddleware
+from app.offload import shutdown_offload_executor
+from app.responses import GatewayJSONResponse
+from app.routers.admin import router as admin_router
 from app.routers.intake import router as intake_router
 from app.routers.platform import router as platform_router
 from app.routers.proposals import router as proposals_router
 from app.routers.reporting import router as reporting_router
 from app.routers.workbench import router as workbench_router
+from app.shutdown import PreStopDrain
+from app.tracing import TRACER
+
+
+async def _warm_up(application: FastAPI) -> None:
+    try:
+        await warm_up_upstreams()
+    finally:
+        application.state.is_warming = False
 
 
 @asynccontextmanager
 async def _app_lifespan(application: FastAPI):
     application.state.is_draining = False
+    application.state.is_warming = settings.upstream_warmup_enabled
+    LOOP_MONITOR.start()
+    if settings.audit_sink_enabled:
+        audit_sink.AUDIT_SINK.start()
+    feature_flags.FEATURE_FLAGS.start()
+    capability_rules.CAPABILITY_RULES.start()
+    warm_up_task = (
+        asyncio.create_task(_warm_up(application)) if settings.upstream_warmup_enabled else None
+    )
+    pre_stop = PreStopDrain(
+        application.state,
+        settings.shutdown_pre_stop_delay_seconds,
+        settings.shutdown_grace_period_seconds,
+    )
+    pre_stop.install()
     yield
+    # On SIGTERM the pre-stop drain has already run while the server was still accepting; this
+    # covers other shutdown paths.
+    pre_stop.uninstall()
     application.state.is_draining = True
+    if warm_up_task is not None:
+        warm_up_task.cancel()
+        await asyncio.gather(warm_up_task, return_exceptions=True)
+    await IN_FLIGHT.drain(settings.shutdown_grace_period_seconds)
+    await audit_sink.AUDIT_SINK.stop(settings.audit_flush_timeout_seconds)
+    await close_upstream_transports()
+    await asyncio.to_thread(shutdown_offload_executor)
+    await asyncio.to_thread(TRACER.flush)
+    await feature_flags.FEATURE_FLAGS.stop()
+    await capability_rules.CAPABILITY_RULES.stop()
+    await LOOP_MONITOR.stop()
 
 
 app = FastAPI(title="Advisor Experience API", version="0.1.0", lifespan=_app_lifespan)
 setup_logging()
 validate_enterprise_runtime_config()
-app.middleware("http")(correlation_middleware)
-app.middleware("http")(build_enterprise_audit_middleware("lotus-gateway"))
+app.add_middleware(HandlerTimingMiddleware)
+app.add_middleware(ProfilingMiddleware)
+app.add_middleware(CorrelationMiddleware)
+app.add_middleware(EnterpriseAuditMiddleware, service_name="lotus-gateway")
+app.add_middleware(InFlightMiddleware)
+app.add_middleware(AdmissionMiddleware)
+app.add_middleware(FlightRecorderMiddleware)
 Instrumentator().instrument(app).expose(app)
 app.include_router(proposals_router)
 app.include_router(platform_router)
 app.include_router(intake_router)
 app.include_router(workbench_router)
 app.include_router(reporting_router)
+app.include_router(admin_router)
 
 
 @app.get("/health")
@@ -52,11 +109,30 @@ async def health_ready(response: Response) -> dict[str, str]:
     if bool(getattr(app.state, "is_draining", False)):
         response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
         return {"status": "draining"}
+    if bool(getattr(app.state, "is_warming", False)):
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+        return {"status": "warming"}
+    unready_lag_seconds = settings.event_loop_unready_lag_seconds
+    if unready_lag_seconds > 0 and LOOP_MONITOR.lag_seconds >= unready_lag_seconds:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+        return {"status": "saturated"}
     return {"status": "ready"}
 
 
+@app.exception_handler(StarletteHTTPException)
+async def http_exception_handler(request: Request, exc: StarletteHTTPException) -> Response:
+    headers = getattr(exc, "headers", None)
+    if not is_body_allowed_for_status_code(exc.status_code):
+        return Response(status_code=exc.status_code, headers=headers)
+    return GatewayJSONResponse(
+        status_code=exc.status_code,
+        content={"detail": exc.detail},
+        headers=headers,
+    )
+
+
 @app.exception_handler(Exception)
-async def unhandled_exception_handler(request: Request, exc: Exception) -> JSONResponse:
+async def unhandled_exception_handler(request: Request, exc: Exception) -> GatewayJSONResponse:
     problem = ProblemDetails(
         title="Internal Server Error",
         status=500,
@@ -65,7 +141,7 @@ async def unhandled_exception_handler(request: Request, exc: Exception) -> JSONR
         correlation_id=correlation_id_var.get() or "",
         error_code="INTERNAL_ERROR",
     )
-    return JSONResponse(
+    return GatewayJSONResponse(
         status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
         media_type="application/problem+json",
         content=problem.model_dump(),
@@ -0,0 +1,152 @@
+from prometheus_client import Counter, Gauge, Histogram
+
+# Registered on the default registry, which the instrumentator exposes at /metrics.
+
+UPSTREAM_IN_FLIGHT = Gauge(
+    "lotus_gateway_upstream_in_flight",
+    "Upstream calls currently holding a bulkhead slot.",
+    ["upstream"],
+)
+UPSTREAM_QUEUED = Gauge(
+    "lotus_gateway_upstream_queued",
+    "Upstream calls waiting for a bulkhead slot.",
+    ["upstream"],
+)
+UPSTREAM_REJECTED = Counter(
+    "lotus_gateway_upstream_rejected",
+    "Upstream calls rejected by the bulkhead before being sent.",
+    ["upstream", "reason"],
+)
+UPSTREAM_QUEUE_WAIT = Histogram(
+    "lotus_gateway_upstream_queue_wait_seconds",
+    "Time spent waiting for a bulkhead slot.",
+    ["upstream"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+UPSTREAM_CONCURRENCY_LIMIT = Gauge(
+    "lotus_gateway_upstream_concurrency_limit",
+    "Current bulkhead concurrency limit, adjusted by the adaptive limiter when enabled.",
+    ["upstream"],
+)
+UPSTREAM_RTT_BASELINE = Gauge(
+    "lotus_gateway_upstream_rtt_baseline_seconds",
+    "Adaptive limiter baseline (near-minimum) upstream round-trip time per operation.",
+    ["upstream", "operation"],
+)
+UPSTREAM_RTT_SMOOTHED = Gauge(
+    "lotus_gateway_upstream_rtt_smoothed_seconds",
+    "Adaptive limiter exponentially weighted upstream round-trip time per operation.",
+    ["upstream", "operation"],
+)
+UPSTREAM_ENDPOINT_EJECTED = Gauge(
+    "lotus_gateway_upstream_endpoint_ejected",
+    "1 while an upstream replica is ejected from client-side load balancing.",
+    ["upstream", "endpoint"],
+)
+UPSTREAM_EJECTIONS = Counter(
+    "lotus_gateway_upstream_ejections",
+    "Upstream replicas ejected after consecutive failures.",
+    ["upstream", "endpoint"],
+)
+REQUESTS_SHED = Counter(
+    "lotus_gateway_requests_shed",
+    "Gateway requests rejected by admission control, by route priority class.",
+    ["priority"],
+)
+EVENT_LOOP_LAG = Histogram(
+    "lotus_gateway_event_loop_lag_seconds",
+    "How late the event loop lag sampler woke up.",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+EVENT_LOOP_SLOW_CALLBACKS = Counter(
+    "lotus_gateway_event_loop_slow_callbacks",
+    "Event loop stalls longer than the slow-callback threshold, by route running at the time.",
+    ["route"],
+)
+OFFLOAD_TASKS = Counter(
+    "lotus_gateway_offload_tasks",
+    "Payload transformations by operation and where they ran (inline, thread or process).",
+    ["operation", "mode"],
+)
+OFFLOAD_DURATION = Histogram(
+    "lotus_gateway_offload_duration_seconds",
+    "Time spent in a payload transformation, including any wait for a pool worker.",
+    ["operation", "mode"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+OFFLOAD_THRESHOLD = Gauge(
+    "lotus_gateway_offload_threshold_rows",
+    "Row count at or above which a payload transformation is moved off the event loop.",
+    ["operation"],
+)
+OFFLOAD_POOL_WORKERS = Gauge(
+    "lotus_gateway_offload_pool_workers",
+    "Worker count of the payload offload pool.",
+    ["executor"],
+)
+UPSTREAM_REQUESTS = Counter(
+    "lotus_gateway_upstream_requests",
+    "Upstream call attempts by service, client operation, outcome status class and attempt number.",
+    ["upstream", "operation", "status_class", "attempt"],
+)
+UPSTREAM_REQUEST_DURATION = Histogram(
+    "lotus_gateway_upstream_request_duration_seconds",
+    "Upstream call attempt latency, including reading the response body.",
+    ["upstream", "operation", "status_class", "attempt"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+UPSTREAM_RETRIES = Counter(
+    "lotus_gateway_upstream_retries",
+    "Upstream call attempts that were retried, by the reason for retrying.",
+    ["upstream", "operation", "reason"],
+)
+UPSTREAM_TIMEOUTS = Counter(
+    "lotus_gateway_upstream_timeouts",
+    "Upstream call attempts that timed out.",
+    ["upstream", "operation"],
+)
+UPSTREAM_RESPONSE_BYTES = Histogram(
+    "lotus_gateway_upstream_response_bytes",
+    "Upstream response body size as received on the wire.",
+    ["upstream", "operation"],
+    buckets=(1_000, 10_000, 100_000, 500_000, 1_000_000, 5_000_000, 10_000_000, 50_000_000),
+)
+PROFILED_REQUESTS = Counter(
+    "lotus_gateway_profiled_requests",
+    "Requests selected for profiling, by trigger and whether the concurrency limit allowed it.",
+    ["trigger", "outcome"],
+)
+LOG_RECORDS_DROPPED = Counter(
+    "lotus_gateway_log_records_dropped",
+    "Log records dropped because the background log writer's queue was full.",
+)
+AUDIT_EVENTS = Counter(
+    "lotus_gateway_audit_events",
+    "Audit events handled by the audit sink: spooled, overflow (queue full, logged instead) or "
+    "write_failed (spool write error, logged instead).",
+    ["outcome"],
+)
+AUDIT_QUEUE_DEPTH = Gauge(
+    "lotus_gateway_audit_queue_depth",
+    "Audit events waiting to be written to the spool.",
+)
+AUDIT_SPOOL_WRITE_DURATION = Histogram(
+    "lotus_gateway_audit_spool_write_seconds",
+    "Time to append one batch of audit events to the spool, including fsync.",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+)
+FEATURE_FLAG_RELOADS = Counter(
+    "lotus_gateway_feature_flag_reloads",
+    "Feature flag table (re)compilations, by outcome; invalid keeps the previous table.",
+    ["outcome"],
+)
+CAPABILITY_RULE_RELOADS = Counter(
+    "lotus_gateway_capability_rule_reloads",
+    "Capability rule trie (re)compilations, by outcome; invalid keeps the previous trie.",
+    ["outcome"],
+)
+PAYLOADS_REJECTED = Counter(
+    "lotus_gateway_payloads_rejected",
+    "Write requests rejected with 413, by whether Content-Length or the streamed body tripped it.",
+    ["check"],
+)
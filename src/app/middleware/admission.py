@@ -0,0 +1,59 @@
+from fastapi import Request
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.config import settings
+from app.loop_monitor import LOOP_MONITOR
+from app.metrics import REQUESTS_SHED
+from app.middleware import in_flight
+from app.responses import GatewayJSONResponse
+
+CRITICAL_PRIORITY = "critical"
+DEFAULT_PRIORITY = "normal"
+
+
+class AdmissionMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        # Longest prefix wins, so more specific routes can override their router's class.
+        self.priorities: list[tuple[str, str]] = sorted(
+            settings.admission_route_priorities.items(),
+            key=lambda item: len(item[0]),
+            reverse=True,
+        )
+        self.thresholds: dict[str, float] = dict(settings.admission_shed_thresholds)
+        self.max_in_flight = max(1, settings.admission_max_in_flight)
+        self.max_loop_lag_seconds: float = settings.admission_max_loop_lag_seconds
+        self.retry_after = str(settings.admission_retry_after_seconds)
+        self.enabled = settings.admission_control_enabled
+
+    def priority_for(self, path: str) -> str:
+        for prefix, priority in self.priorities:
+            if path.startswith(prefix):
+                return priority
+        return DEFAULT_PRIORITY
+
+    def pressure(self) -> float:
+        load: float = in_flight.IN_FLIGHT.in_flight / self.max_in_flight
+        if self.max_loop_lag_seconds > 0:
+            load = max(load, LOOP_MONITOR.lag_seconds / self.max_loop_lag_seconds)
+        return load
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        priority = self.priority_for(Request(scope).url.path)
+        if (
+            self.enabled
+            and priority != CRITICAL_PRIORITY
+            and self.pressure() >= self.thresholds.get(priority, 1.0)
+        ):
+            REQUESTS_SHED.labels(priority=priority).inc()
+            response = GatewayJSONResponse(
+                status_code=503,
+                content={"detail": "gateway overloaded", "error_code": "GATEWAY_OVERLOADED"},
+                headers={"Retry-After": self.retry_after},
+            )
+            await response(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
@@ -1,45 +1,141 @@
-import json
+import atexit
+import copy
 import logging
 import os
+import queue
+import random
 import time
 from contextvars import ContextVar
 from datetime import UTC, datetime
+from logging.handlers import QueueHandler, QueueListener
 from uuid import uuid4
 
 from fastapi import Request
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app import json_codec
+from app.config import settings
+from app.metrics import LOG_RECORDS_DROPPED
+from app.middleware.server_timing import (
+    UpstreamTiming,
+    server_timing_header,
+    upstream_timings_var,
+)
+from app.tracing import TRACER, current_span_var, parse_traceparent
 
 correlation_id_var: ContextVar[str] = ContextVar("correlation_id", default="")
 request_id_var: ContextVar[str] = ContextVar("request_id", default="")
 trace_id_var: ContextVar[str] = ContextVar("trace_id", default="")
+_access_sampler = random.Random()
 
 
 class JsonFormatter(logging.Formatter):
+    def __init__(self) -> None:
+        super().__init__()
+        self.service = os.getenv("SERVICE_NAME", "lotus-gateway")
+        self.environment = os.getenv("ENVIRONMENT", "local")
+
     def format(self, record: logging.LogRecord) -> str:
+        context = getattr(record, "log_context", None) or _log_context()
+        correlation_id, request_id, trace_id = context
         payload = {
-            "timestamp": datetime.now(UTC).isoformat(),
+            "timestamp": datetime.fromtimestamp(record.created, UTC).isoformat(),
             "level": record.levelname,
-            "service": os.getenv("SERVICE_NAME", "lotus-gateway"),
-            "environment": os.getenv("ENVIRONMENT", "local"),
+            "service": self.service,
+            "environment": self.environment,
             "logger": record.name,
             "message": record.getMessage(),
-            "correlation_id": correlation_id_var.get() or None,
-            "request_id": request_id_var.get() or None,
-            "trace_id": trace_id_var.get() or None,
+            "correlation_id": correlation_id,
+            "request_id": request_id,
+            "trace_id": trace_id,
         }
         if hasattr(record, "extra_fields") and isinstance(record.extra_fields, dict):
             payload.update(record.extra_fields)
-        return json.dumps({k: v for k, v in payload.items() if v is not None})
+        return json_codec.dumps({k: v for k, v in payload.items() if v is not None}).decode()
+
+
+def _log_context() -> tuple[str | None, str | None, str | None]:
+    return (
+        correlation_id_var.get() or None,
+        request_id_var.get() or None,
+        trace_id_var.get() or None,
+    )
+
+
+class BackgroundQueueHandler(QueueHandler):
+    # Formatting happens on the writer thread, so the request ids are captured here while the
+    # emitting coroutine's context vars are still in scope. A full queue drops the record rather
+    # than blocking the event loop on a slow sink, except for audit records, which are written
+    # synchronously instead.
+
+    undroppable_loggers = frozenset({"audit"})
+
+    def __init__(self, log_queue: "queue.Queue[logging.LogRecord]", overflow: logging.Handler):
+        super().__init__(log_queue)
+        self.overflow = overflow
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        record.exc_info = None
+        record.exc_text = None
+        record.log_context = _log_context()
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            if record.name in self.undroppable_loggers:
+                self.overflow.handle(record)
+            else:
+                LOG_RECORDS_DROPPED.inc()
+
+
+_log_listener: QueueListener | None = None
 
 
 def setup_logging() -> None:
+    global _log_listener
     root_logger = logging.getLogger()
     if root_logger.hasHandlers():
         root_logger.handlers.clear()
     root_logger.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+    if _log_listener is not None:
+        _log_listener.stop()
 
     handler = logging.StreamHandler()
     handler.setFormatter(JsonFormatter())
-    root_logger.addHandler(handler)
+    log_queue: queue.Queue[logging.LogRecord] = queue.Queue(maxsize=settings.log_queue_size)
+    root_logger.addHandler(BackgroundQueueHandler(log_queue, handler))
+    _log_listener = QueueListener(log_queue, handler)
+    _log_listener.start()
+    # Audit records must not be filtered out by a quieter LOG_LEVEL either.
+    logging.getLogger("audit").setLevel(logging.INFO)
+
+
+@atexit.register
+def _stop_log_listener() -> None:
+    if _log_listener is not None:
+        _log_listener.stop()
+
+
+def _access_log_ratios() -> list[tuple[str, float]]:
+    # Longest prefix wins, matching the admission route priorities.
+    return sorted(
+        settings.access_log_sample_ratios.items(), key=lambda item: len(item[0]), reverse=True
+    )
+
+
+def should_log_access(path: str, status_code: int, ratios: list[tuple[str, float]]) -> bool:
+    if status_code >= 500:
+        return True
+    for prefix, ratio in ratios:
+        if path.startswith(prefix):
+            return ratio >= 1 or _access_sampler.random() < ratio
+    return True
 
 
 def resolve_correlation_id(request: Request) -> str:
@@ -53,11 +149,9 @@ def resolve_request_id(request: Request) -> str:
 
 
 def resolve_trace_id(request: Request) -> str:
-    traceparent = request.headers.get("traceparent")
-    if traceparent:
-        parts = traceparent.split("-")
-        if len(parts) >= 4 and len(parts[1]) == 32:
-            return parts[1]
+    remote = parse_traceparent(request.headers.get("traceparent"))
+    if remote is not None:
+        return remote[0]
     incoming = request.headers.get("X-Trace-Id")
     return incoming if incoming else uuid4().hex
 
@@ -66,46 +160,92 @@ def propagation_headers(correlation_id: str | None = None) -> dict[str, str]:
     resolved_correlation_id = (
         correlation_id or correlation_id_var.get() or f"corr_{uuid4().hex[:12]}"
     )
-    resolved_trace_id = trace_id_var.get() or uuid4().hex
+    # Outside a request there is no gateway span; a never-exported one still yields valid ids.
+    span = current_span_var.get() or TRACER.start_span(
+        "propagation", trace_id=trace_id_var.get() or None
+    )
     return {
         "X-Correlation-Id": resolved_correlation_id,
         "X-Request-Id": request_id_var.get() or f"req_{uuid4().hex[:12]}",
-        "X-Trace-Id": resolved_trace_id,
-        "traceparent": f"00-{resolved_trace_id}-0000000000000001-01",
+        "X-Trace-Id": trace_id_var.get() or span.trace_id,
+        "traceparent": span.traceparent,
     }
 
 
-async def correlation_middleware(request: Request, call_next):
-    logger = logging.getLogger("http.access")
-    started = time.perf_counter()
-
-    correlation_id = resolve_correlation_id(request)
-    request_id = resolve_request_id(request)
-    trace_id = resolve_trace_id(request)
-
-    correlation_token = correlation_id_var.set(correlation_id)
-    request_token = request_id_var.set(request_id)
-    trace_token = trace_id_var.set(trace_id)
-    try:
-        response = await call_next(request)
-    finally:
-        duration_ms = round((time.perf_counter() - started) * 1000, 2)
-        logger.info(
-            "request.completed",
-            extra={
-                "extra_fields": {
-                    "http_method": request.method,
-                    "endpoint": request.url.path,
-                    "latency_ms": duration_ms,
-                }
-            },
+class CorrelationMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        self.access_log_ratios = _access_log_ratios()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        logger = logging.getLogger("http.access")
+        started = time.perf_counter()
+        request = Request(scope)
+
+        correlation_id = resolve_correlation_id(request)
+        request_id = resolve_request_id(request)
+        trace_id = resolve_trace_id(request)
+
+        correlation_token = correlation_id_var.set(correlation_id)
+        request_token = request_id_var.set(request_id)
+        trace_token = trace_id_var.set(trace_id)
+        upstream_timings: list[UpstreamTiming] = []
+        timings_token = upstream_timings_var.set(upstream_timings)
+        span = TRACER.start_span(
+            f"{request.method} {request.url.path}",
+            kind="server",
+            attributes={"http.method": request.method, "http.target": request.url.path},
+            traceparent=request.headers.get("traceparent"),
+            trace_id=trace_id,
         )
-        correlation_id_var.reset(correlation_token)
-        request_id_var.reset(request_token)
-        trace_id_var.reset(trace_token)
-
-    response.headers["X-Correlation-Id"] = correlation_id
-    response.headers["X-Request-Id"] = request_id
-    response.headers["X-Trace-Id"] = trace_id
-    response.headers["traceparent"] = f"00-{trace_id}-0000000000000001-01"
-    return response
+        span_token = current_span_var.set(span)
+        response_status = 500
+        # Mirrored into the ASGI scope so the loop watchdog can attribute stalls to a request.
+        request.state.correlation_id = correlation_id
+
+        async def send_with_headers(message: Message) -> None:
+            nonlocal response_status
+            if message["type"] == "http.response.start":
+                response_status = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers["X-Correlation-Id"] = correlation_id
+                headers["X-Request-Id"] = request_id
+                headers["X-Trace-Id"] = trace_id
+                headers["traceparent"] = span.traceparent
+                headers["Server-Timing"] = server_timing_header(
+                    upstream_timings, time.perf_counter() - started
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_headers)
+        finally:
+            route = scope.get("route")
+            if route is not None:
+                span.name = f"{request.method} {getattr(route, 'path', request.url.path)}"
+                span.attributes["http.route"] = getattr(route, "path", request.url.path)
+            span.attributes["http.status_code"] = response_status
+            TRACER.end_span(span, error=response_status >= 500)
+            duration_seconds = time.perf_counter() - started
+            if should_log_access(request.url.path, response_status, self.access_log_ratios):
+                logger.info(
+                    "request.completed",
+                    extra={
+                        "extra_fields": {
+                            "http_method": request.method,
+                            "endpoint": request.url.path,
+                            "latency_ms": round(duration_seconds * 1000, 2),
+                            "upstream_calls": [
+                                timing.as_log_fields() for timing in upstream_timings
+                            ],
+                        }
+                    },
+                )
+            correlation_id_var.reset(correlation_token)
+            request_id_var.reset(request_token)
+            trace_id_var.reset(trace_token)
+            upstream_timings_var.reset(timings_token)
+            current_span_var.reset(span_token)
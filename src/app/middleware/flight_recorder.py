@@ -0,0 +1,77 @@
+import logging
+import time
+
+from fastapi import Request
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app import flight_recorder
+from app.config import settings
+from app.flight_recorder import RequestTimeline, build_flight_record, record_phase, timeline_var
+
+logger = logging.getLogger("flight_recorder")
+
+
+class FlightRecorderMiddleware:
+    # Registered outermost so the timeline covers every other middleware.
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not settings.flight_recorder_enabled:
+            await self.app(scope, receive, send)
+            return
+        timeline = RequestTimeline()
+        token = timeline_var.set(timeline)
+        status_code = 500
+
+        async def send_capturing_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_capturing_status)
+        finally:
+            timeline_var.reset(token)
+            duration_seconds = time.perf_counter() - timeline.started
+            route = str(getattr(scope.get("route"), "path", "unmatched"))
+            threshold = settings.slow_request_threshold_seconds
+            is_slow = threshold > 0 and duration_seconds >= threshold
+            recorder = flight_recorder.FLIGHT_RECORDER
+            keep = route != "unmatched" and recorder.qualifies(route, duration_seconds)
+            if is_slow or keep:
+                request = Request(scope)
+                record = build_flight_record(
+                    {
+                        "correlation_id": getattr(request.state, "correlation_id", ""),
+                        "method": request.method,
+                        "path": request.url.path,
+                        "route": route,
+                        "status_code": status_code,
+                    },
+                    timeline,
+                    duration_seconds,
+                )
+                if keep:
+                    recorder.record(route, duration_seconds, record)
+                if is_slow:
+                    logger.warning("request.slow", extra={"extra_fields": record})
+
+
+class HandlerTimingMiddleware:
+    # Registered innermost: what it measures is routing plus the endpoint itself.
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            record_phase("handler", scope["method"], started, time.perf_counter() - started)
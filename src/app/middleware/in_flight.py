@@ -0,0 +1,96 @@
+import asyncio
+import logging
+from collections.abc import Iterator
+
+from prometheus_client import REGISTRY
+from prometheus_client.core import GaugeMetricFamily
+from prometheus_client.registry import Collector
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+logger = logging.getLogger("in_flight")
+
+
+class InFlightTracker:
+    def __init__(self) -> None:
+        self.in_flight = 0
+        self._idle_waiters: list[asyncio.Future[None]] = []
+        self._scopes: dict[int, Scope] = {}
+        self._seen_routes: set[str] = set()
+
+    def started(self, scope: Scope | None = None) -> None:
+        self.in_flight += 1
+        if scope is not None:
+            self._scopes[id(scope)] = scope
+
+    def finished(self, scope: Scope | None = None) -> None:
+        self.in_flight = max(0, self.in_flight - 1)
+        if scope is not None and self._scopes.pop(id(scope), None) is not None:
+            self._seen_routes.add(_route_label(scope))
+        if self.in_flight == 0:
+            waiters, self._idle_waiters = self._idle_waiters, []
+            for waiter in waiters:
+                if not waiter.done():
+                    waiter.set_result(None)
+
+    def route_counts(self) -> dict[str, int]:
+        counts = dict.fromkeys(self._seen_routes, 0)
+        for scope in list(self._scopes.values()):
+            label = _route_label(scope)
+            counts[label] = counts.get(label, 0) + 1
+        return counts
+
+    async def drain(self, grace_seconds: float) -> bool:
+        try:
+            async with asyncio.timeout(grace_seconds):
+                if self.in_flight:
+                    waiter = asyncio.get_running_loop().create_future()
+                    self._idle_waiters.append(waiter)
+                    await waiter
+        except TimeoutError:
+            logger.warning(
+                "shutdown.drain_timed_out", extra={"extra_fields": {"in_flight": self.in_flight}}
+            )
+            return False
+        return True
+
+
+def _route_label(scope: Scope) -> str:
+    # Label by route template so per-portfolio paths do not explode the gauge's cardinality. The
+    # router records the matched route in the shared scope, so no matching is repeated here.
+    return str(getattr(scope.get("route"), "path", "unmatched"))
+
+
+IN_FLIGHT = InFlightTracker()
+
+
+class _InFlightRouteCollector(Collector):
+    # Labels are read from the live request scopes at scrape time rather than on every request.
+
+    def collect(self) -> Iterator[GaugeMetricFamily]:
+        family = GaugeMetricFamily(
+            "lotus_gateway_http_in_flight_requests",
+            "Gateway requests currently being handled, by route template.",
+            labels=["route"],
+        )
+        for route, count in IN_FLIGHT.route_counts().items():
+            family.add_metric([route], count)
+        yield family
+
+
+REGISTRY.register(_InFlightRouteCollector())
+
+
+class InFlightMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        tracker = IN_FLIGHT
+        tracker.started(scope)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            tracker.finished(scope)
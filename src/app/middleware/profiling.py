@@ -0,0 +1,88 @@
+import hmac
+import logging
+import random
+import threading
+
+from fastapi import Request
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app import profiling
+from app.config import settings
+from app.metrics import PROFILED_REQUESTS
+from app.middleware.correlation import correlation_id_var
+from app.profiling import RequestProfiler
+
+logger = logging.getLogger("profiling")
+
+PROFILE_HEADER = "X-Gateway-Profile"
+_sampler = random.Random()
+
+
+def has_admin_token(value: str | None) -> bool:
+    token = settings.admin_token
+    return bool(token) and value is not None and hmac.compare_digest(value, token)
+
+
+def _profile_trigger(request: Request) -> str | None:
+    if has_admin_token(request.headers.get(PROFILE_HEADER)):
+        return "header"
+    ratio = settings.profiling_sample_ratio
+    if ratio > 0 and _sampler.random() < ratio:
+        return "sampled"
+    return None
+
+
+class ProfilingMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        request = Request(scope)
+        trigger = _profile_trigger(request)
+        if trigger is None:
+            await self.app(scope, receive, send)
+            return
+        store = profiling.PROFILE_STORE
+        if not store.try_acquire(settings.profiling_max_concurrent):
+            PROFILED_REQUESTS.labels(trigger=trigger, outcome="skipped_limit").inc()
+            await self.app(scope, receive, send)
+            return
+
+        # Touching request.state creates the scope's state dict the sampler keys this request on.
+        request.state.profiled = True
+        profiler = RequestProfiler(
+            threading.get_ident(),
+            scope["state"],
+            settings.profiling_interval_seconds,
+        )
+        profiler.start()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            profile = profiler.stop()
+            store.release()
+            correlation_id = correlation_id_var.get()
+            profile.update(
+                {
+                    "correlation_id": correlation_id,
+                    "method": request.method,
+                    "path": request.url.path,
+                    "trigger": trigger,
+                }
+            )
+            store.add(correlation_id, profile)
+            PROFILED_REQUESTS.labels(trigger=trigger, outcome="profiled").inc()
+            logger.info(
+                "request.profiled",
+                extra={
+                    "extra_fields": {
+                        "endpoint": request.url.path,
+                        "trigger": trigger,
+                        "samples": profile["samples"],
+                        "top_functions": profile["top_functions"][:5],
+                    }
+                },
+            )
@@ -0,0 +1,43 @@
+from contextvars import ContextVar
+
+
+class UpstreamTiming:
+    __slots__ = ("upstream", "operation", "attempts", "duration_seconds")
+
+    def __init__(self, upstream: str, operation: str, attempts: int, duration_seconds: float):
+        self.upstream = upstream
+        self.operation = operation
+        self.attempts = attempts
+        self.duration_seconds = duration_seconds
+
+    def as_log_fields(self) -> dict[str, object]:
+        return {
+            "upstream": self.upstream,
+            "operation": self.operation,
+            "attempts": self.attempts,
+            "duration_ms": round(self.duration_seconds * 1000, 2),
+        }
+
+
+upstream_timings_var: ContextVar[list[UpstreamTiming] | None] = ContextVar(
+    "upstream_timings", default=None
+)
+
+
+def record_upstream_timing(
+    upstream: str, operation: str, attempts: int, duration_seconds: float
+) -> None:
+    # Calls made outside a request (warm-up, background jobs) have no collector and are dropped.
+    timings = upstream_timings_var.get()
+    if timings is not None:
+        timings.append(UpstreamTiming(upstream, operation, attempts, duration_seconds))
+
+
+def server_timing_header(timings: list[UpstreamTiming], total_seconds: float) -> str:
+    entries = [
+        f"{timing.upstream}.{timing.operation};dur={timing.duration_seconds * 1000:.2f};"
+        f'desc="attempts={timing.attempts}"'
+        for timing in timings
+    ]
+    entries.append(f"total;dur={total_seconds * 1000:.2f}")
+    return ", ".join(entries)
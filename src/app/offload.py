@@ -0,0 +1,74 @@
+import asyncio
+import contextvars
+import functools
+import multiprocessing
+import time
+from collections.abc import Callable
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, TypeVar
+
+from app.config import settings
+from app.flight_recorder import record_phase
+from app.metrics import OFFLOAD_DURATION, OFFLOAD_POOL_WORKERS, OFFLOAD_TASKS, OFFLOAD_THRESHOLD
+
+T = TypeVar("T")
+
+_executor: Executor | None = None
+
+
+def offload_threshold(operation: str) -> int:
+    return settings.offload_thresholds.get(operation, settings.offload_default_threshold)
+
+
+def _get_executor() -> Executor:
+    global _executor
+    if _executor is None:
+        workers = max(1, settings.offload_max_workers)
+        if settings.offload_executor == "process":
+            # Process workers sidestep the GIL but pay to pickle arguments and results both ways.
+            # Forking a process with a running event loop and worker threads copies their locks
+            # mid-use, so workers come from a clean forkserver (spawn where that is unavailable).
+            start_method = (
+                "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            )
+            _executor = ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context(start_method)
+            )
+        else:
+            _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="offload")
+        OFFLOAD_POOL_WORKERS.labels(executor=settings.offload_executor).set(workers)
+    return _executor
+
+
+async def run_offloaded(
+    operation: str, fn: Callable[..., T], *args: Any, size: int, **kwargs: Any
+) -> T:
+    # Small payloads stay inline: a round trip through the pool costs more than it saves.
+    threshold = offload_threshold(operation)
+    OFFLOAD_THRESHOLD.labels(operation=operation).set(threshold)
+    mode = "inline"
+    if settings.offload_executor != "none" and size >= threshold:
+        mode = settings.offload_executor
+    OFFLOAD_TASKS.labels(operation=operation, mode=mode).inc()
+    started = time.perf_counter()
+    try:
+        if mode == "inline":
+            return fn(*args, **kwargs)
+        call = functools.partial(fn, *args, **kwargs)
+        if mode == "thread":
+            # run_in_executor does not carry context vars over, so correlation ids would be
+            # missing from anything logged by the offloaded work.
+            call = functools.partial(contextvars.copy_context().run, call)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_get_executor(), call)
+    finally:
+        elapsed = time.perf_counter() - started
+        OFFLOAD_DURATION.labels(operation=operation, mode=mode).observe(elapsed)
+        record_phase("transform", operation, started, elapsed, mode=mode, size=size)
+
+
+def shutdown_offload_executor() -> None:
+    global _executor
+    executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=True, cancel_futures=True)
@@ -72,3 +72,40 @@ def quantize_performance(value: Any) -> Decimal:
 
 def quantize_risk(value: Any) -> Decimal:
     return to_decimal(value).quantize(RISK_SCALE, rounding=ROUNDING_MODE)
+
+
+_EXACT_INT_BOUND = 10**15
+
+
+def _quantize_to_binary(raw: Any, places: int, scale: Decimal) -> float:
+    # Exact shortcut for the response-shaping hot path. Rounding repr(raw) and rounding the
+    # underlying binary value agree unless repr ends in a tie digit right after `places`, so
+    # only ties, exponent forms and non-float inputs take the Decimal route.
+    if type(raw) is float:
+        text = repr(raw)
+        dot = text.find(".")
+        if dot > 0 and "e" not in text:
+            fraction_digits = len(text) - dot - 1
+            if fraction_digits <= places:
+                return raw
+            if fraction_digits > places + 1 or text[-1] != "5":
+                rounded = float(f"{raw:.{places}f}")
+                return rounded
+    elif type(raw) is int and -_EXACT_INT_BOUND < raw < _EXACT_INT_BOUND:
+        widened = float(raw)
+        return widened
+    quantized = to_decimal(raw).quantize(scale, rounding=ROUNDING_MODE)
+    result = float(quantized)
+    return result
+
+
+def quantize_money_to_float(raw: Any) -> float:
+    return _quantize_to_binary(raw, 2, MONEY_SCALE)
+
+
+def quantize_quantity_to_float(raw: Any) -> float:
+    return _quantize_to_binary(raw, 6, QUANTITY_SCALE)
+
+
+def quantize_performance_to_float(raw: Any) -> float:
+    return _quantize_to_binary(raw, 6, PERFORMANCE_SCALE)
@@ -0,0 +1,120 @@
+import sys
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from types import FrameType
+from typing import Any
+
+from app.config import settings
+
+
+def _function_key(frame: FrameType) -> str:
+    code = frame.f_code
+    return f"{code.co_qualname} ({Path(code.co_filename).name}:{code.co_firstlineno})"
+
+
+class RequestProfiler:
+    # Samples the event loop thread's stack from a side thread and keeps only the samples taken
+    # while this request's code is running, so interleaved requests do not pollute the profile
+    # and the handler itself runs unmodified.
+
+    def __init__(self, loop_thread_id: int, request_state: dict[str, Any], interval_seconds: float):
+        self.loop_thread_id = loop_thread_id
+        self.request_state = request_state
+        self.interval_seconds = interval_seconds
+        self.samples = 0
+        self.self_samples: dict[str, int] = {}
+        self.cumulative_samples: dict[str, int] = {}
+        self._started = time.perf_counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def start(self) -> None:
+        self._started = time.perf_counter()
+        self._thread.start()
+
+    def stop(self) -> dict[str, Any]:
+        self._stop.set()
+        self._thread.join()
+        return self.summary(time.perf_counter() - self._started)
+
+    def _run(self) -> None:
+        deadline = time.monotonic() + settings.profiling_max_duration_seconds
+        while not self._stop.wait(self.interval_seconds) and time.monotonic() < deadline:
+            self.sample(sys._current_frames().get(self.loop_thread_id))
+
+    def sample(self, frame: FrameType | None) -> None:
+        stack: list[str] = []
+        while frame is not None:
+            candidate = frame.f_locals.get("scope")
+            if isinstance(candidate, dict) and candidate.get("state") is self.request_state:
+                break
+            stack.append(_function_key(frame))
+            frame = frame.f_back
+        if frame is None or not stack:
+            return
+        self.samples += 1
+        self.self_samples[stack[0]] = self.self_samples.get(stack[0], 0) + 1
+        for key in set(stack):
+            self.cumulative_samples[key] = self.cumulative_samples.get(key, 0) + 1
+
+    def summary(self, duration_seconds: float) -> dict[str, Any]:
+        interval_ms = self.interval_seconds * 1000
+        ranked = sorted(
+            self.cumulative_samples,
+            key=lambda key: (self.self_samples.get(key, 0), self.cumulative_samples[key]),
+            reverse=True,
+        )
+        return {
+            "duration_ms": round(duration_seconds * 1000, 2),
+            "interval_ms": round(interval_ms, 3),
+            "samples": self.samples,
+            "top_functions": [
+                {
+                    "function": key,
+                    "self_samples": self.self_samples.get(key, 0),
+                    "cumulative_samples": self.cumulative_samples[key],
+                    "self_ms": round(self.self_samples.get(key, 0) * interval_ms, 2),
+                    "cumulative_ms": round(self.cumulative_samples[key] * interval_ms, 2),
+                }
+                for key in ranked[: settings.profiling_top_functions]
+            ],
+        }
+
+
+class ProfileStore:
+    def __init__(self, max_profiles: int):
+        self.max_profiles = max_profiles
+        self.active = 0
+        self._lock = threading.Lock()
+        self._profiles: OrderedDict[str, dict[str, Any]] = OrderedDict()
+
+    def try_acquire(self, max_concurrent: int) -> bool:
+        with self._lock:
+            if self.active >= max_concurrent:
+                return False
+            self.active += 1
+            return True
+
+    def release(self) -> None:
+        with self._lock:
+            self.active = max(0, self.active - 1)
+
+    def add(self, correlation_id: str, profile: dict[str, Any]) -> None:
+        with self._lock:
+            self._profiles.pop(correlation_id, None)
+            self._profiles[correlation_id] = profile
+            while len(self._profiles) > self.max_profiles:
+                self._profiles.popitem(last=False)
+
+    def get(self, correlation_id: str) -> dict[str, Any] | None:
+        with self._lock:
+            return self._profiles.get(correlation_id)
+
+    def list_ids(self) -> list[str]:
+        with self._lock:
+            return list(reversed(self._profiles))
+
+
+PROFILE_STORE = ProfileStore(settings.profiling_ring_size)
@@ -0,0 +1,40 @@
+from typing import Any
+
+from fastapi import Response
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+from app import json_codec
+from app.flight_recorder import timed_phase
+from app.offload import run_offloaded
+
+
+class GatewayJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return json_codec.dumps(content)
+
+
+def model_json_bytes(model: BaseModel) -> bytes:
+    return model.__pydantic_serializer__.to_json(model, by_alias=True)
+
+
+def model_json_response(model: BaseModel, status_code: int = 200) -> Response:
+    # Gateway-built models are already contract-valid: serialize them straight to bytes and
+    # skip the response_model re-validation FastAPI would otherwise run on the way out.
+    with timed_phase("serialize", type(model).__name__):
+        content = model_json_bytes(model)
+    return Response(
+        content=content,
+        status_code=status_code,
+        media_type="application/json",
+    )
+
+
+async def offloaded_model_json_response(
+    model: BaseModel, operation: str, size: int, status_code: int = 200
+) -> Response:
+    return Response(
+        content=await run_offloaded(operation, model_json_bytes, model, size=size),
+        status_code=status_code,
+        media_type="application/json",
+    )
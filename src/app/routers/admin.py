@@ -0,0 +1,52 @@
+from typing import Annotated, Any
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Path, Query, status
+
+from app import flight_recorder, profiling
+from app.config import settings
+from app.middleware.profiling import has_admin_token
+
+
+def require_admin_token(
+    x_gateway_admin_token: Annotated[str | None, Header()] = None,
+) -> None:
+    # Without a configured token the diagnostics surface does not exist at all.
+    if not settings.admin_token:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if not has_admin_token(x_gateway_admin_token):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="admin token required")
+
+
+router = APIRouter(
+    prefix="/admin",
+    tags=["Admin"],
+    include_in_schema=False,
+    dependencies=[Depends(require_admin_token)],
+)
+
+
+@router.get("/profiles")
+async def list_profiles() -> dict[str, list[str]]:
+    return {"correlation_ids": profiling.PROFILE_STORE.list_ids()}
+
+
+@router.get("/profiles/{correlation_id}")
+async def get_profile(
+    correlation_id: Annotated[str, Path(description="Correlation id of the profiled request.")],
+) -> dict[str, Any]:
+    profile = profiling.PROFILE_STORE.get(correlation_id)
+    if profile is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="profile not found")
+    return profile
+
+
+@router.get("/slow-requests")
+async def list_slow_requests(
+    route: Annotated[str | None, Query(description="Route template to filter on.")] = None,
+) -> dict[str, Any]:
+    recorder = flight_recorder.FLIGHT_RECORDER
+    return {
+        "window_seconds": recorder.window_seconds,
+        "slowest_per_route": recorder.slowest_per_route,
+        "routes": recorder.snapshot(route),
+    }
@@ -1,7 +1,7 @@
 from datetime import UTC, datetime
 from typing import Annotated
 
-from fastapi import APIRouter, HTTPException, Path, Query, status
+from fastapi import APIRouter, HTTPException, Path, Query, Response, status
 
 from app.clients.reporting_client import ReportingClient
 from app.config import settings
@@ -11,6 +11,7 @@ from app.contracts.reporting import (
     ReportingSummaryResponse,
 )
 from app.middleware.correlation import correlation_id_var
+from app.responses import model_json_response, offloaded_model_json_response
 
 router = APIRouter(prefix="/api/v1/reports", tags=["Reporting"])
 
@@ -36,7 +37,7 @@ async def get_reporting_snapshot(
         str,
         Query(alias="asOfDate", description="Business as-of date (YYYY-MM-DD)."),
     ],
-) -> ReportingSnapshotResponse:
+) -> Response:
     client = ReportingClient(
         base_url=settings.reporting_aggregation_base_url,
         timeout_seconds=settings.upstream_timeout_seconds,
@@ -63,15 +64,24 @@ async def get_reporting_snapshot(
         except ValueError:
             generated_at = datetime.now(UTC)
 
-    return ReportingSnapshotResponse(
-        correlationId=correlation_id,
-        contractVersion=settings.contract_version,
-        sourceService="lotus-report",
-        portfolioId=portfolio_id,
-        asOfDate=as_of_date,
-        generatedAt=generated_at,
-        rows=payload.get("rows", []),
+    rows = payload.get("rows", [])
+    if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail="Reporting snapshot unavailable: upstream returned malformed rows",
+        )
+    # Upstream rows are already plain JSON objects; skip copying each one through
+    # list[dict] validation.
+    snapshot = ReportingSnapshotResponse.model_construct(
+        correlation_id=correlation_id,
+        contract_version=settings.contract_version,
+        source_service="lotus-report",
+        portfolio_id=portfolio_id,
+        as_of_date=as_of_date,
+        generated_at=generated_at,
+        rows=rows,
     )
+    return await offloaded_model_json_response(snapshot, "report_rows", size=len(rows))
 
 
 @router.post(
@@ -92,7 +102,7 @@ async def get_reporting_summary(
         ),
     ],
     request: dict,
-) -> ReportingSummaryResponse:
+) -> Response:
     client = ReportingClient(
         base_url=settings.reporting_aggregation_base_url,
         timeout_seconds=settings.upstream_timeout_seconds,
@@ -111,13 +121,15 @@ async def get_reporting_summary(
             detail=f"Reporting summary unavailable: {payload}",
         )
     as_of_date = str(request.get("as_of_date", request.get("asOfDate", "")))
-    return ReportingSummaryResponse(
-        correlationId=correlation_id,
-        contractVersion=settings.contract_version,
-        sourceService="lotus-report",
-        portfolioId=portfolio_id,
-        asOfDate=as_of_date,
-        data=payload,
+    return model_json_response(
+        ReportingSummaryResponse(
+            correlationId=correlation_id,
+            contractVersion=settings.contract_version,
+            sourceService="lotus-report",
+            portfolioId=portfolio_id,
+            asOfDate=as_of_date,
+            data=payload,
+        )
     )
 
 
@@ -139,7 +151,7 @@ async def get_reporting_review(
         ),
     ],
     request: dict,
-) -> ReportingReviewResponse:
+) -> Response:
     client = ReportingClient(
         base_url=settings.reporting_aggregation_base_url,
         timeout_seconds=settings.upstream_timeout_seconds,
@@ -158,11 +170,13 @@ async def get_reporting_review(
             detail=f"Reporting review unavailable: {payload}",
         )
     as_of_date = str(request.get("as_of_date", request.get("asOfDate", "")))
-    return ReportingReviewResponse(
-        correlationId=correlation_id,
-        contractVersion=settings.contract_version,
-        sourceService="lotus-report",
-        portfolioId=portfolio_id,
-        asOfDate=as_of_date,
-        data=payload,
+    return model_json_response(
+        ReportingReviewResponse(
+            correlationId=correlation_id,
+            contractVersion=settings.contract_version,
+            sourceService="lotus-report",
+            portfolioId=portfolio_id,
+            asOfDate=as_of_date,
+            data=payload,
+        )
     )
@@ -1,4 +1,4 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Response
 
 from app.clients.dpm_client import DpmClient
 from app.clients.pa_client import PaClient
@@ -13,6 +13,7 @@ from app.contracts.workbench import (
     WorkbenchSandboxStateResponse,
 )
 from app.middleware.correlation import correlation_id_var
+from app.responses import model_json_response
 from app.services.workbench_service import WorkbenchService
 
 router = APIRouter(prefix="/api/v1/workbench", tags=["workbench"])
@@ -67,12 +68,14 @@ def _workbench_service() -> WorkbenchService:
         "decision-console overview contract."
     ),
 )
-async def get_workbench_overview(portfolio_id: str) -> WorkbenchOverviewResponse:
+async def get_workbench_overview(portfolio_id: str) -> Response:
     service = _workbench_service()
     correlation_id = correlation_id_var.get()
-    return await service.get_workbench_overview(
-        portfolio_id=portfolio_id,
-        correlation_id=correlation_id,
+    return model_json_response(
+        await service.get_workbench_overview(
+            portfolio_id=portfolio_id,
+            correlation_id=correlation_id,
+        )
     )
 
 
@@ -88,13 +91,15 @@ async def get_workbench_overview(portfolio_id: str) -> WorkbenchOverviewResponse
 async def get_portfolio_360(
     portfolio_id: str,
     session_id: str | None = None,
-) -> WorkbenchPortfolio360Response:
+) -> Response:
     service = _workbench_service()
     correlation_id = correlation_id_var.get()
-    return await service.get_portfolio_360(
-        portfolio_id=portfolio_id,
-        correlation_id=correlation_id,
-        session_id=session_id,
+    return model_json_response(
+        await service.get_portfolio_360(
+            portfolio_id=portfolio_id,
+            correlation_id=correlation_id,
+            session_id=session_id,
+        )
     )
 
 
@@ -116,16 +121,18 @@ async def get_workbench_analytics(
     group_by: str = "ASSET_CLASS",
     benchmark_code: str = "MODEL_60_40",
     session_id: str | None = None,
-) -> WorkbenchAnalyticsResponse:
+) -> Response:
     service = _workbench_service()
     correlation_id = correlation_id_var.get()
-    return await service.get_workbench_analytics(
-        portfolio_id=portfolio_id,
-        correlation_id=correlation_id,
-        period=period,
-        group_by=group_by,
-        benchmark_code=benchmark_code,
-        session_id=session_id,
+    return model_json_response(
+        await service.get_workbench_analytics(
+            portfolio_id=portfolio_id,
+            correlation_id=correlation_id,
+            period=period,
+            group_by=group_by,
+            benchmark_code=benchmark_code,
+            session_id=session_id,
+        )
     )
 
 
@@ -138,14 +145,16 @@ async def get_workbench_analytics(
 async def create_sandbox_session(
     portfolio_id: str,
     request: WorkbenchSandboxSessionCreateRequest,
-) -> WorkbenchSandboxStateResponse:
+) -> Response:
     service = _workbench_service()
     correlation_id = correlation_id_var.get()
-    return await service.create_sandbox_session(
-        portfolio_id=portfolio_id,
-        correlation_id=correlation_id,
-        created_by=request.created_by,
-        ttl_hours=request.ttl_hours,
+    return model_json_response(
+        await service.create_sandbox_session(
+            portfolio_id=portfolio_id,
+            correlation_id=correlation_id,
+            created_by=request.created_by,
+            ttl_hours=request.ttl_hours,
+        )
     )
 
 
@@ -162,13 +171,15 @@ async def apply_sandbox_changes(
     portfolio_id: str,
     session_id: str,
     request: WorkbenchSandboxApplyChangesRequest,
-) -> WorkbenchSandboxStateResponse:
+) -> Response:
     service = _workbench_service()
     correlation_id = correlation_id_var.get()
-    return await service.apply_sandbox_changes(
-        portfolio_id=portfolio_id,
-        session_id=session_id,
-        correlation_id=correlation_id,
-        changes=[item.model_dump(exclude_none=True) for item in request.changes],
-        evaluate_policy=request.evaluate_policy,
+    return model_json_response(
+        await service.apply_sandbox_changes(
+            portfolio_id=portfolio_id,
+            session_id=session_id,
+            correlation_id=correlation_id,
+            changes=[item.model_dump(exclude_none=True) for item in request.changes],
+            evaluate_policy=request.evaluate_policy,
+        )
     )
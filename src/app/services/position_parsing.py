@@ -0,0 +1,255 @@
+from typing import Any
+
+from pydantic import TypeAdapter
+
+from app.contracts.workbench import WorkbenchPositionView, WorkbenchProjectedPositionView
+from app.precision_policy import (
+    quantize_money_to_float,
+    quantize_performance_to_float,
+    quantize_quantity_to_float,
+)
+
+NESTED_VALUATION_KEYS = ("market_value_base", "market_value", "current_value_base", "current_value")
+FLAT_VALUATION_KEYS = (
+    "market_value_base",
+    "market_value",
+    "current_value_base",
+    "current_value",
+    "valuation_base",
+    "value_base",
+)
+
+# One validation pass over plain row dicts is roughly twice as fast as one BaseModel(...) call
+# per row, and the rows still go through the full contract schema.
+POSITION_VIEWS_ADAPTER = TypeAdapter(list[WorkbenchPositionView])
+PROJECTED_POSITION_VIEWS_ADAPTER = TypeAdapter(list[WorkbenchProjectedPositionView])
+
+
+class ValuationPath:
+    __slots__ = ("nested", "key", "shadowing_nested_keys", "shadowing_flat_keys")
+
+    def __init__(self, nested: bool, key: str):
+        self.nested = nested
+        self.key = key
+        if nested:
+            self.shadowing_nested_keys = NESTED_VALUATION_KEYS[: NESTED_VALUATION_KEYS.index(key)]
+            self.shadowing_flat_keys: tuple[str, ...] = ()
+        else:
+            self.shadowing_nested_keys = NESTED_VALUATION_KEYS
+            self.shadowing_flat_keys = FLAT_VALUATION_KEYS[: FLAT_VALUATION_KEYS.index(key)]
+
+
+class PositionColumns:
+    __slots__ = (
+        "security_ids",
+        "instrument_names",
+        "asset_classes",
+        "quantities",
+        "market_values_base",
+        "weights_pct",
+    )
+
+    def __init__(self) -> None:
+        self.security_ids: list[str] = []
+        self.instrument_names: list[str] = []
+        self.asset_classes: list[str | None] = []
+        self.quantities: list[Any] = []
+        self.market_values_base: list[Any] = []
+        self.weights_pct: list[Any] = []
+
+    def __len__(self) -> int:
+        return len(self.security_ids)
+
+
+def parse_position_market_value(item: dict[str, Any]) -> float | None:
+    valuation_payload = item.get("valuation")
+    if isinstance(valuation_payload, dict):
+        for key in NESTED_VALUATION_KEYS:
+            value = valuation_payload.get(key)
+            if value is None:
+                continue
+            try:
+                return quantize_money_to_float(value)
+            except (TypeError, ValueError):
+                continue
+    for key in FLAT_VALUATION_KEYS:
+        value = item.get(key)
+        if value is None:
+            continue
+        try:
+            return quantize_money_to_float(value)
+        except (TypeError, ValueError):
+            continue
+    return None
+
+
+def resolve_valuation_path(item: dict[str, Any]) -> ValuationPath | None:
+    valuation_payload = item.get("valuation")
+    if isinstance(valuation_payload, dict):
+        for key in NESTED_VALUATION_KEYS:
+            if valuation_payload.get(key) is not None:
+                return ValuationPath(nested=True, key=key)
+    for key in FLAT_VALUATION_KEYS:
+        if item.get(key) is not None:
+            return ValuationPath(nested=False, key=key)
+    return None
+
+
+def _market_value_on_path(item: dict[str, Any], path: ValuationPath) -> float | None:
+    # The resolved alias is only authoritative when no higher-priority alias is populated on
+    # this row; anything else goes through the full probe so results never diverge.
+    valuation_payload = item.get("valuation")
+    nested_payload = valuation_payload if isinstance(valuation_payload, dict) else None
+    if path.nested:
+        if nested_payload is None:
+            return parse_position_market_value(item)
+        raw = nested_payload.get(path.key)
+    else:
+        raw = item.get(path.key)
+    if raw is None:
+        return parse_position_market_value(item)
+    if nested_payload is not None:
+        for key in path.shadowing_nested_keys:
+            if nested_payload.get(key) is not None:
+                return parse_position_market_value(item)
+    for key in path.shadowing_flat_keys:
+        if item.get(key) is not None:
+            return parse_position_market_value(item)
+    try:
+        return quantize_money_to_float(raw)
+    except (TypeError, ValueError):
+        return parse_position_market_value(item)
+
+
+def extract_position_columns(snapshot_payload: dict[str, Any]) -> PositionColumns:
+    columns = PositionColumns()
+    holdings_payload = snapshot_payload.get("holdings", {})
+    if not isinstance(holdings_payload, dict):
+        return columns
+    by_asset_class = holdings_payload.get("holdingsByAssetClass", {})
+    if not isinstance(by_asset_class, dict):
+        return columns
+
+    security_ids = columns.security_ids
+    instrument_names = columns.instrument_names
+    asset_classes = columns.asset_classes
+    quantities = columns.quantities
+    market_values_base = columns.market_values_base
+    weights_pct = columns.weights_pct
+    path: ValuationPath | None = None
+    path_resolved = False
+
+    for asset_class, items in by_asset_class.items():
+        if not isinstance(items, list):
+            continue
+        asset_class_label = str(asset_class) if asset_class is not None else None
+        for item in items:
+            if not isinstance(item, dict):
+                continue
+            if not path_resolved:
+                path = resolve_valuation_path(item)
+                path_resolved = path is not None
+            security_ids.append(str(item.get("instrument_id", item.get("security_id", "UNKNOWN"))))
+            instrument_names.append(
+                str(item.get("instrument_name", item.get("instrument_id", "UNKNOWN")))
+            )
+            asset_classes.append(asset_class_label)
+            quantities.append(item.get("quantity", 0.0))
+            market_values_base.append(
+                _market_value_on_path(item, path)
+                if path is not None
+                else parse_position_market_value(item)
+            )
+            weights_pct.append(item.get("weight_pct"))
+    return columns
+
+
+def compute_position_weights(
+    market_values_base: list[Any],
+    reported_weights_pct: list[Any],
+    total_market_value: float,
+) -> list[Any]:
+    if total_market_value > 0:
+        return [
+            quantize_performance_to_float(reported)
+            if reported is not None
+            else (
+                quantize_performance_to_float((mv / total_market_value) * 100.0)
+                if mv is not None
+                else None
+            )
+            for reported, mv in zip(reported_weights_pct, market_values_base)
+        ]
+    return [
+        quantize_performance_to_float(reported) if reported is not None else None
+        for reported in reported_weights_pct
+    ]
+
+
+def count_position_rows(snapshot_payload: dict[str, Any]) -> int:
+    holdings_payload = snapshot_payload.get("holdings", {})
+    if not isinstance(holdings_payload, dict):
+        return 0
+    by_asset_class = holdings_payload.get("holdingsByAssetClass", {})
+    if not isinstance(by_asset_class, dict):
+        return 0
+    return sum(len(items) for items in by_asset_class.values() if isinstance(items, list))
+
+
+def extract_current_positions(snapshot_payload: dict[str, Any]) -> list[WorkbenchPositionView]:
+    overview_payload = snapshot_payload.get("overview", {})
+    total_market_value = 0.0
+    if isinstance(overview_payload, dict):
+        total_market_value = quantize_money_to_float(
+            overview_payload.get("total_market_value", 0.0)
+        )
+
+    columns = extract_position_columns(snapshot_payload)
+    if not columns:
+        return []
+
+    quantities = [quantize_quantity_to_float(raw) for raw in columns.quantities]
+    weights = compute_position_weights(
+        columns.market_values_base, columns.weights_pct, total_market_value
+    )
+    security_ids = columns.security_ids
+    instrument_names = columns.instrument_names
+    asset_classes = columns.asset_classes
+    market_values_base = columns.market_values_base
+    order = sorted(range(len(security_ids)), key=security_ids.__getitem__)
+    return POSITION_VIEWS_ADAPTER.validate_python(
+        [
+            {
+                "security_id": security_ids[index],
+                "instrument_name": instrument_names[index],
+                "asset_class": asset_classes[index],
+                "quantity": quantities[index],
+                "market_value_base": market_values_base[index],
+                "weight_pct": weights[index],
+            }
+            for index in order
+        ]
+    )
+
+
+def extract_projected_positions(rows_payload: Any) -> list[WorkbenchProjectedPositionView]:
+    if not isinstance(rows_payload, list):
+        return []
+    return PROJECTED_POSITION_VIEWS_ADAPTER.validate_python(
+        [
+            {
+                "security_id": str(row.get("security_id", "")),
+                "instrument_name": str(
+                    row.get("instrument_name", row.get("security_id", "UNKNOWN"))
+                ),
+                "asset_class": (
+                    str(row["asset_class"]) if row.get("asset_class") is not None else None
+                ),
+                "baseline_quantity": quantize_quantity_to_float(row.get("baseline_quantity", 0.0)),
+                "proposed_quantity": quantize_quantity_to_float(row.get("proposed_quantity", 0.0)),
+                "delta_quantity": quantize_quantity_to_float(row.get("delta_quantity", 0.0)),
+            }
+            for row in rows_payload
+            if isinstance(row, dict)
+        ]
+    )
@@ -26,12 +26,19 @@ from app.contracts.workbench import (
     WorkbenchSandboxStateResponse,
     WorkbenchTopChange,
 )
+from app.offload import run_offloaded
 from app.precision_policy import (
     quantize_money,
     quantize_performance,
     quantize_quantity,
     quantize_risk,
 )
+from app.services.position_parsing import (
+    count_position_rows,
+    extract_current_positions,
+    extract_projected_positions,
+    parse_position_market_value,
+)
 
 
 class WorkbenchService:
@@ -129,7 +136,12 @@ class WorkbenchService:
         )
         self._raise_for_pas_error(passthrough_status, passthrough_payload)
         snapshot_payload = passthrough_payload.get("snapshot", {})
-        current_positions = self._extract_current_positions(snapshot_payload)
+        current_positions = await run_offloaded(
+            "current_positions",
+            extract_current_positions,
+            snapshot_payload,
+            size=count_position_rows(snapshot_payload),
+        )
 
         projected_positions: list[WorkbenchProjectedPositionView] = []
         projected_summary: WorkbenchProjectedSummary | None = None
@@ -435,30 +447,7 @@ class WorkbenchService:
                 detail=f"lotus-core projected summary unavailable: {summary_payload}",
             )
 
-        rows_payload = positions_payload.get("positions", [])
-        rows: list[WorkbenchProjectedPositionView] = []
-        if isinstance(rows_payload, list):
-            for row in rows_payload:
-                if not isinstance(row, dict):
-                    continue
-                rows.append(
-                    WorkbenchProjectedPositionView(
-                        security_id=str(row.get("security_id", "")),
-                        instrument_name=str(
-                            row.get("instrument_name", row.get("security_id", "UNKNOWN"))
-                        ),
-                        asset_class=(
-                            str(row["asset_class"]) if row.get("asset_class") is not None else None
-                        ),
-                        baseline_quantity=float(
-                            quantize_quantity(row.get("baseline_quantity", 0.0))
-                        ),
-                        proposed_quantity=float(
-                            quantize_quantity(row.get("proposed_quantity", 0.0))
-                        ),
-                        delta_quantity=float(quantize_quantity(row.get("delta_quantity", 0.0))),
-                    )
-                )
+        rows = extract_projected_positions(positions_payload.get("positions", []))
 
         summary = WorkbenchProjectedSummary(
             total_baseline_positions=int(summary_payload.get("total_baseline_positions", 0)),
@@ -472,82 +461,10 @@ class WorkbenchService:
     def _extract_current_positions(
         self, snapshot_payload: dict[str, Any]
     ) -> list[WorkbenchPositionView]:
-        overview_payload = snapshot_payload.get("overview", {})
-        total_market_value = 0.0
-        if isinstance(overview_payload, dict):
-            total_market_value = float(
-                quantize_money(overview_payload.get("total_market_value", 0.0))
-            )
-
-        holdings_payload = snapshot_payload.get("holdings", {})
-        if not isinstance(holdings_payload, dict):
-            return []
-        by_asset_class = holdings_payload.get("holdingsByAssetClass", {})
-        if not isinstance(by_asset_class, dict):
-            return []
-
-        rows: list[WorkbenchPositionView] = []
-        for asset_class, items in by_asset_class.items():
-            if not isinstance(items, list):
-                continue
-            for item in items:
-                if not isinstance(item, dict):
-                    continue
-                market_value_base = self._parse_position_market_value(item)
-                weight_pct_raw = item.get("weight_pct")
-                weight_pct = (
-                    float(quantize_performance(weight_pct_raw))
-                    if weight_pct_raw is not None
-                    else None
-                )
-                if weight_pct is None and market_value_base is not None and total_market_value > 0:
-                    weight_pct = float(
-                        quantize_performance((market_value_base / total_market_value) * 100.0)
-                    )
-                rows.append(
-                    WorkbenchPositionView(
-                        security_id=str(
-                            item.get("instrument_id", item.get("security_id", "UNKNOWN"))
-                        ),
-                        instrument_name=str(
-                            item.get("instrument_name", item.get("instrument_id", "UNKNOWN"))
-                        ),
-                        asset_class=str(asset_class) if asset_class is not None else None,
-                        quantity=float(quantize_quantity(item.get("quantity", 0.0))),
-                        market_value_base=market_value_base,
-                        weight_pct=weight_pct,
-                    )
-                )
-        rows.sort(key=lambda row: row.security_id)
-        return rows
+        return extract_current_positions(snapshot_payload)
 
     def _parse_position_market_value(self, item: dict[str, Any]) -> float | None:
-        valuation_payload = item.get("valuation")
-        if isinstance(valuation_payload, dict):
-            for key in ("market_value_base", "market_value", "current_value_base", "current_value"):
-                value = valuation_payload.get(key)
-                if value is None:
-                    continue
-                try:
-                    return float(quantize_money(value))
-                except (TypeError, ValueError):
-                    continue
-        for key in (
-            "market_value_base",
-            "market_value",
-            "current_value_base",
-            "current_value",
-            "valuation_base",
-            "value_base",
-        ):
-            value = item.get(key)
-            if value is None:
-                continue
-            try:
-                return float(quantize_money(value))
-            except (TypeError, ValueError):
-                continue
-        return None
+        return parse_position_market_value(item)
 
     async def _evaluate_policy_feedback(
         self,
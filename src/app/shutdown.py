@@ -0,0 +1,94 @@
+import asyncio
+import logging
+import signal
+import threading
+from types import FrameType
+from typing import Any
+
+from app.middleware import in_flight
+
+logger = logging.getLogger("shutdown")
+
+
+class PreStopDrain:
+    # Uvicorn only runs lifespan shutdown after it has stopped listening and waited for open
+    # connections, which is too late to take the pod out of rotation. This takes over SIGTERM
+    # for the lifetime of the app: readiness turns to draining at once, the server keeps serving
+    # for the pre-stop delay and until in-flight requests finish, and only then is the server's
+    # own SIGTERM handler run so it can begin its shutdown.
+
+    def __init__(
+        self, state: Any, pre_stop_delay_seconds: float, grace_period_seconds: float
+    ) -> None:
+        self.state = state
+        self.pre_stop_delay_seconds = pre_stop_delay_seconds
+        self.grace_period_seconds = grace_period_seconds
+        self._previous: Any = None
+        self._installed = False
+        self._signalled = False
+        self._exited = False
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._task: asyncio.Task[None] | None = None
+
+    def install(self) -> bool:
+        # Signal handlers can only be set from the main thread; under a test client the app runs
+        # elsewhere and shutdown stays with the lifespan.
+        if threading.current_thread() is not threading.main_thread():
+            return False
+        self._loop = asyncio.get_running_loop()
+        self._previous = signal.signal(signal.SIGTERM, self._handle_sigterm)
+        self._installed = True
+        return True
+
+    def uninstall(self) -> None:
+        # Lifespan shutdown: whatever stopped the server, a pending drain must not signal it again.
+        self._exited = True
+        self._restore_handler()
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+
+    def _restore_handler(self) -> None:
+        if not self._installed:
+            return
+        self._installed = False
+        if signal.getsignal(signal.SIGTERM) == self._handle_sigterm:
+            signal.signal(signal.SIGTERM, self._previous)
+
+    def _handle_sigterm(self, signum: int, frame: FrameType | None) -> None:
+        if self._signalled or self._loop is None:
+            # A second SIGTERM stops waiting and hands over to the server straight away.
+            self._exit(signum, frame)
+            return
+        self._signalled = True
+        self._loop.call_soon_threadsafe(self._begin, signum, frame)
+
+    def _begin(self, signum: int, frame: FrameType | None) -> None:
+        self.state.is_draining = True
+        logger.info(
+            "shutdown.draining",
+            extra={
+                "extra_fields": {
+                    "in_flight": in_flight.IN_FLIGHT.in_flight,
+                    "pre_stop_delay_seconds": self.pre_stop_delay_seconds,
+                }
+            },
+        )
+        self._task = asyncio.create_task(self._drain_then_exit(signum, frame))
+
+    async def _drain_then_exit(self, signum: int, frame: FrameType | None) -> None:
+        try:
+            await asyncio.sleep(self.pre_stop_delay_seconds)
+            await in_flight.IN_FLIGHT.drain(self.grace_period_seconds)
+        finally:
+            self._exit(signum, frame)
+
+    def _exit(self, signum: int, frame: FrameType | None) -> None:
+        if self._exited:
+            return
+        self._exited = True
+        previous = self._previous
+        self._restore_handler()
+        if callable(previous):
+            previous(signum, frame)
+        elif previous != signal.SIG_IGN:
+            signal.raise_signal(signum)
@@ -0,0 +1,258 @@
+import asyncio
+import logging
+import os
+import random
+import re
+import tempfile
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextvars import ContextVar
+from typing import Any
+
+from app import json_codec
+from app.config import settings
+
+logger = logging.getLogger("tracing")
+
+_ids = random.Random()
+_OTLP_SPAN_KINDS = {"internal": 1, "server": 2, "client": 3}
+_OTLP_STATUS_CODES = {"unset": 0, "ok": 1, "error": 2}
+_HEX_DIGITS = re.compile(r"[0-9a-fA-F]+")
+
+
+def _new_id(bits: int) -> str:
+    # All-zero ids are invalid in W3C trace context.
+    return format(_ids.getrandbits(bits) or 1, f"0{bits // 4}x")
+
+
+def _is_hex_id(value: str, length: int) -> bool:
+    # int(value, 16) would also accept a "0x" prefix, "_" separators and surrounding whitespace.
+    return (
+        len(value) == length and value != "0" * length and _HEX_DIGITS.fullmatch(value) is not None
+    )
+
+
+def parse_traceparent(header: str | None) -> tuple[str, str, bool] | None:
+    if not header:
+        return None
+    parts = header.strip().lower().split("-")
+    if (
+        len(parts) < 4
+        or not _is_hex_id(parts[1], 32)
+        or not _is_hex_id(parts[2], 16)
+        or len(parts[3]) != 2
+        or _HEX_DIGITS.fullmatch(parts[3]) is None
+    ):
+        return None
+    return parts[1], parts[2], bool(int(parts[3], 16) & 1)
+
+
+class Span:
+    __slots__ = (
+        "name",
+        "kind",
+        "trace_id",
+        "span_id",
+        "parent_span_id",
+        "sampled",
+        "attributes",
+        "status",
+        "start_ns",
+        "end_ns",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        kind: str,
+        trace_id: str,
+        parent_span_id: str | None,
+        sampled: bool,
+        attributes: dict[str, Any] | None = None,
+    ):
+        self.name = name
+        self.kind = kind
+        self.trace_id = trace_id
+        self.span_id = _new_id(64)
+        self.parent_span_id = parent_span_id
+        self.sampled = sampled
+        self.attributes: dict[str, Any] = dict(attributes or {})
+        self.status = "unset"
+        self.start_ns = time.time_ns()
+        self.end_ns: int | None = None
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-{'01' if self.sampled else '00'}"
+
+    def to_otlp(self) -> dict[str, Any]:
+        span: dict[str, Any] = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": _OTLP_SPAN_KINDS.get(self.kind, 1),
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns or self.start_ns),
+            "attributes": [_otlp_attribute(key, value) for key, value in self.attributes.items()],
+            "status": {"code": _OTLP_STATUS_CODES[self.status]},
+        }
+        if self.parent_span_id:
+            span["parentSpanId"] = self.parent_span_id
+        return span
+
+
+def _otlp_attribute(key: str, value: Any) -> dict[str, Any]:
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+
+current_span_var: ContextVar[Span | None] = ContextVar("current_span", default=None)
+
+
+class SpanExporter(ABC):
+    @abstractmethod
+    def export(self, spans: list[Span]) -> None: ...
+
+
+class NoopSpanExporter(SpanExporter):
+    def export(self, spans: list[Span]) -> None:
+        return None
+
+
+class JsonLinesSpanExporter(SpanExporter):
+    # One OTLP/JSON ExportTraceServiceRequest per line, the format the OpenTelemetry collector's
+    # file receiver and exporter use, so the file can be replayed into any OTLP backend. Once the
+    # file would pass `max_bytes` it is moved to `<path>.1`, replacing the previous one, so at most
+    # two files' worth of spans are kept.
+
+    def __init__(self, path: str, service_name: str = "lotus-gateway", max_bytes: int = 0):
+        self.path = path
+        self.service_name = service_name
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    def export(self, spans: list[Span]) -> None:
+        request = {
+            "resourceSpans": [
+                {
+                    "resource": {
+                        "attributes": [_otlp_attribute("service.name", self.service_name)]
+                    },
+                    "scopeSpans": [
+                        {
+                            "scope": {"name": "app.tracing"},
+                            "spans": [span.to_otlp() for span in spans],
+                        }
+                    ],
+                }
+            ]
+        }
+        line = json_codec.dumps(request) + b"\n"
+        with self._lock:
+            try:
+                if self.max_bytes > 0:
+                    self._rotate_if_full(len(line))
+                with open(self.path, "ab") as handle:
+                    handle.write(line)
+            except OSError as exc:
+                logger.warning(
+                    "tracing.export_failed",
+                    extra={"extra_fields": {"path": self.path, "error": str(exc)}},
+                )
+
+    def _rotate_if_full(self, incoming_bytes: int) -> None:
+        try:
+            size = os.path.getsize(self.path)
+        except FileNotFoundError:
+            return
+        if size and size + incoming_bytes > self.max_bytes:
+            os.replace(self.path, f"{self.path}.1")
+
+
+class Tracer:
+    def __init__(
+        self,
+        exporter: SpanExporter,
+        sample_ratio: float,
+        batch_size: int = 64,
+        parent_based: bool = True,
+    ):
+        self.exporter = exporter
+        self.sample_ratio = sample_ratio
+        self.batch_size = max(1, batch_size)
+        self.parent_based = parent_based
+        self._pending: list[Span] = []
+
+    def start_span(
+        self,
+        name: str,
+        kind: str = "internal",
+        attributes: dict[str, Any] | None = None,
+        traceparent: str | None = None,
+        trace_id: str | None = None,
+    ) -> Span:
+        # Unsampled spans still get real ids so downstream services can attach to them; they are
+        # only skipped at export.
+        remote = parse_traceparent(traceparent)
+        parent = current_span_var.get()
+        if remote is not None:
+            trace_id, parent_span_id, parent_sampled = remote
+            sampled = parent_sampled if self.parent_based else self._sample()
+        elif parent is not None:
+            trace_id, parent_span_id, sampled = parent.trace_id, parent.span_id, parent.sampled
+        else:
+            parent_span_id = None
+            sampled = self._sample()
+        if trace_id is None or not _is_hex_id(trace_id, 32):
+            trace_id = _new_id(128)
+        return Span(name, kind, trace_id.lower(), parent_span_id, sampled, attributes)
+
+    def _sample(self) -> bool:
+        return self.sample_ratio >= 1.0 or _ids.random() < self.sample_ratio
+
+    def end_span(self, span: Span, error: bool = False) -> None:
+        span.end_ns = time.time_ns()
+        span.status = "error" if error else "ok"
+        if not span.sampled:
+            return
+        self._pending.append(span)
+        if len(self._pending) >= self.batch_size:
+            batch, self._pending = self._pending, []
+            self._export(batch)
+
+    def _export(self, batch: list[Span]) -> None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.exporter.export(batch)
+            return
+        loop.run_in_executor(None, self.exporter.export, batch)
+
+    def flush(self) -> None:
+        batch, self._pending = self._pending, []
+        if batch:
+            self.exporter.export(batch)
+
+
+def build_tracer() -> Tracer:
+    exporter: SpanExporter = NoopSpanExporter()
+    if settings.tracing_exporter == "jsonl":
+        exporter = JsonLinesSpanExporter(
+            settings.tracing_export_path
+            or os.path.join(tempfile.gettempdir(), "lotus-gateway-spans.jsonl"),
+            service_name=os.getenv("SERVICE_NAME", "lotus-gateway"),
+            max_bytes=settings.tracing_export_max_bytes,
+        )
+    return Tracer(
+        exporter,
+        sample_ratio=settings.tracing_sample_ratio,
+        batch_size=settings.tracing_export_batch_size,
+        parent_based=settings.tracing_parent_based_sampling,
+    )
+
+
+TRACER = build_tracer()
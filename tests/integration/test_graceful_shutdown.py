@@ -0,0 +1,96 @@
+import asyncio
+import os
+import signal
+import socket
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from types import FrameType
+
+import httpx
+import pytest
+import uvicorn
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+
+from app.middleware import in_flight
+from app.middleware.in_flight import InFlightMiddleware, InFlightTracker
+from app.shutdown import PreStopDrain
+
+
+@pytest.mark.asyncio
+async def test_sigterm_drains_while_server_still_accepts(monkeypatch):
+    tracker = InFlightTracker()
+    monkeypatch.setattr(in_flight, "IN_FLIGHT", tracker)
+    events: list[str] = []
+    release = asyncio.Event()
+
+    @asynccontextmanager
+    async def lifespan(application: FastAPI) -> AsyncIterator[None]:
+        application.state.is_draining = False
+        pre_stop = PreStopDrain(application.state, 0.2, 5.0)
+        assert pre_stop.install()
+        yield
+        pre_stop.uninstall()
+        events.append("lifespan_shutdown")
+
+    application = FastAPI(lifespan=lifespan)
+    application.add_middleware(InFlightMiddleware)
+
+    @application.get("/ready")
+    async def ready() -> JSONResponse:
+        if application.state.is_draining:
+            return JSONResponse({"status": "draining"}, status_code=503)
+        return JSONResponse({"status": "ready"})
+
+    @application.get("/slow")
+    async def slow() -> dict[str, str]:
+        await release.wait()
+        events.append("slow_done")
+        return {"status": "ok"}
+
+    # Uvicorn re-raises the captured SIGTERM once it has shut down; catch it here.
+    received: list[int] = []
+
+    def _record(signum: int, frame: FrameType | None) -> None:
+        received.append(signum)
+
+    original = signal.signal(signal.SIGTERM, _record)
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(application, log_config=None, lifespan="on"))
+    serve_task = asyncio.create_task(server.serve(sockets=[sock]))
+    try:
+        while not server.started:
+            await asyncio.sleep(0.01)
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}") as client:
+            assert (await client.get("/ready")).status_code == 200
+            slow_request = asyncio.create_task(client.get("/slow"))
+            while tracker.in_flight == 0:
+                await asyncio.sleep(0.01)
+
+            os.kill(os.getpid(), signal.SIGTERM)
+            await asyncio.sleep(0.05)
+            ready = await client.get("/ready")
+            assert ready.status_code == 503
+            assert ready.json() == {"status": "draining"}
+
+            await asyncio.sleep(0.3)
+            # Past the pre-stop delay, but a request is still in flight: uvicorn keeps serving.
+            assert not server.should_exit
+            assert (await client.get("/ready")).status_code == 503
+
+            release.set()
+            assert (await slow_request).status_code == 200
+        await asyncio.wait_for(serve_task, timeout=5)
+    finally:
+        release.set()
+        if not serve_task.done():
+            server.should_exit = True
+            await asyncio.wait_for(serve_task, timeout=5)
+        signal.signal(signal.SIGTERM, original)
+        sock.close()
+
+    assert events == ["slow_done", "lifespan_shutdown"]
+    assert received == [signal.SIGTERM]
@@ -1,8 +1,17 @@
+import asyncio
+import threading
+import time
 from concurrent.futures import ThreadPoolExecutor
 
+from fastapi import FastAPI, HTTPException
 from fastapi.testclient import TestClient
+from starlette.exceptions import HTTPException as StarletteHTTPException
 
-from app.main import app
+from app import audit_sink
+from app.audit_sink import AuditSink, AuditSpool
+from app.config import settings
+from app.loop_monitor import LOOP_MONITOR
+from app.main import app, http_exception_handler
 
 
 def test_health_live_and_ready_endpoints():
@@ -48,7 +57,20 @@ def test_health_ready_returns_503_when_draining():
     assert response.json() == {"status": "draining"}
 
 
-def test_lifespan_marks_draining_on_shutdown():
+def test_health_ready_returns_503_while_event_loop_is_saturated(monkeypatch):
+    monkeypatch.setattr(LOOP_MONITOR, "lag_seconds", 2.5)
+    client = TestClient(app)
+    response = client.get("/health/ready")
+
+    assert response.status_code == 503
+    assert response.json() == {"status": "saturated"}
+
+    monkeypatch.setattr(settings, "event_loop_unready_lag_seconds", 0.0)
+    assert client.get("/health/ready").status_code == 200
+
+
+def test_lifespan_marks_draining_on_shutdown(monkeypatch):
+    monkeypatch.setattr(settings, "upstream_warmup_enabled", False)
     app.state.is_draining = True
     with TestClient(app) as client:
         response = client.get("/health/ready")
@@ -57,3 +79,86 @@ def test_lifespan_marks_draining_on_shutdown():
         assert app.state.is_draining is False
 
     assert app.state.is_draining is True
+
+
+def test_health_ready_reports_warming_until_upstream_warm_up_finishes(monkeypatch):
+    release = threading.Event()
+
+    async def _slow_warm_up():
+        while not release.is_set():
+            await asyncio.sleep(0.01)
+        return {}
+
+    monkeypatch.setattr(settings, "upstream_warmup_enabled", True)
+    monkeypatch.setattr("app.main.warm_up_upstreams", _slow_warm_up)
+    with TestClient(app) as client:
+        warming = client.get("/health/ready")
+        release.set()
+        for _ in range(100):
+            ready = client.get("/health/ready")
+            if ready.status_code == 200:
+                break
+            time.sleep(0.01)
+
+    assert warming.status_code == 503
+    assert warming.json() == {"status": "warming"}
+    assert ready.json() == {"status": "ready"}
+
+
+def test_lifespan_shutdown_cancels_unfinished_warm_up(monkeypatch):
+    async def _never_finishes():
+        await asyncio.sleep(60)
+
+    monkeypatch.setattr(settings, "upstream_warmup_enabled", True)
+    monkeypatch.setattr("app.main.warm_up_upstreams", _never_finishes)
+    with TestClient(app) as client:
+        assert client.get("/health/ready").status_code == 503
+
+    assert app.state.is_warming is False
+
+
+def test_http_exception_handler_keeps_detail_shape_and_headers():
+    # A throwaway app with the gateway's handler, so no test routes leak onto the shared app.
+    application = FastAPI()
+    application.add_exception_handler(StarletteHTTPException, http_exception_handler)
+
+    @application.get("/_test/http-error")
+    async def _test_http_error():
+        raise HTTPException(status_code=502, detail="upstream down", headers={"Retry-After": "1"})
+
+    @application.get("/_test/not-modified")
+    async def _test_not_modified():
+        raise HTTPException(status_code=304)
+
+    client = TestClient(application)
+    response = client.get("/_test/http-error")
+    assert response.status_code == 502
+    assert response.json() == {"detail": "upstream down"}
+    assert response.headers["retry-after"] == "1"
+
+    not_modified = client.get("/_test/not-modified")
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+
+
+def test_metrics_endpoint_exports_upstream_bulkhead_metrics():
+    client = TestClient(app)
+    body = client.get("/metrics").text
+    assert "lotus_gateway_upstream_in_flight" in body
+    assert "lotus_gateway_upstream_queue_wait_seconds" in body
+    assert "lotus_gateway_upstream_rejected_total" in body
+
+
+def test_lifespan_runs_the_audit_sink_when_enabled(monkeypatch, tmp_path):
+    sink = AuditSink(
+        AuditSpool(str(tmp_path), max_bytes=0, max_age_seconds=0),
+        max_queue=10,
+        batch_size=10,
+        flush_interval_seconds=0.01,
+    )
+    monkeypatch.setattr(audit_sink, "AUDIT_SINK", sink)
+    monkeypatch.setattr(settings, "audit_sink_enabled", True)
+    with TestClient(app):
+        assert sink.running
+
+    assert not sink.running
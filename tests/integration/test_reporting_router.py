@@ -143,3 +143,20 @@ def test_reporting_review_upstream_error(monkeypatch):
         json={"as_of_date": "2026-02-24"},
     )
     assert response.status_code == 502
+
+
+def test_reporting_snapshot_rejects_non_object_rows(monkeypatch):
+    async def _mock_get_portfolio_snapshot(self, portfolio_id, as_of_date, correlation_id):  # noqa: ARG001
+        return 200, {"generatedAt": "2026-02-24T07:00:00Z", "rows": ["not-a-row"]}
+
+    monkeypatch.setattr(
+        "app.clients.reporting_client.ReportingClient.get_portfolio_snapshot",
+        _mock_get_portfolio_snapshot,
+    )
+
+    client = TestClient(app)
+    response = client.get("/api/v1/reports/DEMO_DPM_EUR_001/snapshot?asOfDate=2026-02-24")
+    assert response.status_code == 502
+    assert response.json() == {
+        "detail": "Reporting snapshot unavailable: upstream returned malformed rows"
+    }
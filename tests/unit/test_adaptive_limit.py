@@ -0,0 +1,88 @@
+import pytest
+
+from app.clients.adaptive_limit import AimdConcurrencyLimit
+
+
+def test_aimd_limit_clamps_initial_limit():
+    assert AimdConcurrencyLimit(initial_limit=100, min_limit=2, max_limit=10).limit == 10
+    assert AimdConcurrencyLimit(initial_limit=0, min_limit=0, max_limit=0).limit == 1
+
+
+def test_aimd_limit_grows_additively_only_while_utilised():
+    limiter = AimdConcurrencyLimit(initial_limit=4, min_limit=1, max_limit=6)
+
+    for step in range(4):
+        limiter.update(0.05, overloaded=False, in_flight=1, now=float(step))
+    assert limiter.limit == 4
+
+    for step in range(5):
+        limiter.update(0.05, overloaded=False, in_flight=4, now=float(step))
+    assert limiter.limit == 5
+
+    for step in range(50):
+        limiter.update(0.05, overloaded=False, in_flight=6, now=float(step))
+    assert limiter.limit == 6
+
+
+def test_aimd_limit_backs_off_once_per_smoothed_rtt_on_overload():
+    limiter = AimdConcurrencyLimit(initial_limit=20, min_limit=2, max_limit=20, backoff_ratio=0.5)
+    limiter.update(0.1, overloaded=False, in_flight=0, now=0.0)
+
+    assert limiter.update(3.0, overloaded=True, in_flight=20, now=1.0) == 10
+    assert limiter.update(3.0, overloaded=True, in_flight=20, now=1.05) == 10
+    assert limiter.update(3.0, overloaded=True, in_flight=20, now=1.2) == 5
+    for step in range(10):
+        limiter.update(3.0, overloaded=True, in_flight=20, now=2.0 + step)
+    assert limiter.limit == 2
+    assert limiter.rtt["unspecified"].ewma == pytest.approx(0.1)
+
+
+def test_aimd_limit_shrinks_when_latency_inflates_past_tolerance():
+    limiter = AimdConcurrencyLimit(
+        initial_limit=10, min_limit=1, max_limit=10, latency_tolerance=2.0, smoothing=1.0
+    )
+    limiter.update(0.05, overloaded=False, in_flight=10, now=0.0)
+    estimate = limiter.rtt["unspecified"]
+    assert estimate.baseline == pytest.approx(0.05)
+
+    assert limiter.update(0.5, overloaded=False, in_flight=10, now=1.0) == 9
+    assert estimate.ewma == pytest.approx(0.5)
+    assert estimate.baseline == pytest.approx(0.05 + 0.45 * 0.01)
+
+    limiter.update(0.01, overloaded=False, in_flight=0, now=2.0)
+    assert estimate.baseline == pytest.approx(0.01)
+
+
+def test_aimd_limit_ignores_inflated_latency_while_limit_is_not_saturated():
+    limiter = AimdConcurrencyLimit(
+        initial_limit=10, min_limit=1, max_limit=10, latency_tolerance=2.0, smoothing=1.0
+    )
+    limiter.update(0.05, overloaded=False, in_flight=1, now=0.0)
+
+    for step in range(5):
+        assert limiter.update(0.5, overloaded=False, in_flight=5, now=1.0 + step) == 10
+    assert limiter.update(0.5, overloaded=False, in_flight=8, now=10.0) == 9
+
+
+def test_aimd_limit_keeps_separate_rtt_estimates_for_fast_and_slow_operations():
+    limiter = AimdConcurrencyLimit(initial_limit=8, min_limit=2, max_limit=16)
+
+    # A saturated mix of 10ms lookups and 500ms snapshots at steady latency is not congestion,
+    # even though the snapshots run at fifty times the lookups' baseline.
+    for step in range(200):
+        now = step * 0.05
+        limiter.update(0.01, overloaded=False, in_flight=limiter.limit, now=now, operation="lookup")
+        limiter.update(
+            0.5, overloaded=False, in_flight=limiter.limit, now=now, operation="snapshot"
+        )
+
+    assert limiter.limit == 16
+    assert limiter.rtt["lookup"].baseline == pytest.approx(0.01)
+    assert limiter.rtt["snapshot"].baseline == pytest.approx(0.5)
+
+    # The snapshot operation slowing down still backs the limit off.
+    for step in range(20):
+        limiter.update(
+            2.0, overloaded=False, in_flight=limiter.limit, now=20.0 + step, operation="snapshot"
+        )
+    assert limiter.limit < 16
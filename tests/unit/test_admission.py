@@ -0,0 +1,169 @@
+import asyncio
+import sys
+import time
+from contextlib import asynccontextmanager
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+
+from app.config import settings
+from app.loop_monitor import LOOP_MONITOR, LoopLagMonitor, describe_loop_stack
+from app.middleware import in_flight
+from app.middleware.admission import AdmissionMiddleware
+from app.middleware.correlation import CorrelationMiddleware
+from app.middleware.in_flight import InFlightTracker
+
+
+def _shed_count(priority: str) -> float:
+    return (
+        REGISTRY.get_sample_value("lotus_gateway_requests_shed_total", {"priority": priority})
+        or 0.0
+    )
+
+
+def _client(monkeypatch, in_flight_count: int = 0, lag_seconds: float = 0.0) -> TestClient:
+    tracker = InFlightTracker()
+    tracker.in_flight = in_flight_count
+    monkeypatch.setattr(in_flight, "IN_FLIGHT", tracker)
+    monkeypatch.setattr(LOOP_MONITOR, "lag_seconds", lag_seconds)
+    application = FastAPI()
+    application.add_middleware(AdmissionMiddleware)
+
+    for path in (
+        "/health/ready",
+        "/api/v1/workbench/P1/overview",
+        "/api/v1/platform/capabilities",
+        "/api/v1/reports/P1/snapshot",
+        "/api/v1/intake/uploads/commit",
+    ):
+        application.add_api_route(path, lambda: {"ok": True})
+    return TestClient(application)
+
+
+def test_admission_sheds_low_priority_first_under_in_flight_pressure(monkeypatch):
+    monkeypatch.setattr(settings, "admission_max_in_flight", 100)
+    low_before = _shed_count("low")
+    client = _client(monkeypatch, in_flight_count=60)
+
+    shed = client.get("/api/v1/reports/P1/snapshot")
+
+    assert shed.status_code == 503
+    assert shed.headers["retry-after"] == "1"
+    assert shed.json() == {"detail": "gateway overloaded", "error_code": "GATEWAY_OVERLOADED"}
+    assert client.get("/api/v1/intake/uploads/commit").status_code == 503
+    assert client.get("/api/v1/platform/capabilities").status_code == 200
+    assert client.get("/api/v1/workbench/P1/overview").status_code == 200
+    assert _shed_count("low") - low_before == 2
+
+
+def test_admission_uses_loop_lag_and_never_sheds_critical_routes(monkeypatch):
+    monkeypatch.setattr(settings, "admission_max_loop_lag_seconds", 0.1)
+    high_before = _shed_count("high")
+    client = _client(monkeypatch, lag_seconds=0.5)
+
+    assert client.get("/api/v1/platform/capabilities").status_code == 503
+    assert client.get("/api/v1/workbench/P1/overview").status_code == 503
+    assert client.get("/health/ready").status_code == 200
+    assert _shed_count("high") - high_before == 1
+
+
+def test_admission_can_ignore_lag_or_be_disabled(monkeypatch):
+    monkeypatch.setattr(settings, "admission_max_loop_lag_seconds", 0.0)
+    assert (
+        _client(monkeypatch, lag_seconds=5.0).get("/api/v1/reports/P1/snapshot").status_code == 200
+    )
+
+    monkeypatch.setattr(settings, "admission_control_enabled", False)
+    monkeypatch.setattr(settings, "admission_max_in_flight", 1)
+    client = _client(monkeypatch, in_flight_count=10)
+    assert client.get("/api/v1/reports/P1/snapshot").status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_loop_lag_monitor_measures_blocked_event_loop():
+    monitor = LoopLagMonitor(interval_seconds=0.01)
+    monitor.start()
+    monitor.start()
+    await asyncio.sleep(0)
+    time.sleep(0.06)
+    for _ in range(3):
+        await asyncio.sleep(0)
+
+    assert monitor.lag_seconds >= 0.04
+
+    await monitor.stop()
+    await monitor.stop()
+    assert monitor.lag_seconds == 0.0
+
+
+def test_loop_watchdog_attributes_stall_to_route_and_correlation_id():
+    monitor = LoopLagMonitor(interval_seconds=0.01, slow_callback_seconds=0.04)
+    reports: list[dict[str, str]] = []
+    report_stall = monitor.report_stall
+
+    def _capture(blocked_seconds: float) -> dict[str, str]:
+        details = report_stall(blocked_seconds)
+        reports.append(details)
+        return details
+
+    monitor.report_stall = _capture  # type: ignore[method-assign]
+
+    @asynccontextmanager
+    async def _lifespan(_application):
+        monitor.start()
+        yield
+        await monitor.stop()
+
+    application = FastAPI(lifespan=_lifespan)
+    application.add_middleware(CorrelationMiddleware)
+
+    @application.get("/portfolios/{portfolio_id}/blocking")
+    async def _blocking(portfolio_id: str):
+        await asyncio.sleep(0.03)
+        time.sleep(0.2)
+        return {"portfolio_id": portfolio_id}
+
+    slow_before = (
+        REGISTRY.get_sample_value(
+            "lotus_gateway_event_loop_slow_callbacks_total",
+            {"route": "/portfolios/{portfolio_id}/blocking"},
+        )
+        or 0.0
+    )
+    with TestClient(application) as client:
+        response = client.get("/portfolios/P1/blocking", headers={"X-Correlation-Id": "corr-lag"})
+
+    assert response.status_code == 200
+    assert reports[0]["route"] == "/portfolios/{portfolio_id}/blocking"
+    assert reports[0]["correlation_id"] == "corr-lag"
+    assert reports[0]["location"].startswith("test_admission.py:")
+    assert reports[0]["location"].endswith(" _blocking")
+    assert (
+        REGISTRY.get_sample_value(
+            "lotus_gateway_event_loop_slow_callbacks_total",
+            {"route": "/portfolios/{portfolio_id}/blocking"},
+        )
+        - slow_before
+        >= 1
+    )
+    assert (REGISTRY.get_sample_value("lotus_gateway_event_loop_lag_seconds_count", {}) or 0.0) > 0
+
+
+def test_describe_loop_stack_without_request_scope():
+    assert describe_loop_stack(None) == {
+        "route": "none",
+        "correlation_id": "",
+        "location": "unknown",
+    }
+    details = describe_loop_stack(sys._getframe())
+    assert details["route"] == "none"
+
+
+def test_describe_loop_stack_labels_scope_without_route_as_unmatched():
+    scope = {"type": "http", "path": "/api/v1/portfolios/P1/raw", "state": {"correlation_id": "c1"}}
+    details = describe_loop_stack(sys._getframe())
+    assert details["route"] == "unmatched"
+    assert details["correlation_id"] == "c1"
+    assert scope["path"] not in details.values()
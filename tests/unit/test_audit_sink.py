@@ -0,0 +1,289 @@
+import asyncio
+import json
+import threading
+
+import pytest
+from prometheus_client import REGISTRY
+from pydantic import ValidationError
+
+from app import audit_sink
+from app.audit_sink import AuditSink, AuditSpool
+from app.config import Settings
+from app.enterprise_readiness import emit_audit_event
+from app.middleware.correlation import JsonFormatter
+
+
+def _audit_events(outcome: str) -> float:
+    return (
+        REGISTRY.get_sample_value("lotus_gateway_audit_events_total", {"outcome": outcome}) or 0.0
+    )
+
+
+def _spooled_lines(directory) -> list[dict]:
+    return [
+        json.loads(line)
+        for path in sorted(directory.iterdir())
+        for line in path.read_text().splitlines()
+    ]
+
+
+def test_spool_rotates_by_size_and_age(tmp_path):
+    spool = AuditSpool(str(tmp_path), max_bytes=40, max_age_seconds=60.0)
+    spool.write_batch([{"action": "POST /a", "seq": 1}, {"action": "POST /a", "seq": 2}])
+    first = spool.path
+    spool.write_batch([{"action": "POST /a", "seq": 3}])
+    second = spool.path
+    spool._opened -= 120
+    spool.write_batch([{"action": "POST /a", "seq": 4}])
+    spool.close()
+
+    assert len({first, second, spool.path}) == 3
+    assert [event["seq"] for event in _spooled_lines(tmp_path)] == [1, 2, 3, 4]
+
+
+@pytest.mark.asyncio
+async def test_sink_batches_events_and_flushes_on_stop(tmp_path):
+    sink = AuditSink(
+        AuditSpool(str(tmp_path), max_bytes=0, max_age_seconds=0),
+        max_queue=100,
+        batch_size=50,
+        flush_interval_seconds=30.0,
+    )
+    assert sink.submit({"seq": 0}) is False
+    spooled_before = _audit_events("spooled")
+
+    sink.start()
+    for seq in range(5):
+        assert sink.submit({"seq": seq})
+    assert await sink.stop(timeout_seconds=5.0)
+
+    assert [event["seq"] for event in _spooled_lines(tmp_path)] == [0, 1, 2, 3, 4]
+    assert len(list(tmp_path.iterdir())) == 1
+    assert _audit_events("spooled") - spooled_before == 5
+    assert sink.submit({"seq": 5}) is False
+
+
+@pytest.mark.asyncio
+async def test_emit_audit_event_uses_sink_and_falls_back_to_log_on_overflow(
+    tmp_path, monkeypatch, caplog
+):
+    sink = AuditSink(
+        AuditSpool(str(tmp_path), max_bytes=0, max_age_seconds=0),
+        max_queue=1,
+        batch_size=10,
+        flush_interval_seconds=0.01,
+    )
+    monkeypatch.setattr(audit_sink, "AUDIT_SINK", sink)
+    overflow_before = _audit_events("overflow")
+    logged_before = _audit_events("logged")
+    sink.start()
+    with caplog.at_level("INFO", logger="audit"):
+        for action in ("POST /spooled", "POST /overflow"):
+            emit_audit_event(
+                service="lotus-gateway",
+                action=action,
+                actor_id="actor-1",
+                tenant_id="tenant-1",
+                role="advisor",
+                correlation_id="corr-1",
+                metadata={"token": "secret"},
+            )
+    await sink.stop(timeout_seconds=5.0)
+
+    (spooled,) = _spooled_lines(tmp_path)
+    assert spooled["action"] == "POST /spooled"
+    assert spooled["metadata"] == {"token": "***REDACTED***"}
+    (logged,) = [record for record in caplog.records if record.name == "audit"]
+    assert logged.getMessage() == "enterprise_audit_event"
+    assert logged.extra_fields["audit"]["action"] == "POST /overflow"
+    assert json.loads(JsonFormatter().format(logged))["audit"]["actor_id"] == "actor-1"
+    assert _audit_events("overflow") - overflow_before == 1
+    assert _audit_events("logged") - logged_before == 1
+
+
+def test_enabling_the_sink_requires_a_spool_dir(tmp_path):
+    with pytest.raises(ValidationError, match="AUDIT_SPOOL_DIR"):
+        Settings(audit_sink_enabled=True)
+    assert Settings(audit_sink_enabled=True, audit_spool_dir=str(tmp_path)).audit_sink_enabled
+
+
+def test_spool_fsync_policies_skip_per_batch_sync(tmp_path, monkeypatch):
+    synced: list[int] = []
+    monkeypatch.setattr(audit_sink.os, "fsync", synced.append)
+    for policy, expected_syncs in (("rotate", 1), ("never", 0)):
+        spool = AuditSpool(
+            str(tmp_path / policy), max_bytes=0, max_age_seconds=0, fsync_policy=policy
+        )
+        spool.write_batch([{"seq": 1}])
+        spool.write_batch([{"seq": 2}])
+        synced.clear()
+        spool.close()
+        spool.close()
+        assert len(synced) == expected_syncs
+        assert [event["seq"] for event in _spooled_lines(tmp_path / policy)] == [1, 2]
+
+
+class _RecordingSpool(AuditSpool):
+    def __init__(self, directory: str):
+        super().__init__(directory, max_bytes=0, max_age_seconds=0)
+        self.batches: list[list[int]] = []
+
+    def write_batch(self, events):
+        self.batches.append([event["seq"] for event in events])
+        super().write_batch(events)
+
+
+@pytest.mark.asyncio
+async def test_sink_writes_full_batches_at_once_and_partial_ones_after_the_interval(tmp_path):
+    spool = _RecordingSpool(str(tmp_path))
+    sink = AuditSink(spool, max_queue=100, batch_size=3, flush_interval_seconds=0.05)
+    sink.start()
+    sink.start()
+    for seq in range(7):
+        assert sink.submit({"seq": seq})
+
+    for _ in range(100):
+        if sum(len(batch) for batch in spool.batches) == 7:
+            break
+        await asyncio.sleep(0.01)
+    assert spool.batches == [[0, 1, 2], [3, 4, 5], [6]]
+
+    assert sink.submit({"seq": 7})
+    await asyncio.sleep(0)
+    assert sink.submit({"seq": 8})
+    for _ in range(100):
+        if len(spool.batches) == 4:
+            break
+        await asyncio.sleep(0.01)
+    assert spool.batches[3] == [7, 8]
+    assert await sink.stop(timeout_seconds=5.0)
+    assert [event["seq"] for event in _spooled_lines(tmp_path)] == list(range(9))
+
+
+class _FailingSpool(AuditSpool):
+    def write_batch(self, events):
+        raise OSError("disk full")
+
+
+@pytest.mark.asyncio
+async def test_sink_write_failure_logs_the_batch_instead_of_losing_it(tmp_path, caplog):
+    sink = AuditSink(
+        _FailingSpool(str(tmp_path), max_bytes=0, max_age_seconds=0),
+        max_queue=10,
+        batch_size=10,
+        flush_interval_seconds=0.0,
+    )
+    failed_before = _audit_events("write_failed")
+    sink.start()
+    with caplog.at_level("ERROR", logger="audit"):
+        assert sink.submit({"seq": 1})
+        assert sink.submit({"seq": 2})
+        for _ in range(100):
+            if _audit_events("write_failed") - failed_before == 2:
+                break
+            await asyncio.sleep(0.01)
+        assert await sink.stop(timeout_seconds=5.0)
+
+    (failed,) = [record for record in caplog.records if record.name == "audit"]
+    assert failed.getMessage() == "audit_sink.write_failed"
+    assert failed.extra_fields == {"error": "disk full", "events": [{"seq": 1}, {"seq": 2}]}
+    assert _audit_events("write_failed") - failed_before == 2
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.asyncio
+async def test_sink_stop_logs_queued_events_when_the_flush_times_out(tmp_path, caplog):
+    sink = AuditSink(
+        AuditSpool(str(tmp_path), max_bytes=0, max_age_seconds=0),
+        max_queue=10,
+        batch_size=10,
+        flush_interval_seconds=5.0,
+    )
+    released = asyncio.Event()
+
+    async def _stuck(queue):
+        # Stands in for a spool write that outlives the flush timeout.
+        while not released.is_set():
+            try:
+                await released.wait()
+            except asyncio.CancelledError:
+                continue
+
+    sink._run = _stuck
+    sink.start()
+    task = sink._task
+    await asyncio.sleep(0)
+    assert sink.submit({"seq": 1})
+    assert sink.submit({"seq": 2})
+    with caplog.at_level("WARNING"):
+        assert await sink.stop(timeout_seconds=0.05) is False
+    released.set()
+    await task
+
+    messages = [(record.name, record.getMessage()) for record in caplog.records]
+    assert ("audit_sink", "audit_sink.flush_timed_out") in messages
+    unflushed = [
+        record.extra_fields["audit"]["seq"]
+        for record in caplog.records
+        if record.getMessage() == "audit_sink.unflushed_event"
+    ]
+    assert unflushed == [1, 2]
+    assert {record.name for record in caplog.records if record.getMessage().endswith("event")} == {
+        "audit"
+    }
+    assert list(tmp_path.iterdir()) == []
+
+
+class _SlowSpool(AuditSpool):
+    def __init__(self, directory: str):
+        super().__init__(directory, max_bytes=0, max_age_seconds=0)
+        self.entered = threading.Event()
+        self.release = threading.Event()
+
+    def write_batch(self, events):
+        self.entered.set()
+        self.release.wait(5.0)
+        super().write_batch(events)
+
+
+@pytest.mark.asyncio
+async def test_sink_stop_waits_for_the_write_in_flight_and_refuses_late_writes(tmp_path, caplog):
+    spool = _SlowSpool(str(tmp_path))
+    sink = AuditSink(spool, max_queue=10, batch_size=1, flush_interval_seconds=0.0)
+    failed_before = _audit_events("write_failed")
+    sink.start()
+    task = sink._task
+    assert sink.submit({"seq": 1})
+    assert await asyncio.to_thread(spool.entered.wait, 5.0)
+
+    with caplog.at_level("WARNING"):
+        assert await sink.stop(timeout_seconds=0.05) is False
+        spool.release.set()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    (failed,) = [record for record in caplog.records if record.name == "audit"]
+    assert failed.getMessage() == "audit_sink.write_failed"
+    assert failed.extra_fields["events"] == [{"seq": 1}]
+    assert _audit_events("write_failed") - failed_before == 1
+    assert list(tmp_path.iterdir()) == []
+
+    spool.reopen()
+    spool.write_batch([{"seq": 2}])
+    spool.close()
+    assert [event["seq"] for event in _spooled_lines(tmp_path)] == [2]
+
+
+@pytest.mark.asyncio
+async def test_sink_stop_flushes_held_and_queued_events_on_cancel(tmp_path):
+    spool = _RecordingSpool(str(tmp_path))
+    sink = AuditSink(spool, max_queue=10, batch_size=10, flush_interval_seconds=30.0)
+    assert await sink.stop(timeout_seconds=1.0)
+
+    sink.start()
+    assert sink.submit({"seq": 1})
+    await asyncio.sleep(0.01)
+    assert sink.submit({"seq": 2})
+    assert await sink.stop(timeout_seconds=5.0)
+
+    assert spool.batches == [[1, 2]]
@@ -0,0 +1,307 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+import httpx
+import pytest
+from prometheus_client import REGISTRY
+
+from app.clients import bulkhead as bulkhead_module
+from app.clients.adaptive_limit import AimdConcurrencyLimit
+from app.clients.bulkhead import Bulkhead, upstream_bulkhead, upstream_origin
+from app.clients.http_resilience import request_with_retry
+from app.config import settings
+
+
+def _sample(metric: str, **labels: str) -> float:
+    return REGISTRY.get_sample_value(metric, labels) or 0.0
+
+
+@pytest.mark.asyncio
+async def test_bulkhead_admits_up_to_limit_and_rejects_when_queue_full():
+    bulkhead = Bulkhead(
+        "http://bulkhead-full", max_concurrency=1, max_queue=0, queue_timeout_seconds=1
+    )
+
+    assert await bulkhead.acquire() is True
+    assert _sample("lotus_gateway_upstream_in_flight", upstream="http://bulkhead-full") == 1
+    assert await bulkhead.acquire() is False
+    assert (
+        _sample(
+            "lotus_gateway_upstream_rejected_total",
+            upstream="http://bulkhead-full",
+            reason="queue_full",
+        )
+        == 1
+    )
+
+    bulkhead.release()
+    assert bulkhead.in_flight == 0
+    assert _sample("lotus_gateway_upstream_in_flight", upstream="http://bulkhead-full") == 0
+
+
+@pytest.mark.asyncio
+async def test_bulkhead_hands_slots_to_waiters_in_order():
+    bulkhead = Bulkhead(
+        "http://bulkhead-fifo", max_concurrency=1, max_queue=2, queue_timeout_seconds=1
+    )
+    assert await bulkhead.acquire() is True
+    first = asyncio.create_task(bulkhead.acquire())
+    second = asyncio.create_task(bulkhead.acquire())
+    await asyncio.sleep(0)
+    assert bulkhead.queued == 2
+    assert _sample("lotus_gateway_upstream_queued", upstream="http://bulkhead-fifo") == 2
+
+    bulkhead.release()
+    assert await first is True
+    assert not second.done()
+    bulkhead.release()
+    assert await second is True
+    bulkhead.release()
+
+    assert bulkhead.in_flight == 0
+    assert bulkhead.queued == 0
+    assert (
+        _sample("lotus_gateway_upstream_queue_wait_seconds_count", upstream="http://bulkhead-fifo")
+        == 3
+    )
+
+
+@pytest.mark.asyncio
+async def test_bulkhead_rejects_after_queue_timeout():
+    bulkhead = Bulkhead(
+        "http://bulkhead-timeout", max_concurrency=1, max_queue=1, queue_timeout_seconds=0.01
+    )
+    assert await bulkhead.acquire() is True
+
+    assert await bulkhead.acquire() is False
+    assert bulkhead.queued == 0
+    assert (
+        _sample(
+            "lotus_gateway_upstream_rejected_total",
+            upstream="http://bulkhead-timeout",
+            reason="queue_timeout",
+        )
+        == 1
+    )
+
+
+@pytest.mark.asyncio
+async def test_bulkhead_cancelled_waiter_never_leaks_a_slot():
+    bulkhead = Bulkhead(
+        "http://bulkhead-cancel", max_concurrency=1, max_queue=2, queue_timeout_seconds=1
+    )
+    assert await bulkhead.acquire() is True
+
+    pending = asyncio.create_task(bulkhead.acquire())
+    await asyncio.sleep(0)
+    pending.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await pending
+    assert bulkhead.queued == 0
+
+    granted = asyncio.create_task(bulkhead.acquire())
+    await asyncio.sleep(0)
+    bulkhead.release()
+    granted.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await granted
+    assert bulkhead.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_bulkhead_skips_waiters_cancelled_before_handover():
+    bulkhead = Bulkhead(
+        "http://bulkhead-race", max_concurrency=1, max_queue=2, queue_timeout_seconds=1
+    )
+    assert await bulkhead.acquire() is True
+    waiting = asyncio.create_task(bulkhead.acquire())
+    await asyncio.sleep(0)
+    granted_waiter = bulkhead._waiters[0]
+    assert bulkhead._abandon(granted_waiter) is False
+
+    granted = asyncio.get_running_loop().create_future()
+    granted.set_result(None)
+    assert bulkhead._abandon(granted) is True
+
+    waiting.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiting
+    bulkhead.release()
+    assert bulkhead.in_flight == 0
+
+    assert await bulkhead.acquire() is True
+    cancelled_in_queue = asyncio.create_task(bulkhead.acquire())
+    await asyncio.sleep(0)
+    cancelled_in_queue.cancel()
+    bulkhead.release()
+    with pytest.raises(asyncio.CancelledError):
+        await cancelled_in_queue
+    assert bulkhead.in_flight == 0
+    assert bulkhead.queued == 0
+
+
+@pytest.mark.asyncio
+async def test_bulkhead_keeps_slot_handed_over_as_queue_timeout_fires():
+    bulkhead = Bulkhead(
+        "http://bulkhead-late", max_concurrency=1, max_queue=1, queue_timeout_seconds=0.0
+    )
+    assert await bulkhead.acquire() is True
+    late = asyncio.create_task(bulkhead.acquire())
+    await asyncio.sleep(0)
+    bulkhead.release()
+
+    assert await late is True
+    assert bulkhead.in_flight == 1
+
+
+def test_upstream_bulkhead_is_shared_per_origin_and_honours_overrides(monkeypatch):
+    monkeypatch.setattr(bulkhead_module, "_BULKHEADS", {})
+    monkeypatch.setattr(settings, "upstream_adaptive_concurrency_enabled", True)
+    monkeypatch.setattr(
+        settings, "upstream_bulkhead_max_concurrency_overrides", {"http://report:8300": 4}
+    )
+
+    report = upstream_bulkhead("http://report:8300/reports/portfolios/P1/review")
+    assert report is upstream_bulkhead("http://report:8300/aggregations/portfolios/P1")
+    assert report.adaptive_limit is not None
+    assert report.adaptive_limit.max_limit == 4
+    assert report.limit == 4
+    core = upstream_bulkhead("http://core:8201/portfolios")
+    assert core.limit == settings.upstream_adaptive_initial_concurrency
+    assert upstream_origin("https://core.internal:8443/a/b?c=d") == "https://core.internal:8443"
+
+    monkeypatch.setattr(settings, "upstream_adaptive_concurrency_enabled", False)
+    static = upstream_bulkhead("http://static:8000/health")
+    assert static.adaptive_limit is None
+    assert static.limit == settings.upstream_bulkhead_max_concurrency
+    static.record_sample(10.0, True)
+    assert static.limit == settings.upstream_bulkhead_max_concurrency
+
+
+@pytest.mark.asyncio
+async def test_bulkhead_adaptive_limit_growth_admits_waiters():
+    bulkhead = Bulkhead(
+        "http://bulkhead-adaptive",
+        max_concurrency=4,
+        max_queue=4,
+        queue_timeout_seconds=1,
+        adaptive_limit=AimdConcurrencyLimit(initial_limit=1, min_limit=1, max_limit=4),
+    )
+    assert await bulkhead.acquire() is True
+    waiter = asyncio.create_task(bulkhead.acquire())
+    await asyncio.sleep(0)
+
+    bulkhead.record_sample(0.05, False, "lookup")
+
+    assert bulkhead.limit == 2
+    assert await waiter is True
+    assert bulkhead.in_flight == 2
+    assert (
+        _sample("lotus_gateway_upstream_concurrency_limit", upstream="http://bulkhead-adaptive")
+        == 2
+    )
+    assert _sample(
+        "lotus_gateway_upstream_rtt_baseline_seconds",
+        upstream="http://bulkhead-adaptive",
+        operation="lookup",
+    ) == pytest.approx(0.05)
+    assert _sample(
+        "lotus_gateway_upstream_rtt_smoothed_seconds",
+        upstream="http://bulkhead-adaptive",
+        operation="lookup",
+    ) == pytest.approx(0.05)
+
+    bulkhead.record_sample(5.0, True)
+    assert bulkhead.limit == 1
+
+
+def test_bulkhead_overload_before_any_rtt_sample_only_moves_limit():
+    bulkhead = Bulkhead(
+        "http://bulkhead-cold",
+        max_concurrency=8,
+        max_queue=0,
+        queue_timeout_seconds=1,
+        adaptive_limit=AimdConcurrencyLimit(
+            initial_limit=8, min_limit=1, max_limit=8, backoff_ratio=0.5
+        ),
+    )
+
+    bulkhead.record_sample(1.0, True)
+
+    assert bulkhead.limit == 4
+    assert (
+        REGISTRY.get_sample_value(
+            "lotus_gateway_upstream_rtt_baseline_seconds",
+            {"upstream": "http://bulkhead-cold", "operation": "unspecified"},
+        )
+        is None
+    )
+
+
+@pytest.mark.asyncio
+async def test_request_with_retry_fails_fast_when_bulkhead_saturated(monkeypatch):
+    saturated = Bulkhead(
+        "http://saturated", max_concurrency=1, max_queue=0, queue_timeout_seconds=1
+    )
+    saturated.in_flight = 1
+    monkeypatch.setattr(bulkhead_module, "_BULKHEADS", {"http://saturated": saturated})
+
+    status, payload = await request_with_retry(
+        method="GET",
+        url="http://saturated/portfolios",
+        timeout_seconds=1.0,
+        max_retries=2,
+    )
+
+    assert status == 503
+    assert payload == {
+        "detail": "upstream bulkhead saturated: http://saturated",
+        "error_code": "UPSTREAM_BULKHEAD_REJECTED",
+    }
+
+
+class _OverloadedAsyncClient:
+    def __init__(self, timeout: float, transport=None):
+        _ = timeout, transport
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
+
+    @asynccontextmanager
+    async def stream(self, method, url, **kwargs):
+        _ = kwargs
+        if url.endswith("/slow"):
+            raise httpx.ReadTimeout("slow")
+        yield httpx.Response(503, json={"detail": "busy"}, request=httpx.Request(method, url))
+
+
+@pytest.mark.asyncio
+async def test_request_with_retry_feeds_overload_samples_to_adaptive_limit(monkeypatch):
+    adaptive = Bulkhead(
+        "http://adaptive-upstream",
+        max_concurrency=16,
+        max_queue=0,
+        queue_timeout_seconds=1,
+        adaptive_limit=AimdConcurrencyLimit(
+            initial_limit=16, min_limit=1, max_limit=16, backoff_ratio=0.5
+        ),
+    )
+    monkeypatch.setattr(bulkhead_module, "_BULKHEADS", {"http://adaptive-upstream": adaptive})
+    monkeypatch.setattr("httpx.AsyncClient", _OverloadedAsyncClient)
+
+    status, _ = await request_with_retry(
+        method="GET", url="http://adaptive-upstream/busy", timeout_seconds=1.0, max_retries=0
+    )
+    assert status == 503
+    assert adaptive.limit == 8
+
+    adaptive.adaptive_limit._last_decrease = float("-inf")
+    status, payload = await request_with_retry(
+        method="GET", url="http://adaptive-upstream/slow", timeout_seconds=1.0, max_retries=0
+    )
+    assert (status, payload) == (503, {"detail": "upstream communication failure: ReadTimeout"})
+    assert adaptive.limit == 4
+    assert adaptive.in_flight == 0
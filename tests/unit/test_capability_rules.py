@@ -0,0 +1,52 @@
+import json
+
+from prometheus_client import REGISTRY
+
+from app.capability_rules import CapabilityRuleStore, CapabilityRuleTrie
+
+
+def test_longest_matching_prefix_wins_regardless_of_rule_order():
+    trie = CapabilityRuleTrie(
+        {
+            "POST /api/v1/proposals/": "proposal.write",
+            "post /api/v1": "api.write",
+            "POST /api/v1/proposals/approve": "proposal.approve",
+            "DELETE /api/v1/proposals": "proposal.delete",
+            "no-method-separator": "ignored",
+            1: "ignored",
+        }
+    )
+
+    assert trie.required_capability("POST", "/api/v1/proposals/approve/P1") == "proposal.approve"
+    assert trie.required_capability("POST", "/api/v1/proposals/P1") == "proposal.write"
+    assert trie.required_capability("post", "/api/v1/intake") == "api.write"
+    assert trie.required_capability("DELETE", "/api/v1/proposals/P1") == "proposal.delete"
+    assert trie.required_capability("DELETE", "/api/v1/intake") is None
+    assert trie.required_capability("PUT", "/api/v1/proposals/P1") is None
+    assert trie.required_capability("POST", "/api") is None
+    assert trie.rule_count == 4
+
+
+def test_rule_store_reloads_from_file_and_keeps_rules_on_invalid_document(tmp_path):
+    path = tmp_path / "rules.json"
+    path.write_text(json.dumps({"POST /proposals": "proposal.write"}))
+    invalid_before = (
+        REGISTRY.get_sample_value(
+            "lotus_gateway_capability_rule_reloads_total", {"outcome": "invalid"}
+        )
+        or 0.0
+    )
+    store = CapabilityRuleStore(str(path))
+    assert store.reload() is True
+    assert store.required_capability("POST", "/proposals/1") == "proposal.write"
+
+    path.write_text(json.dumps(["not", "a", "mapping"]))
+    assert store.reload() is False
+    assert store.required_capability("POST", "/proposals/1") == "proposal.write"
+    assert (
+        REGISTRY.get_sample_value(
+            "lotus_gateway_capability_rule_reloads_total", {"outcome": "invalid"}
+        )
+        - invalid_before
+        == 1
+    )
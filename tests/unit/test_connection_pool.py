@@ -0,0 +1,221 @@
+import asyncio
+
+import httpcore
+import pytest
+
+from app.clients import connection_pool
+from app.clients.connection_pool import (
+    DnsCache,
+    _DnsCachingBackend,
+    close_upstream_transports,
+    configured_upstream_origins,
+    environment_proxy,
+    upstream_transport,
+    warm_up_upstreams,
+)
+from app.clients.http_resilience import request_with_retry
+from app.config import settings
+
+
+class _LocalUpstream:
+    def __init__(self, respond: bool = True):
+        self.respond = respond
+        self.connections = 0
+        self.requests = 0
+        self.request_lines: list[bytes] = []
+        self.server: asyncio.Server | None = None
+        self.origin = ""
+
+    async def __aenter__(self):
+        self.server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        self.origin = f"http://127.0.0.1:{self.server.sockets[0].getsockname()[1]}"
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        assert self.server is not None
+        self.server.close()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        try:
+            while head := await reader.readuntil(b"\r\n\r\n"):
+                self.requests += 1
+                self.request_lines.append(head.split(b"\r\n", 1)[0])
+                if not self.respond:
+                    await asyncio.sleep(10)
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                    b'Content-Length: 11\r\n\r\n{"ok":true}'
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            writer.close()
+
+
+@pytest.mark.asyncio
+async def test_dns_cache_honours_ttl_and_skips_ip_literals(monkeypatch):
+    calls: list[str] = []
+    loop = asyncio.get_running_loop()
+
+    async def _getaddrinfo(host, port, type=0):
+        calls.append(host)
+        return [(2, type, 6, "", ("10.0.0.1", port)), (2, type, 6, "", ("10.0.0.1", port))]
+
+    monkeypatch.setattr(loop, "getaddrinfo", _getaddrinfo)
+    cache = DnsCache(ttl_seconds=30.0)
+
+    assert await cache.resolve("127.0.0.1", 80) == ["127.0.0.1"]
+    assert await cache.resolve("pas", 8201, now=0.0) == ["10.0.0.1"]
+    assert await cache.resolve("pas", 8201, now=29.0) == ["10.0.0.1"]
+    assert calls == ["pas"]
+    await cache.resolve("pas", 8201, now=30.0)
+    cache.invalidate("pas", 8201)
+    await cache.resolve("pas", 8201, now=31.0)
+    assert calls == ["pas", "pas", "pas"]
+
+
+@pytest.mark.asyncio
+async def test_dns_cache_maps_resolution_failure_to_connect_error(monkeypatch):
+    async def _getaddrinfo(host, port, type=0):
+        raise OSError("name does not resolve")
+
+    monkeypatch.setattr(asyncio.get_running_loop(), "getaddrinfo", _getaddrinfo)
+
+    with pytest.raises(httpcore.ConnectError, match="DNS resolution failed for missing"):
+        await DnsCache(ttl_seconds=30.0).resolve("missing", 80)
+
+
+class _ScriptedBackend(httpcore.AsyncNetworkBackend):
+    def __init__(self, reachable: set[str]):
+        self.reachable = reachable
+        self.attempts: list[str] = []
+        self.slept = 0.0
+
+    async def connect_tcp(self, host, port, timeout=None, local_address=None, socket_options=None):
+        self.attempts.append(host)
+        if host not in self.reachable:
+            raise httpcore.ConnectError(f"{host} refused")
+        return f"stream:{host}"
+
+    async def connect_unix_socket(self, path, timeout=None, socket_options=None):
+        return f"unix:{path}"
+
+    async def sleep(self, seconds):
+        self.slept += seconds
+
+
+@pytest.mark.asyncio
+async def test_caching_backend_tries_each_address_and_invalidates_when_all_fail():
+    cache = DnsCache(ttl_seconds=30.0)
+    cache._entries[("pas", 8201)] = (float("inf"), ["10.0.0.1", "10.0.0.2"])
+    inner = _ScriptedBackend(reachable={"10.0.0.2"})
+    backend = _DnsCachingBackend(cache, inner)
+
+    assert await backend.connect_tcp("pas", 8201) == "stream:10.0.0.2"
+    assert inner.attempts == ["10.0.0.1", "10.0.0.2"]
+    assert await backend.connect_unix_socket("/tmp/pas.sock") == "unix:/tmp/pas.sock"
+    await backend.sleep(0.5)
+    assert inner.slept == 0.5
+
+    inner.reachable.clear()
+    with pytest.raises(httpcore.ConnectError, match="10.0.0.2 refused"):
+        await backend.connect_tcp("pas", 8201)
+    assert ("pas", 8201) not in cache._entries
+
+
+def test_configured_upstream_origins_splits_replicas_and_deduplicates(monkeypatch):
+    monkeypatch.setattr(settings, "decisioning_service_base_url", "http://dpm:8000/api")
+    monkeypatch.setattr(
+        settings, "portfolio_data_platform_base_url", "http://pas-a:8201,http://pas-b:8201"
+    )
+    monkeypatch.setattr(settings, "portfolio_data_ingestion_base_url", "http://pas-a:8201")
+    monkeypatch.setattr(settings, "performance_analytics_base_url", "http://pa:8002")
+    monkeypatch.setattr(settings, "risk_analytics_base_url", "http://pa:8002")
+    monkeypatch.setattr(settings, "reporting_aggregation_base_url", "http://ras:8300")
+    monkeypatch.setattr(settings, "management_service_base_url", "http://dpm:8000")
+
+    assert configured_upstream_origins() == [
+        "http://dpm:8000",
+        "http://pas-a:8201",
+        "http://pas-b:8201",
+        "http://pa:8002",
+        "http://ras:8300",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_warm_up_opens_keep_alive_connections_reused_by_requests():
+    async with _LocalUpstream() as upstream:
+        assert await warm_up_upstreams([upstream.origin], connections=2, timeout_seconds=2.0) == {
+            upstream.origin: True
+        }
+        assert upstream.connections == 2
+
+        await upstream_transport(upstream.origin).aclose()
+        for _ in range(3):
+            status, payload = await request_with_retry(
+                method="GET", url=f"{upstream.origin}/portfolios", timeout_seconds=1.0
+            )
+            assert (status, payload) == (200, {"ok": True})
+
+        assert upstream.connections == 2
+        assert upstream.requests == 5
+        assert upstream_transport(upstream.origin) is upstream_transport(f"{upstream.origin}/other")
+        await close_upstream_transports()
+        assert asyncio.get_running_loop() not in connection_pool._TRANSPORTS
+
+
+@pytest.mark.asyncio
+async def test_warm_up_reports_unreachable_and_timed_out_upstreams():
+    async with _LocalUpstream(respond=False) as slow:
+        async with _LocalUpstream() as closed:
+            closed_origin = closed.origin
+        results = await warm_up_upstreams(
+            [slow.origin, closed_origin], connections=1, timeout_seconds=0.2
+        )
+        await close_upstream_transports()
+
+    assert results == {slow.origin: False, closed_origin: False}
+    assert await warm_up_upstreams(["http://[::1", "http://"], 1, 1.0) == {
+        "http://[::1": False,
+        "http://": False,
+    }
+    assert await warm_up_upstreams([], connections=2) == {}
+    assert await warm_up_upstreams(["http://unused:1"], connections=0) == {}
+
+
+def test_environment_proxy_honours_no_proxy(monkeypatch):
+    for name in ("HTTP_PROXY", "HTTPS_PROXY", "ALL_PROXY", "NO_PROXY"):
+        monkeypatch.delenv(name, raising=False)
+        monkeypatch.delenv(name.lower(), raising=False)
+    assert environment_proxy("http://core:8201") is None
+
+    monkeypatch.setenv("HTTP_PROXY", "http://proxy.internal:3128")
+    monkeypatch.setenv("NO_PROXY", "report,.svc.cluster.local")
+    assert environment_proxy("http://core:8201") == "http://proxy.internal:3128"
+    assert environment_proxy("http://report:8300") is None
+    assert environment_proxy("http://risk.svc.cluster.local:8130") is None
+    assert environment_proxy("https://core:8443") is None
+
+
+@pytest.mark.asyncio
+async def test_upstream_calls_go_through_the_environment_proxy(monkeypatch):
+    async with _LocalUpstream() as proxy:
+        monkeypatch.setenv("HTTP_PROXY", proxy.origin)
+        monkeypatch.delenv("NO_PROXY", raising=False)
+        monkeypatch.delenv("no_proxy", raising=False)
+        try:
+            assert upstream_transport("http://core.invalid:8201").proxy == proxy.origin
+            assert await warm_up_upstreams(["http://core.invalid:8201"], 1, 2.0) == {
+                "http://core.invalid:8201": True
+            }
+            status, payload = await request_with_retry(
+                method="GET", url="http://core.invalid:8201/portfolios", timeout_seconds=1.0
+            )
+        finally:
+            await close_upstream_transports()
+
+    assert (status, payload) == (200, {"ok": True})
+    assert proxy.request_lines[-1] == b"GET http://core.invalid:8201/portfolios HTTP/1.1"
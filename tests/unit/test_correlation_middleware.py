@@ -1,7 +1,22 @@
+import json
+import logging
+import queue
+
+from fastapi import FastAPI
 from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
 
+from app.config import settings
 from app.main import app
-from app.middleware.correlation import resolve_trace_id
+from app.middleware.correlation import (
+    BackgroundQueueHandler,
+    CorrelationMiddleware,
+    JsonFormatter,
+    correlation_id_var,
+    resolve_trace_id,
+    setup_logging,
+)
+from app.middleware.server_timing import record_upstream_timing
 
 
 def test_correlation_header_is_returned():
@@ -70,3 +85,148 @@ def test_resolve_trace_id_prefers_valid_traceparent():
 
     resolved = resolve_trace_id(_FakeRequest())
     assert resolved == "0123456789abcdef0123456789abcdef"
+
+
+def test_resolve_trace_id_rejects_traceparent_trace_ids_that_are_not_hex():
+    class _FakeHeaders:
+        def __init__(self, values: dict[str, str]):
+            self._values = values
+
+        def get(self, key: str):
+            return self._values.get(key)
+
+    for trace_id in ("z" * 32, "0" * 32):
+
+        class _FakeRequest:
+            headers = _FakeHeaders(
+                {"traceparent": f"00-{trace_id}-0123456789abcdef-01", "X-Trace-Id": "fallback"}
+            )
+
+        assert resolve_trace_id(_FakeRequest()) == "fallback"
+
+
+def test_upstream_timings_are_emitted_as_server_timing_and_access_log(caplog):
+    application = FastAPI()
+    application.add_middleware(CorrelationMiddleware)
+
+    @application.get("/portfolio-360")
+    async def _portfolio_360():
+        record_upstream_timing("lotus-core", "get_core_snapshot", 1, 0.125)
+        record_upstream_timing("lotus-performance", "get_workbench_analytics", 2, 0.5)
+        return {"ok": True}
+
+    record_upstream_timing("lotus-core", "outside_request", 1, 0.1)
+    with caplog.at_level(logging.INFO, logger="http.access"):
+        response = TestClient(application).get("/portfolio-360")
+
+    entries = response.headers["Server-Timing"].split(", ")
+    assert entries[:2] == [
+        'lotus-core.get_core_snapshot;dur=125.00;desc="attempts=1"',
+        'lotus-performance.get_workbench_analytics;dur=500.00;desc="attempts=2"',
+    ]
+    assert entries[2].startswith("total;dur=")
+    completed = [record for record in caplog.records if record.getMessage() == "request.completed"]
+    assert completed[-1].extra_fields["upstream_calls"] == [
+        {
+            "upstream": "lotus-core",
+            "operation": "get_core_snapshot",
+            "attempts": 1,
+            "duration_ms": 125.0,
+        },
+        {
+            "upstream": "lotus-performance",
+            "operation": "get_workbench_analytics",
+            "attempts": 2,
+            "duration_ms": 500.0,
+        },
+    ]
+
+
+def test_queue_handler_captures_request_context_for_background_formatting():
+    log_queue: queue.Queue[logging.LogRecord] = queue.Queue(maxsize=1)
+    handler = BackgroundQueueHandler(log_queue, logging.NullHandler())
+    logger = logging.getLogger("test.background_logging")
+    logger.addHandler(handler)
+    logger.propagate = False
+    dropped_before = REGISTRY.get_sample_value("lotus_gateway_log_records_dropped_total") or 0.0
+    token = correlation_id_var.set("corr_queued")
+    try:
+        logger.warning("queued %s", "record", extra={"extra_fields": {"portfolio_id": "P1"}})
+        logger.warning("dropped")
+    finally:
+        correlation_id_var.reset(token)
+        logger.removeHandler(handler)
+
+    payload = json.loads(JsonFormatter().format(log_queue.get_nowait()))
+    assert payload["message"] == "queued record"
+    assert payload["correlation_id"] == "corr_queued"
+    assert payload["portfolio_id"] == "P1"
+    assert payload["service"] == "lotus-gateway"
+    dropped_after = REGISTRY.get_sample_value("lotus_gateway_log_records_dropped_total")
+    assert dropped_after - dropped_before == 1
+
+
+def test_access_log_is_sampled_for_configured_prefixes(monkeypatch, caplog):
+    monkeypatch.setattr(settings, "access_log_sample_ratios", {"/health": 0.0})
+    application = FastAPI()
+    application.add_middleware(CorrelationMiddleware)
+
+    @application.get("/health/live")
+    async def _live():
+        return {"status": "live"}
+
+    @application.get("/health/broken")
+    async def _broken():
+        raise RuntimeError("boom")
+
+    @application.get("/portfolios")
+    async def _portfolios():
+        return []
+
+    client = TestClient(application, raise_server_exceptions=False)
+    with caplog.at_level(logging.INFO, logger="http.access"):
+        client.get("/health/live")
+        client.get("/health/broken")
+        client.get("/portfolios")
+
+    endpoints = [
+        record.extra_fields["endpoint"]
+        for record in caplog.records
+        if record.getMessage() == "request.completed"
+    ]
+    assert endpoints == ["/health/broken", "/portfolios"]
+
+
+def test_queue_handler_writes_audit_records_directly_when_queue_is_full():
+    log_queue: queue.Queue[logging.LogRecord] = queue.Queue(maxsize=1)
+    log_queue.put_nowait(logging.makeLogRecord({"msg": "filler"}))
+    written: list[logging.LogRecord] = []
+
+    class _Capture(logging.Handler):
+        def emit(self, record: logging.LogRecord) -> None:
+            written.append(record)
+
+    handler = BackgroundQueueHandler(log_queue, _Capture())
+    dropped_before = REGISTRY.get_sample_value("lotus_gateway_log_records_dropped_total") or 0.0
+    handler.handle(logging.makeLogRecord({"name": "audit", "msg": "enterprise_audit_event"}))
+    handler.handle(logging.makeLogRecord({"name": "http.access", "msg": "request.completed"}))
+
+    assert [record.getMessage() for record in written] == ["enterprise_audit_event"]
+    dropped_after = REGISTRY.get_sample_value("lotus_gateway_log_records_dropped_total")
+    assert dropped_after - dropped_before == 1
+
+
+def test_setup_logging_replaces_handlers_and_keeps_audit_at_info(monkeypatch):
+    monkeypatch.setenv("LOG_LEVEL", "WARNING")
+    root_logger = logging.getLogger()
+    previous_handlers, previous_level = list(root_logger.handlers), root_logger.level
+    try:
+        setup_logging()
+        setup_logging()
+        (handler,) = root_logger.handlers
+        assert isinstance(handler, BackgroundQueueHandler)
+        assert root_logger.level == logging.WARNING
+        assert logging.getLogger("audit").isEnabledFor(logging.INFO)
+    finally:
+        root_logger.handlers[:] = previous_handlers
+        root_logger.setLevel(previous_level)
@@ -1,16 +1,19 @@
 import json
 
 import pytest
-from fastapi import Request
+from fastapi import FastAPI, Request
 from fastapi.responses import Response
+from fastapi.testclient import TestClient
+from starlette.datastructures import Headers
+from starlette.types import Message, Receive, Scope, Send
 
+from app import capability_rules, feature_flags
 from app.enterprise_readiness import (
+    EnterpriseAuditMiddleware,
     authorize_write_request,
-    build_enterprise_audit_middleware,
     enterprise_policy_version,
     is_feature_enabled,
-    load_capability_rules,
-    load_feature_flags,
+    load_route_payload_limits,
     redact_sensitive,
     validate_enterprise_runtime_config,
 )
@@ -28,6 +31,7 @@ def test_feature_flags_support_tenant_and_role_scoping(monkeypatch):
             }
         ),
     )
+    monkeypatch.setattr(feature_flags, "FEATURE_FLAGS", feature_flags.build_feature_flag_store())
     assert is_feature_enabled("proposal.write", "tenant-a", "advisor") is True
     assert is_feature_enabled("proposal.write", "tenant-a", "viewer") is False
     assert is_feature_enabled("proposal.write", "tenant-b", "advisor") is False
@@ -57,6 +61,9 @@ def test_authorize_write_request_enforces_capability_rules(monkeypatch):
         "ENTERPRISE_CAPABILITY_RULES_JSON",
         json.dumps({"POST /proposals": "proposal.write"}),
     )
+    monkeypatch.setattr(
+        capability_rules, "CAPABILITY_RULES", capability_rules.build_capability_rule_store()
+    )
     headers = {
         "X-Actor-Id": "a1",
         "X-Tenant-Id": "t1",
@@ -87,11 +94,11 @@ def test_validate_enterprise_runtime_config_fallback_for_invalid_int(monkeypatch
     assert issues == []
 
 
-def test_load_feature_flags_and_capability_rules_ignore_invalid_json(monkeypatch):
-    monkeypatch.setenv("ENTERPRISE_FEATURE_FLAGS_JSON", "not-json")
-    monkeypatch.setenv("ENTERPRISE_CAPABILITY_RULES_JSON", "[]")
-    assert load_feature_flags() == {}
-    assert load_capability_rules() == {}
+def test_load_route_payload_limits_ignores_invalid_json(monkeypatch):
+    monkeypatch.setenv("ENTERPRISE_ROUTE_MAX_WRITE_PAYLOAD_BYTES_JSON", "not-json")
+    assert load_route_payload_limits() == []
+    monkeypatch.setenv("ENTERPRISE_ROUTE_MAX_WRITE_PAYLOAD_BYTES_JSON", "[]")
+    assert load_route_payload_limits() == []
 
 
 def test_validate_enterprise_runtime_config_can_raise_when_enforced(monkeypatch):
@@ -122,10 +129,30 @@ def test_authorize_write_request_checks_service_identity(monkeypatch):
     assert reason == "missing_service_identity"
 
 
+async def _run_audit_middleware(scope: Scope) -> tuple[int, Headers, bytes]:
+    async def _downstream(scope: Scope, receive: Receive, send: Send) -> None:
+        await Response(status_code=200)(scope, receive, send)
+
+    async def _receive() -> Message:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    messages: list[Message] = []
+
+    async def _send(message: Message) -> None:
+        messages.append(message)
+
+    await EnterpriseAuditMiddleware(_downstream)(scope, _receive, _send)
+    start, *body = messages
+    return (
+        start["status"],
+        Headers(raw=start["headers"]),
+        b"".join(message.get("body", b"") for message in body),
+    )
+
+
 @pytest.mark.asyncio
 async def test_enterprise_middleware_rejects_oversized_write_payload(monkeypatch):
     monkeypatch.setenv("ENTERPRISE_MAX_WRITE_PAYLOAD_BYTES", "1")
-    middleware = build_enterprise_audit_middleware()
     scope = {
         "type": "http",
         "method": "POST",
@@ -136,20 +163,14 @@ async def test_enterprise_middleware_rejects_oversized_write_payload(monkeypatch
         "client": ("127.0.0.1", 1234),
         "scheme": "http",
     }
-    request = Request(scope)
-
-    async def _call_next(_: Request) -> Response:
-        return Response(status_code=200)
-
-    response = await middleware(request, _call_next)
-    assert response.status_code == 413
+    status_code, headers, body = await _run_audit_middleware(scope)
+    assert status_code == 413
 
 
 @pytest.mark.asyncio
 async def test_enterprise_middleware_sets_policy_header_on_success(monkeypatch):
     monkeypatch.setenv("ENTERPRISE_ENFORCE_AUTHZ", "false")
     monkeypatch.setenv("ENTERPRISE_POLICY_VERSION", "9.9.9")
-    middleware = build_enterprise_audit_middleware()
     scope = {
         "type": "http",
         "method": "GET",
@@ -160,14 +181,9 @@ async def test_enterprise_middleware_sets_policy_header_on_success(monkeypatch):
         "client": ("127.0.0.1", 1234),
         "scheme": "http",
     }
-    request = Request(scope)
-
-    async def _call_next(_: Request) -> Response:
-        return Response(status_code=200)
-
-    response = await middleware(request, _call_next)
-    assert response.status_code == 200
-    assert response.headers["X-Enterprise-Policy-Version"] == enterprise_policy_version()
+    status_code, headers, body = await _run_audit_middleware(scope)
+    assert status_code == 200
+    assert headers["X-Enterprise-Policy-Version"] == enterprise_policy_version()
 
 
 def test_redact_sensitive_handles_list_values():
@@ -181,7 +197,6 @@ def test_redact_sensitive_handles_list_values():
 @pytest.mark.asyncio
 async def test_enterprise_middleware_denies_unauthorized_write_and_returns_reason(monkeypatch):
     monkeypatch.setenv("ENTERPRISE_ENFORCE_AUTHZ", "true")
-    middleware = build_enterprise_audit_middleware()
     scope = {
         "type": "http",
         "method": "POST",
@@ -192,21 +207,15 @@ async def test_enterprise_middleware_denies_unauthorized_write_and_returns_reaso
         "client": ("127.0.0.1", 1234),
         "scheme": "http",
     }
-    request = Request(scope)
-
-    async def _call_next(_: Request) -> Response:
-        return Response(status_code=200)
-
-    response = await middleware(request, _call_next)
-    assert response.status_code == 403
-    payload = json.loads(response.body.decode("utf-8"))
+    status_code, headers, body = await _run_audit_middleware(scope)
+    assert status_code == 403
+    payload = json.loads(body.decode("utf-8"))
     assert payload["detail"] == "authorization_policy_denied"
 
 
 @pytest.mark.asyncio
 async def test_enterprise_middleware_handles_invalid_content_length(monkeypatch):
     monkeypatch.setenv("ENTERPRISE_ENFORCE_AUTHZ", "false")
-    middleware = build_enterprise_audit_middleware()
     scope = {
         "type": "http",
         "method": "GET",
@@ -217,10 +226,95 @@ async def test_enterprise_middleware_handles_invalid_content_length(monkeypatch)
         "client": ("127.0.0.1", 1234),
         "scheme": "http",
     }
-    request = Request(scope)
+    status_code, headers, body = await _run_audit_middleware(scope)
+    assert status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_enterprise_middleware_audits_write_with_downstream_status(monkeypatch, caplog):
+    monkeypatch.setenv("ENTERPRISE_ENFORCE_AUTHZ", "false")
+    scope = {
+        "type": "http",
+        "method": "POST",
+        "path": "/api/v1/proposals",
+        "headers": [(b"x-actor-id", b"actor-1"), (b"x-correlation-id", b"corr-1")],
+        "query_string": b"",
+        "server": ("testserver", 80),
+        "client": ("127.0.0.1", 1234),
+        "scheme": "http",
+    }
+    with caplog.at_level("INFO", logger="audit"):
+        status_code, headers, _ = await _run_audit_middleware(scope)
+
+    assert status_code == 200
+    assert "X-Enterprise-Policy-Version" in headers
+    (audit,) = [record.extra_fields["audit"] for record in caplog.records if record.name == "audit"]
+    assert audit["action"] == "POST /api/v1/proposals"
+    assert audit["actor_id"] == "actor-1"
+    assert audit["metadata"] == {"status_code": 200}
+
+
+def test_enterprise_middleware_enforces_limit_on_streamed_body_per_route(monkeypatch):
+    monkeypatch.setenv("ENTERPRISE_ENFORCE_AUTHZ", "false")
+    monkeypatch.setenv("ENTERPRISE_MAX_WRITE_PAYLOAD_BYTES", "8")
+    monkeypatch.setenv(
+        "ENTERPRISE_ROUTE_MAX_WRITE_PAYLOAD_BYTES_JSON",
+        json.dumps({"/api/v1/intake": 16, "/api/v1/intake/uploads": 64, "/bad": "x"}),
+    )
+    received: list[int] = []
+    application = FastAPI()
+    application.add_middleware(EnterpriseAuditMiddleware)
+
+    @application.post("/api/v1/{rest:path}")
+    async def _echo(request: Request):
+        body = await request.body()
+        received.append(len(body))
+        return {"bytes": len(body)}
+
+    def _chunks(count: int):
+        for _ in range(count):
+            yield b"0123456789"
+
+    client = TestClient(application)
+    rejected = client.post("/api/v1/proposals", content=_chunks(2))
+    assert rejected.status_code == 413
+    assert rejected.json() == {"detail": "payload_too_large"}
+    assert client.post("/api/v1/intake/rows", content=_chunks(2)).status_code == 413
+    assert client.post("/api/v1/intake/uploads/commit", content=_chunks(5)).status_code == 200
+    assert client.post("/api/v1/intake/uploads/commit", content=_chunks(7)).status_code == 413
+    assert received == [50]
+
+
+@pytest.mark.asyncio
+async def test_enterprise_middleware_answers_413_when_app_has_no_exception_handler(monkeypatch):
+    monkeypatch.setenv("ENTERPRISE_ENFORCE_AUTHZ", "false")
+    monkeypatch.setenv("ENTERPRISE_MAX_WRITE_PAYLOAD_BYTES", "4")
+
+    async def _reads_body(scope: Scope, receive: Receive, send: Send) -> None:
+        while (await receive()).get("more_body"):
+            pass
+        await Response(status_code=200)(scope, receive, send)
+
+    chunks = iter([b"abc", b"def"])
 
-    async def _call_next(_: Request) -> Response:
-        return Response(status_code=200)
+    async def _receive() -> Message:
+        body = next(chunks)
+        return {"type": "http.request", "body": body, "more_body": body == b"abc"}
 
-    response = await middleware(request, _call_next)
-    assert response.status_code == 200
+    messages: list[Message] = []
+
+    async def _send(message: Message) -> None:
+        messages.append(message)
+
+    scope = {
+        "type": "http",
+        "method": "PUT",
+        "path": "/api/v1/proposals/P1",
+        "headers": [(b"transfer-encoding", b"chunked")],
+        "query_string": b"",
+        "server": ("testserver", 80),
+        "client": ("127.0.0.1", 1234),
+        "scheme": "http",
+    }
+    await EnterpriseAuditMiddleware(_reads_body)(scope, _receive, _send)
+    assert messages[0]["status"] == 413
@@ -0,0 +1,89 @@
+import asyncio
+import json
+import os
+
+import pytest
+from prometheus_client import REGISTRY
+
+from app.feature_flags import CompiledFeatureFlags, FeatureFlagStore
+
+FLAGS = {
+    "proposal.write": {
+        "tenant-a": {"advisor": True, "viewer": False},
+        "tenant-b": {"*": True, "viewer": False},
+        "*": {"*": False},
+    },
+    "report.export": {"*": {"*": True}, "tenant-c": {"advisor": False, "ops": "yes"}},
+    "broken": ["not", "a", "mapping"],
+    "partial": {"tenant-a": "not-a-mapping", "*": {"*": True}},
+}
+
+
+def _reloads(outcome: str) -> float:
+    return (
+        REGISTRY.get_sample_value("lotus_gateway_feature_flag_reloads_total", {"outcome": outcome})
+        or 0.0
+    )
+
+
+def _write_flags(path, flags) -> None:
+    path.write_text(json.dumps(flags))
+    # Force a distinct mtime even on filesystems with coarse timestamps.
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def test_compiled_flags_resolve_role_then_tenant_then_global_default():
+    compiled = CompiledFeatureFlags(FLAGS)
+
+    assert compiled.is_enabled("proposal.write", "tenant-a", "advisor") is True
+    assert compiled.is_enabled("proposal.write", "tenant-a", "ops") is False
+    assert compiled.is_enabled("proposal.write", "tenant-b", "ops") is True
+    assert compiled.is_enabled("proposal.write", "tenant-b", "viewer") is False
+    assert compiled.is_enabled("report.export", "tenant-c", "advisor") is False
+    assert compiled.is_enabled("report.export", "tenant-c", "ops") is True
+    assert compiled.is_enabled("report.export", "tenant-z", "advisor") is True
+    assert compiled.is_enabled("broken", "tenant-a", "advisor") is False
+    assert compiled.is_enabled("partial", "tenant-a", "advisor") is True
+    assert compiled.is_enabled("unknown", "tenant-a", "advisor") is False
+
+
+def test_file_backed_store_swaps_on_change_and_keeps_table_on_invalid_document(tmp_path):
+    path = tmp_path / "flags.json"
+    _write_flags(path, FLAGS)
+    loaded_before = _reloads("loaded")
+    invalid_before = _reloads("invalid")
+    store = FeatureFlagStore(str(path))
+
+    assert store.reload() is True
+    assert store.reload_if_changed() is False
+    assert store.is_enabled("proposal.write", "tenant-a", "advisor") is True
+
+    _write_flags(path, {"proposal.write": {"tenant-a": {"advisor": False}}})
+    assert store.reload_if_changed() is True
+    assert store.is_enabled("proposal.write", "tenant-a", "advisor") is False
+
+    path.write_text("{not json")
+    assert store.reload_if_changed() is False
+    assert store.is_enabled("proposal.write", "tenant-a", "advisor") is False
+    assert _reloads("loaded") - loaded_before == 2
+    assert _reloads("invalid") - invalid_before == 1
+
+
+@pytest.mark.asyncio
+async def test_store_watcher_picks_up_file_changes(tmp_path):
+    path = tmp_path / "flags.json"
+    _write_flags(path, {})
+    store = FeatureFlagStore(str(path), reload_interval_seconds=0.01)
+    store.reload()
+    store.start()
+    try:
+        _write_flags(path, {"proposal.write": {"*": {"*": True}}})
+        for _ in range(200):
+            if store.is_enabled("proposal.write", "tenant-a", "advisor"):
+                break
+            await asyncio.sleep(0.01)
+    finally:
+        await store.stop()
+
+    assert store.is_enabled("proposal.write", "tenant-a", "advisor") is True
@@ -0,0 +1,125 @@
+import logging
+from contextlib import asynccontextmanager
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app import flight_recorder
+from app.clients.http_resilience import request_with_retry
+from app.config import settings
+from app.contracts.errors import ProblemDetails
+from app.flight_recorder import FlightRecorder
+from app.middleware.correlation import CorrelationMiddleware
+from app.middleware.flight_recorder import FlightRecorderMiddleware, HandlerTimingMiddleware
+from app.responses import model_json_response
+from app.routers.admin import router as admin_router
+
+
+class _UpstreamAsyncClient:
+    def __init__(self, timeout: float, transport=None):
+        _ = timeout, transport
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
+
+    @asynccontextmanager
+    async def stream(self, method, url, params=None, headers=None, **kwargs):
+        yield httpx.Response(200, json={"rows": [1, 2]}, request=httpx.Request(method, url))
+
+
+@pytest.fixture
+def client(monkeypatch) -> TestClient:
+    monkeypatch.setattr("httpx.AsyncClient", _UpstreamAsyncClient)
+    monkeypatch.setattr(settings, "admin_token", "s3cret")
+    monkeypatch.setattr(flight_recorder, "FLIGHT_RECORDER", FlightRecorder(2, 60.0))
+    application = FastAPI()
+    application.add_middleware(HandlerTimingMiddleware)
+    application.add_middleware(CorrelationMiddleware)
+    application.add_middleware(FlightRecorderMiddleware)
+    application.include_router(admin_router)
+
+    @application.get("/portfolios/{portfolio_id}/report")
+    async def _report(portfolio_id: str):
+        await request_with_retry(
+            method="GET",
+            url="http://report/rows",
+            timeout_seconds=1.0,
+            max_retries=0,
+            operation="get_rows",
+        )
+        return model_json_response(
+            ProblemDetails(
+                title=portfolio_id,
+                status=200,
+                detail="ok",
+                instance="/report",
+                correlation_id="corr",
+                error_code="NONE",
+            )
+        )
+
+    return TestClient(application)
+
+
+def test_flight_recorder_keeps_slowest_requests_per_route_within_window():
+    recorder = FlightRecorder(slowest_per_route=2, window_seconds=10.0)
+    assert recorder.record("/a", 0.3, {"id": 1}, now=0.0)
+    assert recorder.record("/a", 0.1, {"id": 2}, now=1.0)
+    assert recorder.record("/a", 0.5, {"id": 3}, now=2.0)
+    assert not recorder.record("/a", 0.05, {"id": 4}, now=3.0)
+    recorder.record("/b", 0.2, {"id": 5}, now=3.0)
+
+    assert recorder.snapshot(now=5.0) == {"/a": [{"id": 3}, {"id": 1}], "/b": [{"id": 5}]}
+    assert recorder.snapshot("/a", now=11.0) == {"/a": [{"id": 3}]}
+    assert recorder.qualifies("/a", 0.01, now=11.0)
+    assert recorder.snapshot(now=20.0) == {}
+
+
+def test_slow_requests_are_recorded_with_phase_breakdown_and_logged(client, monkeypatch, caplog):
+    monkeypatch.setattr(settings, "slow_request_threshold_seconds", 0.000001)
+    with caplog.at_level(logging.WARNING, logger="flight_recorder"):
+        response = client.get("/portfolios/P1/report", headers={"X-Correlation-Id": "corr-slow"})
+    assert response.status_code == 200
+
+    slow = [record for record in caplog.records if record.getMessage() == "request.slow"]
+    assert slow[0].extra_fields["correlation_id"] == "corr-slow"
+    body = client.get(
+        "/admin/slow-requests",
+        params={"route": "/portfolios/{portfolio_id}/report"},
+        headers={"X-Gateway-Admin-Token": "s3cret"},
+    ).json()
+    assert body["slowest_per_route"] == 2
+    (entry,) = body["routes"]["/portfolios/{portfolio_id}/report"]
+    assert entry["correlation_id"] == "corr-slow"
+    assert entry["status_code"] == 200
+    phases = {(phase["category"], phase["name"]) for phase in entry["phases"]}
+    assert {
+        ("upstream", "upstream.get_rows"),
+        ("parse", "upstream.get_rows"),
+        ("serialize", "ProblemDetails"),
+        ("handler", "GET"),
+    } <= phases
+    breakdown = entry["breakdown"]
+    assert breakdown["middleware_ms"] >= 0
+    assert breakdown["handler_ms"] <= entry["duration_ms"]
+    assert {"upstream_ms", "parse_ms", "serialize_ms"} <= set(breakdown)
+
+
+def test_fast_requests_are_kept_but_not_logged(client, monkeypatch, caplog):
+    monkeypatch.setattr(settings, "slow_request_threshold_seconds", 60.0)
+    with caplog.at_level(logging.WARNING, logger="flight_recorder"):
+        client.get("/portfolios/P1/report")
+        client.get("/unknown")
+
+    assert not [record for record in caplog.records if record.getMessage() == "request.slow"]
+    assert list(flight_recorder.FLIGHT_RECORDER.snapshot()) == ["/portfolios/{portfolio_id}/report"]
+
+    monkeypatch.setattr(settings, "flight_recorder_enabled", False)
+    monkeypatch.setattr(flight_recorder, "FLIGHT_RECORDER", FlightRecorder(2, 60.0))
+    client.get("/portfolios/P1/report")
+    assert flight_recorder.FLIGHT_RECORDER.snapshot() == {}
@@ -1,16 +1,41 @@
 import json
+from contextlib import asynccontextmanager
+from datetime import UTC, datetime, timedelta
+from email.utils import format_datetime
 
 import httpx
 import pytest
-
-from app.clients.http_resilience import request_with_retry
-
-
-class _FlakyAsyncClient:
+from prometheus_client import REGISTRY
+
+from app.clients.http_resilience import (
+    DEFAULT_RETRY_STATUS_CODES,
+    _next_backoff,
+    _resolve_retry_policy,
+    _retry_after_seconds,
+    request_with_retry,
+)
+from app.clients.json_stream import StreamedArrayField
+from app.clients.upstream_names import upstream_service_name
+from app.config import settings
+from app.middleware.server_timing import upstream_timings_var
+
+
+class _StreamingFake:
+    @asynccontextmanager
+    async def stream(
+        self, method, url, params=None, headers=None, json=None, data=None, files=None
+    ):
+        if method == "GET":
+            yield await self.get(url, params=params, headers=headers)
+        else:
+            yield await self.post(url, headers=headers, json=json, data=data, files=files)
+
+
+class _FlakyAsyncClient(_StreamingFake):
     calls = 0
 
-    def __init__(self, timeout: float):
-        _ = timeout
+    def __init__(self, timeout: float, transport=None):
+        _ = timeout, transport
 
     async def __aenter__(self):
         return self
@@ -31,11 +56,11 @@ class _FlakyAsyncClient:
         )
 
 
-class _RetryStatusAsyncClient:
+class _RetryStatusAsyncClient(_StreamingFake):
     calls = 0
 
-    def __init__(self, timeout: float):
-        _ = timeout
+    def __init__(self, timeout: float, transport=None):
+        _ = timeout, transport
 
     async def __aenter__(self):
         return self
@@ -53,9 +78,9 @@ class _RetryStatusAsyncClient:
         return httpx.Response(200, json={"ok": True}, request=httpx.Request("GET", "http://test"))
 
 
-class _NetworkErrorAsyncClient:
-    def __init__(self, timeout: float):
-        _ = timeout
+class _NetworkErrorAsyncClient(_StreamingFake):
+    def __init__(self, timeout: float, transport=None):
+        _ = timeout, transport
 
     async def __aenter__(self):
         return self
@@ -68,9 +93,9 @@ class _NetworkErrorAsyncClient:
         raise httpx.NetworkError("disconnected")
 
 
-class _TextPayloadAsyncClient:
-    def __init__(self, timeout: float):
-        _ = timeout
+class _TextPayloadAsyncClient(_StreamingFake):
+    def __init__(self, timeout: float, transport=None):
+        _ = timeout, transport
 
     async def __aenter__(self):
         return self
@@ -124,6 +149,74 @@ async def test_request_with_retry_retries_on_status_code(monkeypatch):
     assert _RetryStatusAsyncClient.calls == 2
 
 
+@pytest.mark.asyncio
+async def test_request_with_retry_records_upstream_timing_for_the_request(monkeypatch):
+    _RetryStatusAsyncClient.calls = 0
+    monkeypatch.setattr("httpx.AsyncClient", _RetryStatusAsyncClient)
+    monkeypatch.setattr(settings, "portfolio_data_platform_base_url", "http://core-a,http://core-b")
+    timings: list = []
+    token = upstream_timings_var.set(timings)
+    try:
+        status, _ = await request_with_retry(
+            method="GET",
+            url="http://core-b/integration/capabilities",
+            timeout_seconds=1.0,
+            max_retries=2,
+            backoff_seconds=0.0,
+            retry_status_codes={503},
+            operation="get_capabilities",
+        )
+    finally:
+        upstream_timings_var.reset(token)
+
+    assert status == 200
+    assert [timing.as_log_fields()["upstream"] for timing in timings] == ["lotus-core"]
+    assert timings[0].operation == "get_capabilities"
+    assert timings[0].attempts == 2
+    assert timings[0].duration_seconds >= 0
+
+
+@pytest.mark.asyncio
+async def test_request_with_retry_records_upstream_metrics_per_attempt(monkeypatch):
+    _FlakyAsyncClient.calls = 0
+    monkeypatch.setattr("httpx.AsyncClient", _FlakyAsyncClient)
+
+    status, _ = await request_with_retry(
+        method="GET",
+        url="http://metrics-upstream/health",
+        timeout_seconds=1.0,
+        max_retries=2,
+        backoff_seconds=0.0,
+        operation="metrics_probe",
+    )
+
+    def sample(name: str, **labels: str) -> float | None:
+        return REGISTRY.get_sample_value(
+            name, {"upstream": "upstream", "operation": "metrics_probe", **labels}
+        )
+
+    assert status == 200
+    assert sample("lotus_gateway_upstream_requests_total", status_class="timeout", attempt="1") == 1
+    assert sample("lotus_gateway_upstream_requests_total", status_class="2xx", attempt="2") == 1
+    assert (
+        sample(
+            "lotus_gateway_upstream_request_duration_seconds_count",
+            status_class="2xx",
+            attempt="2",
+        )
+        == 1
+    )
+    assert sample("lotus_gateway_upstream_retries_total", reason="timeout") == 1
+    assert sample("lotus_gateway_upstream_timeouts_total") == 1
+    assert sample("lotus_gateway_upstream_response_bytes_count") == 1
+
+
+def test_upstream_service_name_maps_unknown_origins_to_a_fixed_name(monkeypatch):
+    monkeypatch.setattr(settings, "reporting_aggregation_base_url", "http://report:8300/")
+    assert upstream_service_name("http://report:8300/aggregations/P1") == "lotus-report"
+    assert upstream_service_name("https://other:9000/x") == "upstream"
+
+
 @pytest.mark.asyncio
 async def test_request_with_retry_returns_503_after_network_error(monkeypatch):
     monkeypatch.setattr("httpx.AsyncClient", _NetworkErrorAsyncClient)
@@ -169,3 +262,289 @@ async def test_request_with_retry_handles_negative_retry_configuration():
 
     assert status == 503
     assert payload == {"detail": "upstream communication failure: exhausted retries"}
+
+
+class _QueuedStreamAsyncClient(_StreamingFake):
+    responses: list[httpx.Response | Exception] = []
+
+    def __init__(self, timeout: float, transport=None):
+        _ = timeout, transport
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
+
+    async def get(self, url, params=None, headers=None):
+        _ = url, params, headers
+        return self._next_response()
+
+    async def post(self, url, headers=None, json=None, data=None, files=None):
+        _ = url, headers, json, data, files
+        return self._next_response()
+
+    @staticmethod
+    def _next_response() -> httpx.Response:
+        item = _QueuedStreamAsyncClient.responses.pop(0)
+        if isinstance(item, Exception):
+            raise item
+        return item
+
+
+def _chunked_response(status_code: int, chunks: list[bytes]) -> httpx.Response:
+    async def _body():
+        for chunk in chunks:
+            yield chunk
+
+    return httpx.Response(status_code, content=_body(), request=httpx.Request("GET", "http://test"))
+
+
+@pytest.mark.asyncio
+async def test_request_with_retry_rejects_declared_oversized_body(monkeypatch):
+    _QueuedStreamAsyncClient.responses = [
+        httpx.Response(
+            200,
+            content=b"x" * 11,
+            headers={"Content-Length": "11"},
+            request=httpx.Request("GET", "http://test"),
+        ),
+        httpx.Response(
+            200,
+            content=b'{"ok": true}',
+            headers={"Content-Length": "unknown"},
+            request=httpx.Request("GET", "http://test"),
+        ),
+    ]
+    monkeypatch.setattr("httpx.AsyncClient", _QueuedStreamAsyncClient)
+
+    status, payload = await request_with_retry(
+        method="GET",
+        url="http://service/rows",
+        timeout_seconds=1.0,
+        max_retries=0,
+        max_response_bytes=10,
+    )
+
+    assert status == 502
+    assert payload == {
+        "detail": "upstream response exceeded 10 bytes",
+        "error_code": "UPSTREAM_RESPONSE_TOO_LARGE",
+    }
+
+    status, payload = await request_with_retry(
+        method="GET",
+        url="http://service/rows",
+        timeout_seconds=1.0,
+        max_retries=0,
+        max_response_bytes=64,
+    )
+
+    assert (status, payload) == (200, {"ok": True})
+
+
+@pytest.mark.asyncio
+async def test_request_with_retry_aborts_streamed_body_over_limit(monkeypatch):
+    _QueuedStreamAsyncClient.responses = [
+        _chunked_response(200, [b'{"rows": [', b"1, 2, 3, 4, ", b"5, 6, 7, 8]}"])
+    ]
+    monkeypatch.setattr("httpx.AsyncClient", _QueuedStreamAsyncClient)
+
+    status, payload = await request_with_retry(
+        method="GET",
+        url="http://service/rows",
+        timeout_seconds=1.0,
+        max_retries=0,
+        max_response_bytes=20,
+        stream_array=StreamedArrayField("rows"),
+    )
+
+    assert status == 502
+    assert payload["error_code"] == "UPSTREAM_RESPONSE_TOO_LARGE"
+
+
+@pytest.mark.asyncio
+async def test_request_with_retry_parses_streamed_array_field(monkeypatch):
+    _QueuedStreamAsyncClient.responses = [
+        _chunked_response(200, [b'{"items": [{"id": "A", "x"', b': 1}, {"id": "B"}], "n": 2}']),
+        _chunked_response(200, [b'{"items": [1 2, ', b"3]}"]),
+        _chunked_response(
+            200,
+            [b'{"items": [1, 2'],
+        ),
+        _chunked_response(500, [b"plain-", b"text"]),
+    ]
+    monkeypatch.setattr("httpx.AsyncClient", _QueuedStreamAsyncClient)
+    field = StreamedArrayField(
+        "items", transform=lambda item: item["id"] if isinstance(item, dict) else item
+    )
+
+    results = [
+        await request_with_retry(
+            method="GET",
+            url="http://service/items",
+            timeout_seconds=1.0,
+            max_retries=0,
+            stream_array=field,
+        )
+        for _ in range(4)
+    ]
+
+    assert results == [
+        (200, {"items": ["A", "B"], "n": 2}),
+        (200, {"detail": "upstream returned an invalid JSON payload"}),
+        (200, {"detail": "upstream returned an invalid JSON payload"}),
+        (500, {"detail": "plain-text"}),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_request_with_retry_honours_retry_after_within_cap(monkeypatch):
+    sleeps: list[float] = []
+
+    async def _record_sleep(delay):
+        sleeps.append(delay)
+
+    _QueuedStreamAsyncClient.responses = [
+        httpx.Response(
+            429,
+            json={"detail": "slow down"},
+            headers={"Retry-After": "1.5"},
+            request=httpx.Request("GET", "http://test"),
+        ),
+        httpx.Response(200, json={"ok": True}, request=httpx.Request("GET", "http://test")),
+    ]
+    monkeypatch.setattr("httpx.AsyncClient", _QueuedStreamAsyncClient)
+    monkeypatch.setattr("app.clients.http_resilience.asyncio.sleep", _record_sleep)
+
+    status, payload = await request_with_retry(
+        method="GET",
+        url="http://service/rows",
+        timeout_seconds=1.0,
+        max_retries=2,
+        backoff_seconds=0.1,
+        retry_status_codes=DEFAULT_RETRY_STATUS_CODES,
+    )
+
+    assert (status, payload) == (200, {"ok": True})
+    assert sleeps == [1.5]
+
+
+@pytest.mark.asyncio
+async def test_request_with_retry_returns_response_when_retry_after_exceeds_cap(monkeypatch):
+    _QueuedStreamAsyncClient.responses = [
+        httpx.Response(
+            503,
+            json={"detail": "maintenance"},
+            headers={"Retry-After": "3600"},
+            request=httpx.Request("GET", "http://test"),
+        )
+    ]
+    monkeypatch.setattr("httpx.AsyncClient", _QueuedStreamAsyncClient)
+
+    status, payload = await request_with_retry(
+        method="GET",
+        url="http://service/rows",
+        timeout_seconds=1.0,
+        max_retries=2,
+        retry_status_codes=DEFAULT_RETRY_STATUS_CODES,
+    )
+
+    assert (status, payload) == (503, {"detail": "maintenance"})
+    assert _QueuedStreamAsyncClient.responses == []
+
+
+def test_retry_after_seconds_parses_delta_and_http_date():
+    future = datetime.now(UTC) + timedelta(seconds=30)
+
+    assert _retry_after_seconds(None) is None
+    assert _retry_after_seconds("") is None
+    assert _retry_after_seconds(" 2 ") == 2.0
+    assert _retry_after_seconds("-4") == 0.0
+    assert _retry_after_seconds("not-a-date") is None
+    assert 25 < _retry_after_seconds(format_datetime(future, usegmt=True)) <= 30
+    assert _retry_after_seconds("Wed, 21 Oct 2015 07:28:00") == 0.0
+
+
+def test_next_backoff_uses_capped_decorrelated_jitter(monkeypatch):
+    monkeypatch.setattr(settings, "upstream_retry_max_backoff_seconds", 1.0)
+
+    previous = 0.2
+    for _ in range(50):
+        delay = _next_backoff(0.2, previous)
+        assert 0.2 <= delay <= min(1.0, previous * 3)
+        previous = delay
+    assert _next_backoff(0.2, 100.0) <= 1.0
+
+
+@pytest.mark.asyncio
+async def test_non_idempotent_post_only_retries_connect_failures(monkeypatch):
+    _QueuedStreamAsyncClient.responses = [
+        httpx.ConnectError("refused"),
+        httpx.ReadTimeout("slow upload"),
+        httpx.Response(201, json={"ok": True}, request=httpx.Request("POST", "http://test")),
+    ]
+    monkeypatch.setattr("httpx.AsyncClient", _QueuedStreamAsyncClient)
+
+    status, payload = await request_with_retry(
+        method="POST",
+        url="http://service/uploads",
+        timeout_seconds=1.0,
+        max_retries=2,
+        backoff_seconds=0.0,
+        files={"file": ("rows.csv", b"a,b")},
+        retry_policy="non_idempotent",
+    )
+
+    assert (status, payload) == (503, {"detail": "upstream communication failure: ReadTimeout"})
+    assert len(_QueuedStreamAsyncClient.responses) == 1
+
+
+@pytest.mark.asyncio
+async def test_non_idempotent_post_ignores_retry_status_codes(monkeypatch):
+    _QueuedStreamAsyncClient.responses = [
+        httpx.Response(503, json={"detail": "busy"}, request=httpx.Request("POST", "http://test")),
+        httpx.Response(201, json={"ok": True}, request=httpx.Request("POST", "http://test")),
+    ]
+    monkeypatch.setattr("httpx.AsyncClient", _QueuedStreamAsyncClient)
+
+    status, payload = await request_with_retry(
+        method="POST",
+        url="http://service/sessions",
+        timeout_seconds=1.0,
+        backoff_seconds=0.0,
+        retry_status_codes=DEFAULT_RETRY_STATUS_CODES,
+        json_body={"portfolio_id": "P1"},
+    )
+
+    assert (status, payload) == (503, {"detail": "busy"})
+    assert len(_QueuedStreamAsyncClient.responses) == 1
+
+
+@pytest.mark.asyncio
+async def test_idempotent_post_with_key_retries_timeouts(monkeypatch):
+    _QueuedStreamAsyncClient.responses = [
+        httpx.ReadTimeout("slow"),
+        httpx.Response(201, json={"ok": True}, request=httpx.Request("POST", "http://test")),
+    ]
+    monkeypatch.setattr("httpx.AsyncClient", _QueuedStreamAsyncClient)
+
+    status, payload = await request_with_retry(
+        method="POST",
+        url="http://service/proposals",
+        timeout_seconds=1.0,
+        backoff_seconds=0.0,
+        headers={"Idempotency-Key": "idem-1"},
+        json_body={"proposal": {}},
+        retry_policy="idempotent",
+    )
+
+    assert (status, payload) == (201, {"ok": True})
+
+
+def test_resolve_retry_policy_defaults_and_requires_idempotency_key():
+    assert _resolve_retry_policy("get", None, None) == "safe"
+    assert _resolve_retry_policy("POST", {"idempotency-key": "k"}, None) == "idempotent"
+    assert _resolve_retry_policy("POST", {"X-Correlation-Id": "c"}, None) == "non_idempotent"
+    assert _resolve_retry_policy("POST", None, "idempotent") == "non_idempotent"
+    assert _resolve_retry_policy("POST", None, "safe") == "safe"
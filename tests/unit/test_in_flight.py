@@ -0,0 +1,77 @@
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+
+from app.middleware import in_flight
+from app.middleware.in_flight import InFlightMiddleware, InFlightTracker
+
+
+@pytest.mark.asyncio
+async def test_drain_waits_for_in_flight_requests():
+    tracker = InFlightTracker()
+    tracker.started()
+    tracker.started()
+
+    async def _finish_requests():
+        await asyncio.sleep(0.01)
+        tracker.finished()
+        tracker.finished()
+
+    finisher = asyncio.create_task(_finish_requests())
+    assert await tracker.drain(grace_seconds=1.0) is True
+    await finisher
+
+    assert tracker.in_flight == 0
+    assert await tracker.drain(grace_seconds=0.01) is True
+
+
+@pytest.mark.asyncio
+async def test_drain_gives_up_after_grace_period(caplog):
+    tracker = InFlightTracker()
+    tracker.started()
+
+    with caplog.at_level("WARNING", logger="in_flight"):
+        assert await tracker.drain(grace_seconds=0.02) is False
+    assert tracker.in_flight == 1
+    (record,) = caplog.records
+    assert record.extra_fields == {"in_flight": 1}
+
+    tracker.finished()
+    tracker.finished()
+    assert tracker.in_flight == 0
+
+
+def test_in_flight_middleware_labels_gauge_by_route_template(monkeypatch):
+    tracker = InFlightTracker()
+    monkeypatch.setattr(in_flight, "IN_FLIGHT", tracker)
+    seen: dict[str, float | None] = {}
+    application = FastAPI()
+    application.add_middleware(InFlightMiddleware)
+
+    @application.get("/portfolios/{portfolio_id}")
+    async def _portfolio(portfolio_id: str):
+        seen["in_flight"] = tracker.in_flight
+        seen["gauge"] = REGISTRY.get_sample_value(
+            "lotus_gateway_http_in_flight_requests", {"route": "/portfolios/{portfolio_id}"}
+        )
+        return {"portfolio_id": portfolio_id}
+
+    client = TestClient(application)
+    assert client.get("/portfolios/P1").status_code == 200
+    assert client.get("/missing").status_code == 404
+
+    assert seen == {"in_flight": 1, "gauge": 1.0}
+    assert tracker.in_flight == 0
+    assert (
+        REGISTRY.get_sample_value(
+            "lotus_gateway_http_in_flight_requests", {"route": "/portfolios/{portfolio_id}"}
+        )
+        == 0
+    )
+    assert (
+        REGISTRY.get_sample_value("lotus_gateway_http_in_flight_requests", {"route": "unmatched"})
+        == 0
+    )
@@ -0,0 +1,73 @@
+import math
+
+import pytest
+
+from app import json_codec
+from app.clients.http_resilience import _body_payload
+from app.responses import GatewayJSONResponse
+
+
+@pytest.fixture(autouse=True)
+def _restore_codec():
+    previous = json_codec.get_json_codec()
+    yield
+    json_codec._active_codec = previous
+
+
+def test_resolve_json_codec_honours_preference():
+    pytest.importorskip("orjson")
+    assert json_codec.resolve_json_codec("auto").name == "orjson"
+    assert json_codec.resolve_json_codec("orjson").name == "orjson"
+    assert json_codec.resolve_json_codec("stdlib").name == "stdlib"
+
+
+def test_resolve_json_codec_falls_back_to_stdlib_without_orjson(monkeypatch, caplog):
+    monkeypatch.setattr(json_codec, "orjson", None)
+    assert json_codec.resolve_json_codec("auto").name == "stdlib"
+    with caplog.at_level("WARNING", logger="json_codec"):
+        assert json_codec.resolve_json_codec("orjson").name == "stdlib"
+    assert "json_codec.orjson_unavailable" in caplog.text
+
+
+@pytest.mark.parametrize("preference", ["orjson", "stdlib"])
+def test_codecs_round_trip_and_match_starlette_rendering(preference):
+    if preference == "orjson":
+        pytest.importorskip("orjson")
+    codec = json_codec.configure_json_codec(preference)
+    value = {"portfolio": "P1", "label": "Zürich", "rows": [1, 2.5, None, True]}
+
+    assert (
+        json_codec.dumps(value)
+        == b'{"portfolio":"P1","label":"Z\xc3\xbcrich","rows":[1,2.5,null,true]}'
+    )
+    assert json_codec.loads(json_codec.dumps(value)) == value
+    assert codec.dumps({1: "a"}) == b'{"1":"a"}'
+
+
+def test_orjson_codec_falls_back_to_stdlib_for_inputs_it_rejects():
+    pytest.importorskip("orjson")
+    codec = json_codec.ORJSON_CODEC
+    assert math.isinf(codec.loads(b'{"value": Infinity}')["value"])
+    assert codec.dumps({"value": 2**70}) == b'{"value":1180591620717411303424}'
+    with pytest.raises(ValueError):
+        codec.loads(b"{not-json")
+
+
+@pytest.mark.parametrize("preference", ["orjson", "stdlib"])
+def test_body_payload_decodes_with_active_codec(preference):
+    if preference == "orjson":
+        pytest.importorskip("orjson")
+    json_codec.configure_json_codec(preference)
+
+    assert _body_payload(b'{"ok": true}', None) == {"ok": True}
+    assert _body_payload(b"[1, 2]", None) == {"detail": [1, 2]}
+    assert _body_payload("plain-caf\u00e9".encode("latin-1"), "latin-1") == {
+        "detail": "plain-caf\u00e9"
+    }
+
+
+def test_gateway_json_response_renders_with_codec():
+    response = GatewayJSONResponse(status_code=413, content={"detail": "payload_too_large"})
+    assert response.status_code == 413
+    assert response.body == b'{"detail":"payload_too_large"}'
+    assert response.headers["content-type"] == "application/json"
@@ -0,0 +1,80 @@
+import asyncio
+import json
+from typing import Any
+
+import pytest
+
+from app.json_document_store import JsonDocumentStore
+
+
+class _KeysStore(JsonDocumentStore[list[str]]):
+    name = "keys"
+    env_var = "TEST_KEYS_JSON"
+
+    def __init__(self, path: str = "", reload_interval_seconds: float = 5.0):
+        self.reloads: list[str] = []
+        super().__init__(path, reload_interval_seconds)
+
+    def compile(self, document: dict[str, Any]) -> list[str]:
+        return sorted(document)
+
+    def record_reload(self, outcome: str) -> None:
+        self.reloads.append(outcome)
+
+
+def test_store_requires_compile_and_record_reload():
+    class _Incomplete(JsonDocumentStore[list[str]]):
+        def compile(self, document: dict[str, Any]) -> list[str]:
+            return []
+
+    with pytest.raises(TypeError):
+        _Incomplete()  # type: ignore[abstract]
+
+
+def test_env_sourced_store_reads_the_variable(monkeypatch):
+    monkeypatch.setenv("TEST_KEYS_JSON", json.dumps({"b": 1, "a": 2}))
+    store = _KeysStore()
+
+    assert store.reload() is True
+    assert store.compiled == ["a", "b"]
+    assert store.reloads == ["loaded"]
+
+
+def test_unreadable_file_keeps_the_compiled_document(tmp_path, caplog):
+    path = tmp_path / "keys.json"
+    path.write_text(json.dumps({"a": 1}))
+    store = _KeysStore(str(path))
+    assert store.reload() is True
+
+    path.unlink()
+    with caplog.at_level("WARNING", logger="json_document_store"):
+        assert store.reload() is False
+    assert store.reload_if_changed() is False
+
+    assert store.compiled == ["a"]
+    assert store.reloads == ["loaded", "invalid"]
+    (record,) = caplog.records
+    assert record.getMessage() == "keys.read_failed"
+    assert record.extra_fields["path"] == str(path)
+
+
+@pytest.mark.asyncio
+async def test_watcher_only_runs_for_file_sources_and_starts_once(tmp_path):
+    env_store = _KeysStore()
+    env_store.start()
+    assert env_store._task is None
+    await env_store.stop()
+
+    path = tmp_path / "keys.json"
+    path.write_text(json.dumps({"a": 1}))
+    store = _KeysStore(str(path), reload_interval_seconds=0.01)
+    store.reload()
+    store.start()
+    task = store._task
+    store.start()
+    assert store._task is task
+    await asyncio.sleep(0.05)
+    await store.stop()
+
+    assert store.reloads == ["loaded"]
+    assert task is not None and task.cancelled()
@@ -0,0 +1,76 @@
+import json
+
+import pytest
+
+from app.clients.json_stream import IncrementalObjectParser, StreamedArrayField
+
+
+def _parse_in_chunks(body: bytes, field: StreamedArrayField, chunk_size: int):
+    parser = IncrementalObjectParser(field)
+    for start in range(0, len(body), chunk_size):
+        parser.feed(body[start : start + chunk_size])
+    return parser.close()
+
+
+def test_incremental_parser_matches_json_loads_for_every_chunk_size():
+    payload = {
+        "generatedAt": "2026-02-24T07:00:00Z",
+        "rows": [
+            {"bucket": "TOTAL", "value": 1250000.5, "label": 'Zürich "core" \\ sleeve'},
+            12345,
+            -1.5e-3,
+            [1, {"nested": [True, False, None]}],
+            "text",
+        ],
+        "meta": {"count": 5, "empty": {}},
+        "tail": 42,
+    }
+    body = json.dumps(payload, ensure_ascii=False, indent=1).encode("utf-8")
+
+    for chunk_size in range(1, 40):
+        assert _parse_in_chunks(body, StreamedArrayField("rows"), chunk_size) == payload
+
+
+def test_incremental_parser_applies_transform_to_streamed_items_only():
+    field = StreamedArrayField("items", transform=lambda item: item["id"])
+    body = b'{"items": [{"id": "A", "x": 1}, {"id": "B"}], "other": [{"id": "C"}]}'
+
+    assert _parse_in_chunks(body, field, 7) == {"items": ["A", "B"], "other": [{"id": "C"}]}
+
+
+def test_incremental_parser_handles_empty_and_non_array_fields():
+    field = StreamedArrayField("items")
+    assert _parse_in_chunks(b" { } ", field, 1) == {}
+    assert _parse_in_chunks(b'{"items": []}', field, 3) == {"items": []}
+    assert _parse_in_chunks(b'{"items": null}', field, 3) == {"items": None}
+
+
+def test_incremental_parser_passes_through_non_object_payloads():
+    assert _parse_in_chunks(b"[1, 2, 3]", StreamedArrayField("items"), 2) == [1, 2, 3]
+
+
+def test_incremental_parser_compacts_consumed_buffer():
+    rows = [{"index": index, "payload": "x" * 64} for index in range(3000)]
+    body = json.dumps({"rows": rows}).encode("utf-8")
+    parser = IncrementalObjectParser(StreamedArrayField("rows"))
+    for start in range(0, len(body), 8192):
+        parser.feed(body[start : start + 8192])
+        assert len(parser._buffer) < 65_536 + 8192
+    assert parser.close() == {"rows": rows}
+
+
+@pytest.mark.parametrize(
+    "body",
+    [
+        b'{"rows": [1, 2',
+        b'{"rows": [1 2]}',
+        b'{"a": 1 "b": 2}',
+        b'{"a" 1}',
+        b"{1: 2}",
+        b'{"a": 1} trailing',
+        b'{"rows": [1,]}',
+    ],
+)
+def test_incremental_parser_rejects_invalid_payloads(body):
+    with pytest.raises(ValueError):
+        _parse_in_chunks(body, StreamedArrayField("rows"), 4)
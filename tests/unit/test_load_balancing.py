@@ -0,0 +1,177 @@
+import random
+from contextlib import asynccontextmanager
+
+import httpx
+import pytest
+from prometheus_client import REGISTRY
+
+from app.clients import bulkhead as bulkhead_module
+from app.clients import load_balancing
+from app.clients.http_resilience import request_with_retry
+from app.clients.load_balancing import (
+    UpstreamEndpoint,
+    UpstreamPool,
+    route_upstream,
+    upstream_base_url,
+)
+from app.clients.pas_client import PasClient
+from app.config import settings
+
+
+@pytest.fixture(autouse=True)
+def _isolated_pools(monkeypatch):
+    monkeypatch.setattr(load_balancing, "_POOLS", {})
+    monkeypatch.setattr(load_balancing, "_chooser", random.Random(7))
+    monkeypatch.setattr(bulkhead_module, "_BULKHEADS", {})
+    monkeypatch.setattr(settings, "upstream_outlier_consecutive_failures", 2)
+    monkeypatch.setattr(settings, "upstream_outlier_base_ejection_seconds", 10.0)
+    monkeypatch.setattr(settings, "upstream_outlier_max_ejection_seconds", 25.0)
+
+
+def test_upstream_base_url_registers_pool_only_for_multiple_endpoints():
+    assert upstream_base_url("http://single:8201/") == "http://single:8201"
+    assert upstream_base_url("") == ""
+    assert load_balancing._POOLS == {}
+
+    primary = upstream_base_url(" http://pas-a:8201/ , http://pas-b:8201 ,")
+
+    assert primary == "http://pas-a:8201"
+    pool = load_balancing._POOLS["http://pas-a:8201"]
+    assert [endpoint.base_url for endpoint in pool.endpoints] == [
+        "http://pas-a:8201",
+        "http://pas-b:8201",
+    ]
+    assert upstream_base_url("http://pas-a:8201,http://pas-b:8201") == primary
+    assert load_balancing._POOLS["http://pas-a:8201"] is pool
+    assert PasClient(base_url="http://pas-a:8201,http://pas-b:8201", timeout_seconds=1)
+    assert load_balancing._POOLS["http://pas-a:8201"] is pool
+
+
+def test_route_upstream_rewrites_primary_prefix_and_passes_through_unknown_urls():
+    upstream_base_url("http://pas-a:8201/api,http://pas-b:8201/api")
+    pool = load_balancing._POOLS["http://pas-a:8201"]
+    pool.endpoints[0].in_flight = 5
+    pool.endpoints[0].rtt_ewma = 0.2
+    pool.endpoints[1].rtt_ewma = 0.1
+
+    target, endpoint = route_upstream("http://pas-a:8201/api/portfolios?x=1")
+
+    assert target == "http://pas-b:8201/api/portfolios?x=1"
+    assert endpoint is pool.endpoints[1]
+    assert route_upstream("http://other:1/portfolios") == ("http://other:1/portfolios", None)
+    assert route_upstream("http://pas-a:8201/other") == ("http://pas-a:8201/other", None)
+
+
+def test_power_of_two_choices_prefers_lower_in_flight_latency_score():
+    pool = UpstreamPool(["http://p2c-a", "http://p2c-b", "http://p2c-c"])
+    busy, idle, slow = pool.endpoints
+    busy.in_flight, busy.rtt_ewma = 4, 0.05
+    idle.in_flight, idle.rtt_ewma = 0, 0.05
+    slow.in_flight, slow.rtt_ewma = 0, 2.0
+
+    picks = [pool.select(now=0.0) for _ in range(60)]
+
+    # The worst-scoring replica loses every pairing; the best wins every pairing it is drawn into.
+    assert slow not in picks
+    assert picks.count(idle) > picks.count(busy) > 0
+
+
+def test_endpoint_ejection_readmission_and_progressive_backoff():
+    endpoint = UpstreamEndpoint("http://eject", "http://eject-a")
+
+    endpoint.start()
+    endpoint.finish(0.1, failed=True, now=0.0)
+    assert endpoint.available(1.0) is True
+    endpoint.start()
+    endpoint.finish(0.3, failed=True, now=1.0)
+
+    assert endpoint.in_flight == 0
+    assert endpoint.rtt_ewma == pytest.approx(0.16)
+
+    def ejected_gauge() -> float | None:
+        return REGISTRY.get_sample_value(
+            "lotus_gateway_upstream_endpoint_ejected",
+            {"upstream": "http://eject", "endpoint": "http://eject-a"},
+        )
+
+    assert endpoint.available(10.9) is False
+    assert ejected_gauge() == 1
+    assert endpoint.available(11.0) is True
+    assert ejected_gauge() == 0
+
+    endpoint.finish(0.1, failed=True, now=5.0)
+    assert endpoint.ejections == 1
+
+    endpoint.finish(0.1, failed=True, now=12.0)
+    assert endpoint.ejected_until == 32.0
+    endpoint.finish(0.1, failed=True, now=40.0)
+    assert endpoint.ejected_until == 65.0
+
+    endpoint.finish(0.1, failed=False, now=70.0)
+    assert (endpoint.consecutive_failures, endpoint.ejections) == (0, 0)
+    assert (
+        REGISTRY.get_sample_value(
+            "lotus_gateway_upstream_ejections_total",
+            {"upstream": "http://eject", "endpoint": "http://eject-a"},
+        )
+        == 3
+    )
+
+
+def test_pool_skips_ejected_endpoints_and_falls_back_when_all_are_ejected():
+    pool = UpstreamPool(["http://skip-a", "http://skip-b"])
+    first, second = pool.endpoints
+    first.ejected_until = 100.0
+
+    assert all(pool.select(now=50.0) is second for _ in range(10))
+
+    second.ejected_until = 100.0
+    assert {pool.select(now=50.0).base_url for _ in range(30)} == {
+        "http://skip-a",
+        "http://skip-b",
+    }
+
+
+class _ReplicaAsyncClient:
+    calls: list[str] = []
+
+    def __init__(self, timeout: float, transport=None):
+        _ = timeout, transport
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
+
+    @asynccontextmanager
+    async def stream(self, method, url, **kwargs):
+        _ = kwargs
+        _ReplicaAsyncClient.calls.append(url)
+        if url.startswith("http://replica-a"):
+            raise httpx.ConnectError("refused")
+        yield httpx.Response(200, json={"ok": True}, request=httpx.Request(method, url))
+
+
+@pytest.mark.asyncio
+async def test_request_with_retry_routes_retries_around_failing_replica(monkeypatch):
+    monkeypatch.setattr(settings, "upstream_outlier_consecutive_failures", 1)
+    monkeypatch.setattr("httpx.AsyncClient", _ReplicaAsyncClient)
+    _ReplicaAsyncClient.calls = []
+    base_url = upstream_base_url("http://replica-a:9000,http://replica-b:9000")
+
+    for _ in range(3):
+        status, payload = await request_with_retry(
+            method="GET",
+            url=f"{base_url}/portfolios",
+            timeout_seconds=1.0,
+            max_retries=1,
+            backoff_seconds=0.0,
+        )
+        assert (status, payload) == (200, {"ok": True})
+
+    assert _ReplicaAsyncClient.calls.count("http://replica-a:9000/portfolios") <= 1
+    assert _ReplicaAsyncClient.calls[-1] == "http://replica-b:9000/portfolios"
+    replica_a = load_balancing._POOLS["http://replica-a:9000"].endpoints[0]
+    assert replica_a.in_flight == 0
+    assert "http://replica-b:9000" in bulkhead_module._BULKHEADS
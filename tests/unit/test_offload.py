@@ -0,0 +1,96 @@
+import threading
+
+import pytest
+from prometheus_client import REGISTRY
+
+from app import offload
+from app.config import settings
+from app.middleware.correlation import correlation_id_var
+from app.offload import offload_threshold, run_offloaded, shutdown_offload_executor
+from app.services.position_parsing import count_position_rows
+
+
+def _offload_count(operation: str, mode: str) -> float:
+    return (
+        REGISTRY.get_sample_value(
+            "lotus_gateway_offload_tasks_total", {"operation": operation, "mode": mode}
+        )
+        or 0.0
+    )
+
+
+def _thread_name() -> str:
+    return threading.current_thread().name
+
+
+@pytest.mark.asyncio
+async def test_run_offloaded_keeps_small_payloads_inline_and_moves_large_ones(monkeypatch):
+    monkeypatch.setattr(settings, "offload_executor", "thread")
+    monkeypatch.setattr(settings, "offload_thresholds", {"unit_shape": 100})
+    inline_before = _offload_count("unit_shape", "inline")
+    thread_before = _offload_count("unit_shape", "thread")
+
+    try:
+        assert await run_offloaded("unit_shape", _thread_name, size=99) == _thread_name()
+        assert (await run_offloaded("unit_shape", _thread_name, size=100)).startswith("offload")
+    finally:
+        shutdown_offload_executor()
+
+    assert _offload_count("unit_shape", "inline") - inline_before == 1
+    assert _offload_count("unit_shape", "thread") - thread_before == 1
+    assert (
+        REGISTRY.get_sample_value(
+            "lotus_gateway_offload_threshold_rows", {"operation": "unit_shape"}
+        )
+        == 100
+    )
+    assert (
+        REGISTRY.get_sample_value("lotus_gateway_offload_pool_workers", {"executor": "thread"})
+        == settings.offload_max_workers
+    )
+    assert offload._executor is None
+
+
+@pytest.mark.asyncio
+async def test_thread_offload_carries_the_request_context(monkeypatch):
+    monkeypatch.setattr(settings, "offload_executor", "thread")
+    token = correlation_id_var.set("corr-offload")
+    try:
+        for _ in range(2):
+            assert await run_offloaded("unit_context", correlation_id_var.get, size=10_000) == (
+                "corr-offload"
+            )
+    finally:
+        correlation_id_var.reset(token)
+        shutdown_offload_executor()
+
+
+@pytest.mark.asyncio
+async def test_run_offloaded_supports_process_pool_and_can_be_disabled(monkeypatch):
+    monkeypatch.setattr(settings, "offload_executor", "process")
+    monkeypatch.setattr(settings, "offload_max_workers", 1)
+    try:
+        assert await run_offloaded("unit_sort", sorted, [3, 1, 2], size=10_000) == [1, 2, 3]
+        assert offload._executor._mp_context.get_start_method() == "forkserver"
+    finally:
+        shutdown_offload_executor()
+    assert _offload_count("unit_sort", "process") >= 1
+
+    monkeypatch.setattr(settings, "offload_executor", "none")
+    inline_before = _offload_count("unit_sort", "inline")
+    assert await run_offloaded("unit_sort", sorted, [2, 1], size=10_000) == [1, 2]
+    assert _offload_count("unit_sort", "inline") - inline_before == 1
+    assert offload._executor is None
+
+
+def test_offload_threshold_falls_back_to_default(monkeypatch):
+    monkeypatch.setattr(settings, "offload_default_threshold", 7)
+    assert offload_threshold("unconfigured") == 7
+    assert offload_threshold("report_rows") == settings.offload_thresholds["report_rows"]
+
+
+def test_count_position_rows_sums_asset_class_lists():
+    payload = {"holdings": {"holdingsByAssetClass": {"Equity": [{}, {}], "Cash": [{}], "x": 1}}}
+    assert count_position_rows(payload) == 3
+    assert count_position_rows({"holdings": []}) == 0
+    assert count_position_rows({"holdings": {"holdingsByAssetClass": []}}) == 0
@@ -0,0 +1,144 @@
+import pytest
+
+from app.services.position_parsing import (
+    compute_position_weights,
+    extract_current_positions,
+    extract_position_columns,
+    extract_projected_positions,
+    parse_position_market_value,
+    resolve_valuation_path,
+)
+
+
+def _snapshot(items_by_asset_class: dict, total_market_value: float = 1000.0) -> dict:
+    return {
+        "overview": {"total_market_value": total_market_value},
+        "holdings": {"holdingsByAssetClass": items_by_asset_class},
+    }
+
+
+def test_resolve_valuation_path_prefers_nested_then_flat_aliases():
+    nested = resolve_valuation_path({"valuation": {"market_value": 1}, "value_base": 2})
+    assert nested is not None
+    assert (nested.nested, nested.key) == (True, "market_value")
+    assert nested.shadowing_nested_keys == ("market_value_base",)
+
+    flat = resolve_valuation_path({"valuation": {}, "current_value": 3})
+    assert flat is not None
+    assert (flat.nested, flat.key) == (False, "current_value")
+    assert resolve_valuation_path({"quantity": 1}) is None
+
+
+def test_extract_position_columns_resolves_alias_from_first_valued_row():
+    payload = _snapshot(
+        {
+            "Equity": [
+                {"instrument_id": "A", "quantity": 1},
+                {"instrument_id": "B", "quantity": 2, "valuation": {"market_value": 200.0}},
+                {"instrument_id": "C", "quantity": 3, "valuation": {"market_value": 300.0}},
+            ],
+            "Cash": "not-a-list",
+        }
+    )
+    columns = extract_position_columns(payload)
+    assert len(columns) == 3
+    assert columns.security_ids == ["A", "B", "C"]
+    assert columns.asset_classes == ["Equity", "Equity", "Equity"]
+    assert columns.market_values_base == [None, 200.0, 300.0]
+
+
+@pytest.mark.parametrize(
+    "item",
+    [
+        {"valuation": {"market_value_base": 50.0, "market_value": 10.0}},
+        {"valuation": {"market_value": "bad"}, "current_value_base": 12.345},
+        {"market_value_base": 7.0, "valuation": {"market_value": 10.0}},
+        {"valuation": "n/a", "value_base": 9.999},
+        {"valuation": {"market_value": None}, "market_value": 4.0},
+        {"valuation": {}},
+    ],
+)
+def test_resolved_alias_never_diverges_from_full_probe(item):
+    first = {"instrument_id": "A0", "valuation": {"market_value": 10.0}}
+    payload = _snapshot({"Equity": [first, {"instrument_id": "A1", **item}]})
+    columns = extract_position_columns(payload)
+    assert columns.market_values_base[1] == parse_position_market_value(item)
+
+
+def test_flat_alias_is_shadowed_by_higher_priority_keys():
+    payload = _snapshot(
+        {
+            "Equity": [
+                {"instrument_id": "A", "value_base": 1.0},
+                {"instrument_id": "B", "value_base": 2.0, "market_value": 5.0},
+                {"instrument_id": "C", "value_base": 3.0, "valuation": {"current_value": 6.0}},
+            ]
+        }
+    )
+    assert extract_position_columns(payload).market_values_base == [1.0, 5.0, 6.0]
+
+
+def test_compute_position_weights_prefers_reported_weight_and_handles_zero_total():
+    assert compute_position_weights([100.0, None, 50.0], [None, None, 12.3456789], 1000.0) == [
+        10.0,
+        None,
+        12.345679,
+    ]
+    assert compute_position_weights([100.0, 50.0], [None, 1.5], 0.0) == [None, 1.5]
+
+
+def test_extract_current_positions_emits_sorted_quantized_rows():
+    payload = _snapshot(
+        {
+            "Equity": [
+                {
+                    "instrument_id": "EQ_2",
+                    "instrument_name": "Equity 2",
+                    "quantity": 1.23456789,
+                    "valuation": {"market_value_base": 333.335},
+                },
+                {"security_id": "EQ_1", "quantity": "4", "valuation": {"market_value_base": 1}},
+            ],
+            None: [{"instrument_id": "CASH", "quantity": 0}],
+        },
+        total_market_value=1000.0,
+    )
+    rows = extract_current_positions(payload)
+    assert [row.security_id for row in rows] == ["CASH", "EQ_1", "EQ_2"]
+    assert rows[0].asset_class is None
+    assert rows[0].market_value_base is None
+    assert rows[0].weight_pct is None
+    assert rows[1].instrument_name == "UNKNOWN"
+    assert rows[1].quantity == 4.0
+    assert rows[1].weight_pct == pytest.approx(0.1)
+    assert rows[2].quantity == 1.234568
+    assert rows[2].market_value_base == 333.34
+    assert rows[2].weight_pct == pytest.approx(33.334)
+
+
+def test_extract_current_positions_returns_empty_for_missing_holdings():
+    assert extract_current_positions({"overview": "bad", "holdings": {}}) == []
+
+
+def test_extract_projected_positions_quantizes_and_skips_invalid_rows():
+    rows = extract_projected_positions(
+        [
+            {
+                "security_id": "EQ_1",
+                "asset_class": "Equity",
+                "baseline_quantity": "10",
+                "proposed_quantity": 12.1234567,
+                "delta_quantity": 2.1234567,
+            },
+            "bad-row",
+            {"instrument_name": "Cash"},
+        ]
+    )
+    assert len(rows) == 2
+    assert rows[0].instrument_name == "EQ_1"
+    assert rows[0].baseline_quantity == 10.0
+    assert rows[0].proposed_quantity == 12.123457
+    assert rows[1].security_id == ""
+    assert rows[1].asset_class is None
+    assert rows[1].delta_quantity == 0.0
+    assert extract_projected_positions({"positions": []}) == []
@@ -7,9 +7,12 @@ from app.precision_policy import (
     normalize_input,
     quantize_fx_rate,
     quantize_money,
+    quantize_money_to_float,
     quantize_performance,
+    quantize_performance_to_float,
     quantize_price,
     quantize_quantity,
+    quantize_quantity_to_float,
     quantize_risk,
     to_decimal,
 )
@@ -57,3 +60,33 @@ def test_intermediate_precision_preserved_before_final_quantize() -> None:
     value = normalize_input("0.123456789012", "performance")
     assert value == Decimal("0.123456789012")
     assert quantize_performance(value) == Decimal("0.123457")
+
+
+@pytest.mark.parametrize(
+    "raw",
+    [
+        2.675,
+        1.005,
+        1.015,
+        0.0078125,
+        0.12345650,
+        -0.0,
+        123456.789123456,
+        1e16,
+        1e-7,
+        42,
+        10**16,
+        "19.995",
+        None,
+        Decimal("3.14159265"),
+    ],
+)
+def test_float_quantizers_match_decimal_quantizers(raw) -> None:
+    assert str(quantize_money_to_float(raw)) == str(float(quantize_money(raw)))
+    assert str(quantize_quantity_to_float(raw)) == str(float(quantize_quantity(raw)))
+    assert str(quantize_performance_to_float(raw)) == str(float(quantize_performance(raw)))
+
+
+def test_float_quantizers_reject_invalid_value() -> None:
+    with pytest.raises(ValueError):
+        quantize_money_to_float("bad-number")
@@ -0,0 +1,116 @@
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+
+from app import profiling
+from app.config import settings
+from app.middleware.correlation import CorrelationMiddleware
+from app.middleware.profiling import PROFILE_HEADER, ProfilingMiddleware
+from app.profiling import ProfileStore
+from app.routers.admin import router as admin_router
+
+ADMIN_HEADERS = {"X-Gateway-Admin-Token": "s3cret"}
+
+
+def _burn_cpu(seconds: float) -> int:
+    deadline = time.perf_counter() + seconds
+    total = 0
+    while time.perf_counter() < deadline:
+        total += sum(range(200))
+    return total
+
+
+@pytest.fixture
+def client(monkeypatch) -> TestClient:
+    monkeypatch.setattr(settings, "admin_token", "s3cret")
+    monkeypatch.setattr(settings, "profiling_interval_seconds", 0.002)
+    monkeypatch.setattr(profiling, "PROFILE_STORE", ProfileStore(max_profiles=10))
+    application = FastAPI()
+    application.add_middleware(ProfilingMiddleware)
+    application.add_middleware(CorrelationMiddleware)
+    application.include_router(admin_router)
+
+    @application.get("/portfolios/{portfolio_id}/heavy")
+    async def _heavy(portfolio_id: str):
+        return {"portfolio_id": portfolio_id, "total": _burn_cpu(0.15)}
+
+    return TestClient(application)
+
+
+def _profiled(trigger: str, outcome: str) -> float:
+    return (
+        REGISTRY.get_sample_value(
+            "lotus_gateway_profiled_requests_total", {"trigger": trigger, "outcome": outcome}
+        )
+        or 0.0
+    )
+
+
+def test_privileged_header_profiles_request_into_ring_buffer(client):
+    before = _profiled("header", "profiled")
+    response = client.get(
+        "/portfolios/P1/heavy",
+        headers={PROFILE_HEADER: "s3cret", "X-Correlation-Id": "corr-profile-1"},
+    )
+    assert response.status_code == 200
+
+    profile = client.get("/admin/profiles/corr-profile-1", headers=ADMIN_HEADERS).json()
+    assert profile["trigger"] == "header"
+    assert profile["path"] == "/portfolios/P1/heavy"
+    assert profile["samples"] > 0
+    top = profile["top_functions"][0]
+    assert top["function"].startswith("_burn_cpu (test_profiling.py:")
+    assert top["self_samples"] > 0
+    assert top["cumulative_ms"] >= top["self_ms"]
+    assert any("<locals>._heavy (" in row["function"] for row in profile["top_functions"])
+    assert client.get("/admin/profiles", headers=ADMIN_HEADERS).json() == {
+        "correlation_ids": ["corr-profile-1"]
+    }
+    assert _profiled("header", "profiled") - before == 1
+
+
+def test_requests_are_not_profiled_without_token_or_sampling(client):
+    client.get(
+        "/portfolios/P1/heavy", headers={PROFILE_HEADER: "guess", "X-Correlation-Id": "corr-x"}
+    )
+    assert client.get("/admin/profiles/corr-x", headers=ADMIN_HEADERS).status_code == 404
+
+
+def test_sampled_profiling_respects_concurrency_limit(client, monkeypatch):
+    monkeypatch.setattr(settings, "profiling_sample_ratio", 1.0)
+    client.get("/portfolios/P1/heavy", headers={"X-Correlation-Id": "corr-sampled"})
+    monkeypatch.setattr(settings, "profiling_sample_ratio", 0.0)
+    assert (
+        client.get("/admin/profiles/corr-sampled", headers=ADMIN_HEADERS).json()["trigger"]
+        == "sampled"
+    )
+
+    monkeypatch.setattr(settings, "profiling_max_concurrent", 0)
+    monkeypatch.setattr(settings, "profiling_sample_ratio", 1.0)
+    skipped_before = _profiled("sampled", "skipped_limit")
+    client.get("/portfolios/P1/heavy", headers={"X-Correlation-Id": "corr-skipped"})
+    monkeypatch.setattr(settings, "profiling_sample_ratio", 0.0)
+    assert client.get("/admin/profiles/corr-skipped", headers=ADMIN_HEADERS).status_code == 404
+    assert _profiled("sampled", "skipped_limit") - skipped_before == 1
+    assert profiling.PROFILE_STORE.active == 0
+
+
+def test_admin_routes_require_configured_token(client, monkeypatch):
+    assert client.get("/admin/profiles").status_code == 403
+    assert client.get("/admin/profiles", headers={"X-Gateway-Admin-Token": "no"}).status_code == 403
+    monkeypatch.setattr(settings, "admin_token", "")
+    assert client.get("/admin/profiles", headers=ADMIN_HEADERS).status_code == 404
+
+
+def test_profile_store_evicts_oldest_profiles():
+    store = ProfileStore(max_profiles=2)
+    for correlation_id in ("a", "b", "c"):
+        store.add(correlation_id, {"samples": 1})
+    store.add("b", {"samples": 2})
+
+    assert store.get("a") is None
+    assert store.list_ids() == ["b", "c"]
+    assert store.get("b") == {"samples": 2}
@@ -0,0 +1,27 @@
+import json
+from datetime import UTC, datetime
+
+from app.contracts.reporting import ReportingSnapshotResponse
+from app.responses import model_json_response
+
+
+def test_model_json_response_serializes_by_alias_to_bytes():
+    model = ReportingSnapshotResponse.model_construct(
+        correlation_id="corr-1",
+        contract_version="v1",
+        source_service="lotus-report",
+        portfolio_id="P1",
+        as_of_date="2026-02-24",
+        generated_at=datetime(2026, 2, 24, 7, 0, tzinfo=UTC),
+        rows=[{"bucket": "TOTAL"}],
+    )
+
+    response = model_json_response(model, status_code=201)
+
+    assert response.status_code == 201
+    assert response.media_type == "application/json"
+    assert isinstance(response.body, bytes)
+    body = json.loads(response.body)
+    assert body["portfolioId"] == "P1"
+    assert body["generatedAt"] == "2026-02-24T07:00:00Z"
+    assert body["rows"] == [{"bucket": "TOTAL"}]
@@ -0,0 +1,102 @@
+import asyncio
+import signal
+import threading
+from types import FrameType, SimpleNamespace
+
+import pytest
+
+from app.middleware import in_flight
+from app.middleware.in_flight import InFlightTracker
+from app.shutdown import PreStopDrain
+
+
+@pytest.fixture
+def sigterm_recorder():
+    received: list[int] = []
+
+    def _record(signum: int, frame: FrameType | None) -> None:
+        received.append(signum)
+
+    original = signal.signal(signal.SIGTERM, _record)
+    yield received
+    signal.signal(signal.SIGTERM, original)
+
+
+@pytest.mark.asyncio
+async def test_second_sigterm_hands_over_without_waiting(monkeypatch, sigterm_recorder):
+    tracker = InFlightTracker()
+    tracker.started()
+    monkeypatch.setattr(in_flight, "IN_FLIGHT", tracker)
+    state = SimpleNamespace(is_draining=False)
+    pre_stop = PreStopDrain(state, 30.0, 30.0)
+    assert pre_stop.install()
+
+    signal.raise_signal(signal.SIGTERM)
+    await asyncio.sleep(0.01)
+    assert state.is_draining is True
+    assert sigterm_recorder == []
+
+    signal.raise_signal(signal.SIGTERM)
+    assert sigterm_recorder == [signal.SIGTERM]
+
+    pre_stop.uninstall()
+    assert pre_stop._task is not None
+    await asyncio.gather(pre_stop._task, return_exceptions=True)
+    assert sigterm_recorder == [signal.SIGTERM]
+    assert signal.getsignal(signal.SIGTERM) is not pre_stop._handle_sigterm
+
+
+@pytest.mark.asyncio
+async def test_uninstall_leaves_a_handler_installed_by_someone_else(sigterm_recorder):
+    pre_stop = PreStopDrain(SimpleNamespace(is_draining=False), 0.0, 0.0)
+    assert pre_stop.install()
+
+    def _other(signum: int, frame: FrameType | None) -> None:
+        pass
+
+    signal.signal(signal.SIGTERM, _other)
+    pre_stop.uninstall()
+    assert signal.getsignal(signal.SIGTERM) is _other
+
+
+@pytest.mark.asyncio
+async def test_ignored_sigterm_stays_ignored_after_drain(monkeypatch):
+    monkeypatch.setattr(in_flight, "IN_FLIGHT", InFlightTracker())
+    original = signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    try:
+        pre_stop = PreStopDrain(SimpleNamespace(is_draining=False), 0.0, 1.0)
+        assert pre_stop.install()
+        signal.raise_signal(signal.SIGTERM)
+        await asyncio.sleep(0)
+        assert pre_stop._task is not None
+        await pre_stop._task
+        assert signal.getsignal(signal.SIGTERM) == signal.SIG_IGN
+    finally:
+        signal.signal(signal.SIGTERM, original)
+
+
+def test_install_is_skipped_off_the_main_thread():
+    results: list[bool] = []
+    pre_stop = PreStopDrain(SimpleNamespace(is_draining=False), 0.0, 0.0)
+    worker = threading.Thread(target=lambda: results.append(pre_stop.install()))
+    worker.start()
+    worker.join()
+    assert results == [False]
+    pre_stop.uninstall()
+
+
+@pytest.mark.asyncio
+async def test_default_sigterm_disposition_is_re_raised(monkeypatch):
+    monkeypatch.setattr(in_flight, "IN_FLIGHT", InFlightTracker())
+    raised: list[int] = []
+    original = signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    try:
+        pre_stop = PreStopDrain(SimpleNamespace(is_draining=False), 0.0, 1.0)
+        assert pre_stop.install()
+        monkeypatch.setattr(signal, "raise_signal", raised.append)
+        pre_stop._handle_sigterm(signal.SIGTERM, None)
+        await asyncio.sleep(0.01)
+        assert raised == [signal.SIGTERM]
+        assert signal.getsignal(signal.SIGTERM) == signal.SIG_DFL
+    finally:
+        signal.signal(signal.SIGTERM, original)
@@ -0,0 +1,235 @@
+import json
+from contextlib import asynccontextmanager
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.clients.http_resilience import request_with_retry
+from app.config import settings
+from app.middleware.correlation import CorrelationMiddleware, propagation_headers
+from app.tracing import (
+    TRACER,
+    JsonLinesSpanExporter,
+    NoopSpanExporter,
+    Span,
+    SpanExporter,
+    Tracer,
+    build_tracer,
+    parse_traceparent,
+)
+
+REMOTE_TRACE_ID = "0af7651916cd43dd8448eb211c80319c"
+REMOTE_PARENT_ID = "b7ad6b7169203331"
+
+
+class _CollectingExporter(SpanExporter):
+    def __init__(self) -> None:
+        self.spans: list[Span] = []
+
+    def export(self, spans: list[Span]) -> None:
+        self.spans.extend(spans)
+
+
+@pytest.fixture
+def exported(monkeypatch) -> list[Span]:
+    exporter = _CollectingExporter()
+    monkeypatch.setattr(TRACER, "exporter", exporter)
+    # Export inline instead of on the default executor so assertions never race the export.
+    monkeypatch.setattr(TRACER, "_export", exporter.export)
+    monkeypatch.setattr(TRACER, "batch_size", 1)
+    monkeypatch.setattr(TRACER, "_pending", [])
+    monkeypatch.setattr(TRACER, "sample_ratio", 1.0)
+    return exporter.spans
+
+
+class _HeaderCapturingAsyncClient:
+    sent_headers: list[dict[str, str]] = []
+
+    def __init__(self, timeout: float, transport=None):
+        _ = timeout, transport
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
+
+    @asynccontextmanager
+    async def stream(self, method, url, params=None, headers=None, **kwargs):
+        _HeaderCapturingAsyncClient.sent_headers.append(dict(headers or {}))
+        yield httpx.Response(200, json={"ok": True}, request=httpx.Request(method, url))
+
+
+def test_parse_traceparent_validates_w3c_fields():
+    assert parse_traceparent(f"00-{REMOTE_TRACE_ID}-{REMOTE_PARENT_ID}-01") == (
+        REMOTE_TRACE_ID,
+        REMOTE_PARENT_ID,
+        True,
+    )
+    assert parse_traceparent(f"00-{REMOTE_TRACE_ID}-{REMOTE_PARENT_ID}-00")[2] is False
+    assert parse_traceparent(f"00-{'0' * 32}-{REMOTE_PARENT_ID}-01") is None
+    assert parse_traceparent(f"00-{REMOTE_TRACE_ID}-{'0' * 16}-01") is None
+    assert parse_traceparent(f"00-{REMOTE_TRACE_ID}-{REMOTE_PARENT_ID}-zz") is None
+    assert parse_traceparent(f"00-{REMOTE_TRACE_ID}-{REMOTE_PARENT_ID}-001") is None
+    assert parse_traceparent(f"00-0x{REMOTE_TRACE_ID[2:]}-{REMOTE_PARENT_ID}-01") is None
+    assert parse_traceparent(f"00-{REMOTE_TRACE_ID}-{REMOTE_PARENT_ID[:-1]}_-01") is None
+    assert parse_traceparent(f"00-{REMOTE_TRACE_ID}-0x{REMOTE_PARENT_ID[2:]}-01") is None
+    assert (
+        parse_traceparent(f"00-{REMOTE_TRACE_ID[:4]}_{REMOTE_TRACE_ID[5:]}-{REMOTE_PARENT_ID}-01")
+        is None
+    )
+    assert parse_traceparent(f"00-{REMOTE_TRACE_ID}-{REMOTE_PARENT_ID}- 1") is None
+    assert parse_traceparent("invalid") is None
+    assert parse_traceparent(None) is None
+
+
+def test_request_span_tree_propagates_real_parent_ids(monkeypatch, exported):
+    _HeaderCapturingAsyncClient.sent_headers = []
+    monkeypatch.setattr("httpx.AsyncClient", _HeaderCapturingAsyncClient)
+    application = FastAPI()
+    application.add_middleware(CorrelationMiddleware)
+
+    @application.get("/portfolios/{portfolio_id}/overview")
+    async def _overview(portfolio_id: str):
+        status, _ = await request_with_retry(
+            method="GET",
+            url="http://core/snapshot",
+            timeout_seconds=1.0,
+            max_retries=0,
+            headers=propagation_headers(),
+            operation="get_core_snapshot",
+        )
+        return {"status": status}
+
+    response = TestClient(application).get(
+        "/portfolios/P1/overview",
+        headers={"traceparent": f"00-{REMOTE_TRACE_ID}-{REMOTE_PARENT_ID}-01"},
+    )
+
+    client_span, server_span = exported
+    assert server_span.kind == "server"
+    assert server_span.name == "GET /portfolios/{portfolio_id}/overview"
+    assert server_span.trace_id == REMOTE_TRACE_ID
+    assert server_span.parent_span_id == REMOTE_PARENT_ID
+    assert server_span.attributes["http.status_code"] == 200
+    assert client_span.kind == "client"
+    assert client_span.parent_span_id == server_span.span_id
+    assert client_span.attributes["gateway.operation"] == "get_core_snapshot"
+    assert _HeaderCapturingAsyncClient.sent_headers[0]["traceparent"] == client_span.traceparent
+    assert response.headers["traceparent"] == server_span.traceparent
+    assert response.headers["X-Trace-Id"] == REMOTE_TRACE_ID
+
+
+def test_unsampled_spans_keep_real_ids_but_are_not_exported(monkeypatch, exported):
+    application = FastAPI()
+    application.add_middleware(CorrelationMiddleware)
+    application.add_api_route("/ping", lambda: {"ok": True})
+    client = TestClient(application)
+
+    remote = client.get(
+        "/ping", headers={"traceparent": f"00-{REMOTE_TRACE_ID}-{REMOTE_PARENT_ID}-00"}
+    )
+    monkeypatch.setattr(TRACER, "sample_ratio", 0.0)
+    local = client.get("/ping")
+
+    assert exported == []
+    for response in (remote, local):
+        trace_id, span_id, sampled = parse_traceparent(response.headers["traceparent"])
+        assert span_id != "0000000000000001"
+        assert sampled is False
+
+
+def test_propagation_headers_outside_a_request_use_valid_ids():
+    trace_id, span_id, _ = parse_traceparent(propagation_headers("corr-1")["traceparent"])
+    assert len(trace_id) == 32
+    assert len(span_id) == 16
+
+
+def test_jsonl_exporter_writes_otlp_batches(tmp_path):
+    path = tmp_path / "spans.jsonl"
+    tracer = Tracer(JsonLinesSpanExporter(str(path)), sample_ratio=1.0, batch_size=2)
+    first = tracer.start_span("GET /health", kind="server", attributes={"http.status_code": 200})
+    tracer.end_span(first)
+    assert not path.exists()
+    second = tracer.start_span("lookup", attributes={"cached": True, "source": "core"})
+    tracer.end_span(second, error=True)
+    tracer.start_span("pending")
+    tracer.flush()
+
+    (line,) = path.read_text().splitlines()
+    resource_spans = json.loads(line)["resourceSpans"][0]
+    assert resource_spans["resource"]["attributes"][0]["value"]["stringValue"] == "lotus-gateway"
+    spans = resource_spans["scopeSpans"][0]["spans"]
+    assert [span["name"] for span in spans] == ["GET /health", "lookup"]
+    assert spans[0]["kind"] == 2
+    assert spans[0]["status"] == {"code": 1}
+    assert spans[0]["attributes"] == [{"key": "http.status_code", "value": {"intValue": "200"}}]
+    assert spans[1]["status"] == {"code": 2}
+    assert spans[1]["attributes"][0] == {"key": "cached", "value": {"boolValue": True}}
+    assert "parentSpanId" not in spans[0]
+
+
+def test_jsonl_exporter_rotates_once_the_file_would_pass_max_bytes(tmp_path):
+    path = tmp_path / "spans.jsonl"
+    exporter = JsonLinesSpanExporter(str(path), max_bytes=1)
+    tracer = Tracer(exporter, sample_ratio=1.0, batch_size=1)
+    for name in ("first", "second", "third"):
+        tracer.end_span(tracer.start_span(name))
+
+    def _names(file) -> list[str]:
+        return [
+            json.loads(line)["resourceSpans"][0]["scopeSpans"][0]["spans"][0]["name"]
+            for line in file.read_text().splitlines()
+        ]
+
+    assert _names(path) == ["third"]
+    assert _names(tmp_path / "spans.jsonl.1") == ["second"]
+
+    roomy = tmp_path / "roomy.jsonl"
+    tracer = Tracer(JsonLinesSpanExporter(str(roomy), max_bytes=1 << 20), 1.0, batch_size=1)
+    parent = tracer.start_span("parent")
+    child = tracer.start_span("child", traceparent=parent.traceparent)
+    tracer.end_span(child)
+    tracer.end_span(parent)
+    assert _names(roomy) == ["child", "parent"]
+    assert '"parentSpanId"' in roomy.read_text().splitlines()[0]
+
+
+def test_span_exporter_is_abstract_and_export_can_be_turned_off(monkeypatch):
+    with pytest.raises(TypeError):
+        SpanExporter()  # type: ignore[abstract]
+    assert isinstance(build_tracer().exporter, JsonLinesSpanExporter)
+    monkeypatch.setattr(settings, "tracing_exporter", "none")
+    assert isinstance(build_tracer().exporter, NoopSpanExporter)
+
+
+def test_jsonl_exporter_logs_write_failures_and_tracer_exports_inline_without_a_loop(
+    tmp_path, caplog
+):
+    path = tmp_path / "missing" / "spans.jsonl"
+    tracer = Tracer(JsonLinesSpanExporter(str(path), max_bytes=1024), sample_ratio=1.0)
+    tracer.flush()
+    tracer.end_span(tracer.start_span("unwritable"))
+    with caplog.at_level("WARNING", logger="tracing"):
+        tracer.flush()
+
+    (record,) = caplog.records
+    assert record.getMessage() == "tracing.export_failed"
+    assert record.extra_fields["path"] == str(path)
+
+    collecting = _CollectingExporter()
+    inline = Tracer(collecting, sample_ratio=1.0, batch_size=1)
+    inline.end_span(inline.start_span("inline"))
+    assert [span.name for span in collecting.spans] == ["inline"]
+
+
+def test_build_tracer_uses_the_jsonl_exporter_when_configured(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "tracing_exporter", "jsonl")
+    monkeypatch.setattr(settings, "tracing_export_path", str(tmp_path / "spans.jsonl"))
+    monkeypatch.setattr(settings, "tracing_export_max_bytes", 2048)
+    exporter = build_tracer().exporter
+
+    assert isinstance(exporter, JsonLinesSpanExporter)
+    assert (exporter.path, exporter.max_bytes) == (str(tmp_path / "spans.jsonl"), 2048)
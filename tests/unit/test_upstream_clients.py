@@ -1,4 +1,5 @@
 import json
+from contextlib import asynccontextmanager
 
 import httpx
 import pytest
@@ -14,8 +15,9 @@ class _FakeAsyncClient:
     responses: list[httpx.Response] = []
     calls: list[dict] = []
 
-    def __init__(self, timeout: float):
+    def __init__(self, timeout: float, transport=None):
         self.timeout = timeout
+        self.transport = transport
 
     async def __aenter__(self):
         return self
@@ -29,6 +31,15 @@ class _FakeAsyncClient:
         )
         return self._next_response("GET", url)
 
+    @asynccontextmanager
+    async def stream(
+        self, method, url, params=None, headers=None, json=None, data=None, files=None
+    ):
+        if method == "GET":
+            yield await self.get(url, params=params, headers=headers)
+        else:
+            yield await self.post(url, json=json, data=data, files=files, headers=headers)
+
     async def post(self, url, json=None, data=None, files=None, headers=None):
         self.calls.append(
             {
@@ -125,7 +136,7 @@ async def test_pa_client_calls_and_payload_handling():
 
 @pytest.mark.asyncio
 async def test_pa_client_non_json_and_non_dict_payload_handling():
-    client = PaClient(base_url="http://pa", timeout_seconds=2.0)
+    client = PaClient(base_url="http://pa", timeout_seconds=2.0, max_retries=0)
     _FakeAsyncClient.queue_text(503, "pa unavailable")
     _FakeAsyncClient.queue_json(200, ["analytics"])
 
@@ -147,7 +158,7 @@ async def test_pa_client_non_json_and_non_dict_payload_handling():
 
 @pytest.mark.asyncio
 async def test_pas_client_endpoints_and_non_json_response_handling():
-    client = PasClient(base_url="http://pas", timeout_seconds=2.0)
+    client = PasClient(base_url="http://pas", timeout_seconds=2.0, max_retries=0)
     _FakeAsyncClient.queue_json(200, {"items": [{"portfolio_id": "P1"}]})
     _FakeAsyncClient.queue_json(200, {"items": [{"instrument_id": "AAPL"}]})
     _FakeAsyncClient.queue_json(200, {"items": [{"value": "USD"}]})
@@ -186,6 +197,30 @@ async def test_pas_client_endpoints_and_non_json_response_handling():
     assert payload_summary["detail"] == "service unavailable"
 
 
+@pytest.mark.asyncio
+async def test_pas_client_lookups_keep_only_id_and_label():
+    client = PasClient(base_url="http://pas", timeout_seconds=2.0)
+    _FakeAsyncClient.queue_json(
+        200,
+        {
+            "items": [
+                {"id": "AAPL", "label": "Apple", "isin": "US0378331005", "tags": ["x"]},
+                {"id": "CASH"},
+                "unexpected",
+            ],
+            "total": 3,
+        },
+    )
+
+    status, payload = await client.get_instrument_lookups(limit=3, correlation_id="corr-3")
+
+    assert status == 200
+    assert payload == {
+        "items": [{"id": "AAPL", "label": "Apple"}, {"id": "CASH"}, "unexpected"],
+        "total": 3,
+    }
+
+
 @pytest.mark.asyncio
 async def test_pas_client_core_endpoints():
     client = PasClient(base_url="http://pas", timeout_seconds=2.0)
@@ -407,7 +442,7 @@ async def test_dpm_client_all_routes(method_name, kwargs, expected_url):
 
 @pytest.mark.asyncio
 async def test_dpm_client_non_json_and_non_dict_payload_handling():
-    client = DpmClient(base_url="http://dpm", timeout_seconds=2.0)
+    client = DpmClient(base_url="http://dpm", timeout_seconds=2.0, max_retries=0)
     _FakeAsyncClient.queue_text(502, "dpm unavailable")
     _FakeAsyncClient.queue_json(200, ["not-dict"])
 
@@ -475,7 +510,7 @@ async def test_reporting_client_summary_and_review_routes():
 
 @pytest.mark.asyncio
 async def test_reporting_client_summary_review_non_json_payloads():
-    client = ReportingClient(base_url="http://ras", timeout_seconds=2.0)
+    client = ReportingClient(base_url="http://ras", timeout_seconds=2.0, max_retries=0)
     _FakeAsyncClient.queue_text(502, "summary failure")
     _FakeAsyncClient.queue_json(200, ["review-item"])
 
@@ -493,3 +528,18 @@ async def test_reporting_client_summary_review_non_json_payloads():
     assert summary_payload["detail"] == "summary failure"
     assert review_status == 200
     assert review_payload["detail"] == ["review-item"]
+
+
+@pytest.mark.asyncio
+async def test_client_get_retries_transient_statuses_by_default():
+    client = ReportingClient(base_url="http://ras", timeout_seconds=2.0, retry_backoff_seconds=0.0)
+    _FakeAsyncClient.queue_text(502, "bad gateway")
+    _FakeAsyncClient.queue_json(200, {"rows": []})
+
+    status, payload = await client.get_portfolio_snapshot(
+        portfolio_id="P1", as_of_date="2026-02-24", correlation_id="corr-8"
+    )
+
+    assert status == 200
+    assert payload == {"rows": []}
+    assert len(_FakeAsyncClient.calls) == 2